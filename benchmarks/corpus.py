@@ -0,0 +1,160 @@
+"""
+Synthetic corpus generator for benchmarks (PDF, DOCX and TXT of a configurable size).
+
+Files are produced with the standard library only, so the benchmark does not depend on
+document-authoring packages. Content is seeded and therefore reproducible across runs.
+
+    python -m benchmarks.corpus --out bench_corpus --files 12 --size-kb 64
+"""
+from __future__ import annotations
+import argparse
+import random
+import zipfile
+from pathlib import Path
+from typing import Iterator, List
+from xml.sax.saxutils import escape
+
+_VOCAB = (
+    "contract party agreement term payment invoice delivery service warranty liability "
+    "clause notice period renewal termination data model training pipeline deployment "
+    "cluster container latency throughput request response index vector embedding query "
+    "document section policy customer supplier schedule amount currency report quarter "
+    "revenue growth margin risk audit compliance security access control review approval"
+).split()
+
+
+def _sentences(rng: random.Random) -> Iterator[str]:
+    while True:
+        words = [rng.choice(_VOCAB) for _ in range(rng.randint(8, 22))]
+        yield " ".join(words).capitalize() + "."
+
+
+def synthetic_paragraphs(size_bytes: int, seed: int = 0) -> List[str]:
+    """Paragraphs of pseudo-prose totalling roughly `size_bytes` characters."""
+    rng = random.Random(seed)
+    sentences = _sentences(rng)
+    paragraphs: List[str] = []
+    total = 0
+    while total < size_bytes:
+        para = " ".join(next(sentences) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(para)
+        total += len(para) + 2
+    return paragraphs
+
+
+def write_txt(path: Path, size_bytes: int, seed: int = 0) -> Path:
+    path.write_text("\n\n".join(synthetic_paragraphs(size_bytes, seed)), encoding="utf-8")
+    return path
+
+
+def write_docx(path: Path, size_bytes: int, seed: int = 0) -> Path:
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(p)}</w:t></w:r></w:p>'
+        for p in synthetic_paragraphs(size_bytes, seed)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        zf.writestr("_rels/.rels", rels)
+        zf.writestr("word/document.xml", document)
+    return path
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, size_bytes: int, seed: int = 0, lines_per_page: int = 48, chars_per_line: int = 90) -> Path:
+    """Minimal multi-page text PDF (Helvetica, uncompressed content streams)."""
+    lines: List[str] = []
+    for para in synthetic_paragraphs(size_bytes, seed):
+        words, cur = para.split(), ""
+        for w in words:
+            if len(cur) + len(w) + 1 > chars_per_line:
+                lines.append(cur)
+                cur = w
+            else:
+                cur = f"{cur} {w}".strip()
+        lines.extend([cur, ""])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    objects: List[bytes] = []
+    n_pages = len(pages)
+    # 1: catalog, 2: pages, 3: font, then (page, content) pairs
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n_pages))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, page in enumerate(pages):
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        ops += [f"({_pdf_escape(line)}) Tj T*" for line in page]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{off:010d} 00000 n \n".encode() for off in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+    return path
+
+
+WRITERS = {".pdf": write_pdf, ".docx": write_docx, ".txt": write_txt}
+
+
+def generate_corpus(out_dir: Path, n_files: int, size_kb: int, kinds=(".pdf", ".docx", ".txt"), seed: int = 0) -> List[Path]:
+    """Write `n_files` documents cycling through `kinds`; returns their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n_files):
+        ext = kinds[i % len(kinds)]
+        paths.append(WRITERS[ext](out_dir / f"doc_{i:04d}{ext}", size_kb * 1024, seed=seed + i))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark corpus")
+    parser.add_argument("--out", default="bench_corpus")
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--kinds", default="pdf,docx,txt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    kinds = tuple(f".{k.strip().lstrip('.')}" for k in args.kinds.split(","))
+    for p in generate_corpus(Path(args.out), args.files, args.size_kb, kinds, args.seed):
+        print(p)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+End-to-end load benchmark for the FastAPI app (`/upload` and multi-turn `/chat`).
+
+Starts the local OpenAI-compatible stand-in and `main:app` as subprocesses (or targets an
+already running app via --app-url), generates a synthetic corpus, drives concurrent
+traffic and writes throughput plus p50/p95/p99 latency per stage as JSON.
+
+    python -m benchmarks.load_test --uploads 8 --turns 3 --concurrency 4 --out bench.json
+    python -m benchmarks.load_test ... --baseline bench_before.json   # print deltas
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import yaml
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.local_openai_server import SETTINGS_PATH
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = REPO_ROOT / "multi_doc_chat" / "config" / "config.yaml"
+
+QUESTIONS = [
+    "What does the agreement say about payment terms?",
+    "Summarise the termination clause.",
+    "Which section covers liability and warranty?",
+    "What is said about latency and throughput?",
+    "How is customer data access controlled?",
+]
+FOLLOW_UPS = ["Can you elaborate on that?", "What about the renewal period?", "Who approves it?"]
+
+_MIME = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[float], errors: int, wall_s: float) -> Dict[str, Any]:
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / wall_s, 3) if wall_s > 0 else 0.0,
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Service did not become ready: {url}")
+
+
+@contextmanager
+def _process(cmd: List[str], env: Dict[str, str], cwd: Path, ready_url: str) -> Iterator[subprocess.Popen]:
+    proc = subprocess.Popen(cmd, env=env, cwd=str(cwd))
+    try:
+        _wait_ready(ready_url)
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _bench_config(workdir: Path, llm_url: str) -> Path:
+    """Copy config.yaml, adding a 'local' LLM provider and pointing it and embeddings at the stand-in."""
+    cfg = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8")) or {}
+    local = (yaml.safe_load(SETTINGS_PATH.read_text(encoding="utf-8")) or {}).get("llm") or {}
+    cfg.setdefault("embedding_model", {})["base_url"] = llm_url
+    cfg.setdefault("llm", {})["local"] = {**local, "base_url": llm_url}
+    path = workdir / "bench_config.yaml"
+    path.write_text(yaml.safe_dump(cfg, sort_keys=False), encoding="utf-8")
+    return path
+
+
+async def _upload(client: httpx.AsyncClient, files: List[Path]):
+    payload = [("files", (p.name, p.read_bytes(), _MIME.get(p.suffix, "application/octet-stream"))) for p in files]
+    t0 = time.perf_counter()
+    resp = await client.post("/upload", files=payload)
+    return time.perf_counter() - t0, resp
+
+
+async def _chat(client: httpx.AsyncClient, session_id: str, message: str):
+    t0 = time.perf_counter()
+    resp = await client.post("/chat", json={"session_id": session_id, "message": message})
+    return time.perf_counter() - t0, resp
+
+
+async def run_load(
+    app_url: str,
+    corpus: List[Path],
+    *,
+    uploads: int,
+    files_per_upload: int,
+    turns: int,
+    concurrency: int,
+    seed: int,
+    request_timeout: float,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    sem = asyncio.Semaphore(concurrency)
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    def _record(stage: str, elapsed: float, ok: bool):
+        s = stages.setdefault(stage, {"samples": [], "errors": 0})
+        if ok:
+            s["samples"].append(elapsed)
+        else:
+            s["errors"] += 1
+
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=app_url, timeout=request_timeout, limits=limits) as client:
+        # Phase 1: concurrent uploads
+        batches = [rng.sample(corpus, min(files_per_upload, len(corpus))) for _ in range(uploads)]
+        sessions: List[str] = []
+
+        async def _one_upload(files):
+            async with sem:
+                try:
+                    elapsed, resp = await _upload(client, files)
+                except httpx.HTTPError:
+                    _record("upload", 0.0, False)
+                    return
+            ok = resp.status_code == 200
+            _record("upload", elapsed, ok)
+            if ok:
+                sessions.append(resp.json()["session_id"])
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_one_upload(b) for b in batches))
+        stages.setdefault("upload", {"samples": [], "errors": 0})["wall_s"] = time.perf_counter() - t0
+
+        # Phase 2: concurrent multi-turn conversations (turns are sequential within a session)
+        async def _conversation(session_id: str):
+            for turn in range(turns):
+                msg = rng.choice(QUESTIONS) if turn == 0 else rng.choice(FOLLOW_UPS)
+                stage = "chat_first_turn" if turn == 0 else "chat_follow_up"
+                async with sem:
+                    try:
+                        elapsed, resp = await _chat(client, session_id, msg)
+                    except httpx.HTTPError:
+                        _record(stage, 0.0, False)
+                        continue
+                _record(stage, elapsed, resp.status_code == 200)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_conversation(s) for s in sessions))
+        chat_wall = time.perf_counter() - t0
+        for name in ("chat_first_turn", "chat_follow_up"):
+            if name in stages:
+                stages[name]["wall_s"] = chat_wall
+
+    all_chat = [x for n in ("chat_first_turn", "chat_follow_up") for x in stages.get(n, {}).get("samples", [])]
+    chat_errors = sum(stages.get(n, {}).get("errors", 0) for n in ("chat_first_turn", "chat_follow_up"))
+    report = {name: summarize(s["samples"], s["errors"], s.get("wall_s", 0.0)) for name, s in stages.items()}
+    if all_chat or chat_errors:
+        report["chat_all"] = summarize(all_chat, chat_errors, chat_wall)
+    return report
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = []
+    for stage, stats in current.get("stages", {}).items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        parts = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            b, c = base.get(key) or 0.0, stats.get(key) or 0.0
+            delta = ((c - b) / b * 100.0) if b else 0.0
+            parts.append(f"{key}={c} ({delta:+.1f}%)")
+        lines.append(f"{stage}: " + ", ".join(parts))
+    return lines
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=str(REPO_ROOT), text=True).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load benchmark for /upload and /chat")
+    parser.add_argument("--app-url", help="Target an already running app instead of spawning one")
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--files-per-upload", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--corpus-files", type=int, default=12)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--kinds", default="pdf,docx,txt")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    kinds = tuple(f".{k.strip().lstrip('.')}" for k in args.kinds.split(","))
+    with tempfile.TemporaryDirectory(prefix="mdc_bench_") as tmp:
+        workdir = Path(tmp)
+        corpus = generate_corpus(workdir / "corpus", args.corpus_files, args.size_kb, kinds, args.seed)
+
+        def _run(app_url: str) -> Dict[str, Any]:
+            return asyncio.run(run_load(
+                app_url,
+                corpus,
+                uploads=args.uploads,
+                files_per_upload=args.files_per_upload,
+                turns=args.turns,
+                concurrency=args.concurrency,
+                seed=args.seed,
+                request_timeout=args.timeout,
+            ))
+
+        if args.app_url:
+            stages = _run(args.app_url.rstrip("/"))
+        else:
+            llm_port, app_port = _free_port(), _free_port()
+            llm_url = f"http://127.0.0.1:{llm_port}/v1"
+            env = dict(os.environ)
+            env.update({
+                "CONFIG_PATH": str(_bench_config(workdir, llm_url)),
+                "LLM_PROVIDER": "local",
+                "OPENROUTER_API_KEY": env.get("OPENROUTER_API_KEY") or "local-benchmark",
+                "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])),
+            })
+            llm_cmd = [
+                sys.executable, "-m", "benchmarks.local_openai_server",
+                "--port", str(llm_port),
+                "--latency-ms", str(args.latency_ms),
+                "--jitter-ms", str(args.jitter_ms),
+                "--error-rate", str(args.error_rate),
+                "--embedding-dim", str(args.embedding_dim),
+                "--seed", str(args.seed),
+            ]
+            app_cmd = [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(app_port), "--log-level", "warning",
+            ]
+            with _process(llm_cmd, env, workdir, f"http://127.0.0.1:{llm_port}/health"):
+                with _process(app_cmd, env, workdir, f"http://127.0.0.1:{app_port}/health"):
+                    stages = _run(f"http://127.0.0.1:{app_port}")
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "params": {**vars(args), "kinds": list(kinds)},
+        "stages": stages,
+    }
+    Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(json.dumps(stages, indent=2))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare(result, baseline)))
+
+
+if __name__ == "__main__":
+    main()
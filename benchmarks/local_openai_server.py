@@ -0,0 +1,230 @@
+"""
+Local OpenAI-compatible stand-in for the OpenRouter endpoints used by the app.
+
+Serves `/embeddings` (deterministic feature-hashed vectors) and `/chat/completions`
+(plain and SSE streaming) with configurable latency, jitter and error injection, so
+ingestion and chat can be load-tested and benchmarked offline.
+
+Run:
+    python -m benchmarks.local_openai_server --port 8001
+
+then point `embedding_model.base_url` / `llm.<provider>.base_url` in config.yaml at
+`http://127.0.0.1:8001/v1`. Defaults live in benchmarks/local_server.yaml;
+`benchmarks.load_test` does all of this itself.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SETTINGS_PATH = Path(__file__).with_name("local_server.yaml")
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "host": "127.0.0.1",
+    "port": 8001,
+    "embedding_dim": 768,
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_status": 429,
+    "answer_words": 48,
+    "stream_delay_ms": 0,
+    "seed": None,
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def hashed_embedding(text: str, dim: int) -> List[float]:
+    """Signed feature hashing of word uni/bigrams, L2-normalised (same text -> same vector)."""
+    vec = [0.0] * dim
+    words = _TOKEN_RE.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for feat in features or [text]:
+        h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+        vec[h % dim] += 1.0 if (h >> 63) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+def fake_completion(messages: List[Dict[str, Any]], answer_words: int) -> str:
+    """
+    Deterministic reply. Question-rewrite prompts echo the last user turn (a valid
+    standalone question); answer prompts return words drawn from the system context.
+    """
+    system = " ".join(_content_text(m.get("content")) for m in messages if m.get("role") == "system")
+    last_user = next(
+        (_content_text(m.get("content")) for m in reversed(messages) if m.get("role") in ("user", "human")),
+        "",
+    )
+    if "standalone question" in system:
+        return last_user or "?"
+    words = _TOKEN_RE.findall(system.split("\n\n", 1)[-1]) or _TOKEN_RE.findall(last_user) or ["ok"]
+    seed = int.from_bytes(hashlib.blake2b(last_user.encode("utf-8"), digest_size=4).digest(), "little")
+    start = seed % len(words)
+    picked = [words[(start + i) % len(words)] for i in range(answer_words)]
+    return " ".join(picked).capitalize() + "."
+
+
+def create_app(settings: Optional[Dict[str, Any]] = None) -> FastAPI:
+    cfg = dict(DEFAULT_SETTINGS)
+    cfg.update(settings or {})
+    rng = random.Random(cfg["seed"])
+    stats = {"embeddings": 0, "embedded_inputs": 0, "chat": 0, "errors": 0}
+
+    app = FastAPI(title="LocalOpenAIStandIn", version="0.1.0")
+    app.state.settings = cfg
+    app.state.stats = stats
+
+    async def _simulate_upstream() -> Optional[JSONResponse]:
+        delay = cfg["latency_ms"] + (rng.uniform(-1.0, 1.0) * cfg["jitter_ms"] if cfg["jitter_ms"] else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if cfg["error_rate"] and rng.random() < cfg["error_rate"]:
+            stats["errors"] += 1
+            status = int(cfg["error_status"])
+            headers = {"Retry-After": "1"} if status in (429, 503) else None
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"message": "Injected upstream error", "code": status}},
+                headers=headers,
+            )
+        return None
+
+    @app.get("/health")
+    def health() -> Dict[str, Any]:
+        return {"status": "ok", "stats": stats}
+
+    @app.post("/v1/embeddings")
+    @app.post("/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        err = await _simulate_upstream()
+        if err is not None:
+            return err
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = int(body.get("dimensions") or cfg["embedding_dim"])
+        stats["embeddings"] += 1
+        stats["embedded_inputs"] += len(inputs)
+        data = [
+            {"object": "embedding", "index": i, "embedding": hashed_embedding(str(t), dim)}
+            for i, t in enumerate(inputs)
+        ]
+        tokens = sum(len(_TOKEN_RE.findall(str(t))) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "local-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        err = await _simulate_upstream()
+        if err is not None:
+            return err
+        stats["chat"] += 1
+        messages = body.get("messages", [])
+        max_words = int(body.get("max_tokens") or cfg["answer_words"])
+        text = fake_completion(messages, min(int(cfg["answer_words"]), max_words))
+        model = body.get("model", "local-chat")
+        cid = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        prompt_tokens = sum(len(_TOKEN_RE.findall(_content_text(m.get("content")))) for m in messages)
+        completion_tokens = len(text.split())
+
+        if not body.get("stream"):
+            return {
+                "id": cid,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+
+        async def _events():
+            def _chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+                payload = {
+                    "id": cid,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield _chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(text.split(" ")):
+                if cfg["stream_delay_ms"]:
+                    await asyncio.sleep(cfg["stream_delay_ms"] / 1000.0)
+                yield _chunk({"content": word if i == 0 else f" {word}"})
+            yield _chunk({}, finish="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+    return app
+
+
+def load_settings(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Settings from the `server` block of local_server.yaml, then explicit overrides."""
+    settings = dict(DEFAULT_SETTINGS)
+    if SETTINGS_PATH.exists():
+        settings.update((yaml.safe_load(SETTINGS_PATH.read_text(encoding="utf-8")) or {}).get("server") or {})
+    settings.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return settings
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--embedding-dim", dest="embedding_dim", type=int)
+    parser.add_argument("--latency-ms", dest="latency_ms", type=float)
+    parser.add_argument("--jitter-ms", dest="jitter_ms", type=float)
+    parser.add_argument("--error-rate", dest="error_rate", type=float)
+    parser.add_argument("--error-status", dest="error_status", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    settings = load_settings(vars(args))
+    uvicorn.run(create_app(settings), host=settings["host"], port=int(settings["port"]), log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+PDF extraction benchmark: pages/second (and chars extracted) for each installed backend
+registered in `multi_doc_chat.utils.pdf_backends`, on a synthetic or user-supplied corpus.
+
+    python -m benchmarks.pdf_backends --files 8 --size-kb 512 --repeat 3
+    python -m benchmarks.pdf_backends --pdf-dir ./my_pdfs --out pdf_bench.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.corpus import generate_corpus
+from multi_doc_chat.utils.pdf_backends import PDF_BACKENDS, available_pdf_backends
+
+
+def bench_backend(name: str, pdfs: List[Path], repeat: int) -> Dict[str, Any]:
+    pages_fn = PDF_BACKENDS[name][1]
+    best = float("inf")
+    pages = chars = 0
+    first_page_ms: List[float] = []
+    for _ in range(repeat):
+        pages = chars = 0
+        t0 = time.perf_counter()
+        for pdf in pdfs:
+            t_file = time.perf_counter()
+            for i, (_, _, text) in enumerate(pages_fn(pdf)):
+                if i == 0:
+                    # Lazy extraction: time until the first page is available downstream
+                    first_page_ms.append((time.perf_counter() - t_file) * 1000.0)
+                pages += 1
+                chars += len(text)
+        best = min(best, time.perf_counter() - t0)
+    return {
+        "backend": name,
+        "pages": pages,
+        "chars": chars,
+        "seconds": round(best, 4),
+        "pages_per_s": round(pages / best, 1) if best > 0 else None,
+        "first_page_ms_p50": round(sorted(first_page_ms)[len(first_page_ms) // 2], 2) if first_page_ms else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PDF extraction backends (pages/s)")
+    parser.add_argument("--pdf-dir", help="Benchmark these PDFs instead of a synthetic corpus")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend; best time is reported")
+    parser.add_argument("--backends", help="Comma-separated subset (default: all installed)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    backends = available_pdf_backends()
+    if args.backends:
+        wanted = [b.strip() for b in args.backends.split(",")]
+        backends = [b for b in wanted if b in backends]
+    if not backends:
+        raise SystemExit("No PDF backends available")
+
+    with tempfile.TemporaryDirectory(prefix="mdc_pdf_bench_") as tmp:
+        if args.pdf_dir:
+            pdfs = sorted(Path(args.pdf_dir).glob("*.pdf"))
+        else:
+            pdfs = generate_corpus(Path(tmp), args.files, args.size_kb, (".pdf",), args.seed)
+        if not pdfs:
+            raise SystemExit("No PDFs to benchmark")
+
+        results = [bench_backend(name, pdfs, max(1, args.repeat)) for name in backends]
+
+    results.sort(key=lambda r: -(r["pages_per_s"] or 0))
+    report = {
+        "python": platform.python_version(),
+        "files": len(pdfs),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    for r in results:
+        print(f"{r['backend']:>10}: {r['pages_per_s']:>9} pages/s  {r['chars']:>10} chars  "
+              f"first page p50 {r['first_page_ms_p50']} ms")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+if __name__ == "__main__":
+    main()
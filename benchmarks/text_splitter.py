@@ -0,0 +1,124 @@
+"""
+Splitter benchmark: MB/s of FastTextSplitter vs LangChain's RecursiveCharacterTextSplitter on
+a synthetic document mix (or real files), with an equivalence check of the produced chunks.
+
+    python -m benchmarks.text_splitter --size-kb 2048 --repeat 3
+    python -m benchmarks.text_splitter --dir ./my_docs --chunk-size 800 --chunk-overlap 100
+    python -m benchmarks.text_splitter --check-only --seeds 50
+
+The check fails (exit status 1) if any chunk text differs. `start_index` mismatches are
+reported separately: LangChain locates each chunk with str.find(), which can land on an
+earlier identical copy in repetitive text; FastTextSplitter reports the true offset.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.corpus import synthetic_paragraphs
+from multi_doc_chat.utils.text_splitter import FastTextSplitter
+
+
+def document_mix(size_bytes: int, seed: int = 0) -> List[Document]:
+    """Prose pages, one-line-per-row tables, unbroken long lines and whitespace-heavy text."""
+    rng = random.Random(seed)
+    share = max(1, size_bytes // 4)
+    paras = synthetic_paragraphs(share, seed)
+    docs = [
+        Document(page_content="\n\n".join(paras[i:i + 6]), metadata={"source": "prose", "page": i // 6})
+        for i in range(0, len(paras), 6)
+    ]
+    rows = [f"id: {i}; name: item {rng.randint(0, 10**6)}; amount: {rng.random() * 1000:.2f}" for i in range(share // 60)]
+    docs.append(Document(page_content="\n".join(rows), metadata={"source": "table"}))
+    long_line = " ".join(synthetic_paragraphs(share, seed + 1))
+    docs.append(Document(page_content=long_line, metadata={"source": "long_line"}))
+    ragged = "\n".join(
+        ("   " * rng.randint(0, 3)) + p + ("\n" * rng.randint(0, 3)) for p in synthetic_paragraphs(share, seed + 2)
+    )
+    docs.append(Document(page_content=ragged, metadata={"source": "ragged"}))
+    return docs
+
+
+def load_dir(path: str, chunk_chars: int) -> List[Document]:
+    from multi_doc_chat.utils.document_ops import SUPPORTED_EXTENSIONS, load_documents
+
+    files = sorted(p for p in Path(path).iterdir() if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+    return load_documents(files, chunk_chars=chunk_chars)
+
+
+def compare(docs: List[Document], chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+    reference = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+    ).split_documents(docs)
+    fast = FastTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True).split_documents(docs)
+    text_mismatch = len(reference) != len(fast) or any(a.page_content != b.page_content for a, b in zip(reference, fast))
+    offset_mismatch = sum(a.metadata["start_index"] != b.metadata["start_index"] for a, b in zip(reference, fast))
+    return {"chunks": len(reference), "fast_chunks": len(fast), "equal_text": not text_mismatch,
+            "start_index_mismatches": offset_mismatch}
+
+
+def bench(splitter, docs: List[Document], repeat: int) -> Dict[str, Any]:
+    size_mb = sum(len(d.page_content.encode("utf-8")) for d in docs) / 1e6
+    best = float("inf")
+    chunks = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        chunks = len(splitter.split_documents(docs))
+        best = min(best, time.perf_counter() - t0)
+    return {"seconds": round(best, 4), "mb_per_s": round(size_mb / best, 2) if best > 0 else None, "chunks": chunks}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FastTextSplitter vs RecursiveCharacterTextSplitter")
+    parser.add_argument("--dir", help="Split documents loaded from this directory instead of the synthetic mix")
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per splitter; best time is reported")
+    parser.add_argument("--seeds", type=int, default=5, help="Random mixes/settings for the equivalence check")
+    parser.add_argument("--check-only", action="store_true")
+    parser.add_argument("--out", help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    # Equivalence over several mixes and chunk settings, including small/odd ones
+    checks = []
+    rng = random.Random(0)
+    for seed in range(args.seeds):
+        size = rng.choice([50, 200, 1000, 4000])
+        overlap = rng.randint(0, size // 2)
+        result = compare(document_mix(16 * 1024, seed), size, overlap)
+        checks.append({"seed": seed, "chunk_size": size, "chunk_overlap": overlap, **result})
+    ok = all(c["equal_text"] for c in checks)
+    for c in checks:
+        print(f"check seed={c['seed']} size={c['chunk_size']} overlap={c['chunk_overlap']}: "
+              f"{'OK' if c['equal_text'] else 'MISMATCH'} ({c['chunks']} chunks, "
+              f"{c['start_index_mismatches']} start_index differences)")
+
+    report: Dict[str, Any] = {"python": platform.python_version(), "equivalent": ok, "checks": checks}
+    if not args.check_only:
+        docs = load_dir(args.dir, args.chunk_size) if args.dir else document_mix(args.size_kb * 1024)
+        kwargs = {"chunk_size": args.chunk_size, "chunk_overlap": args.chunk_overlap, "add_start_index": True}
+        report["mb"] = round(sum(len(d.page_content.encode("utf-8")) for d in docs) / 1e6, 3)
+        report["langchain"] = bench(RecursiveCharacterTextSplitter(**kwargs), docs, max(1, args.repeat))
+        report["fast"] = bench(FastTextSplitter(**kwargs), docs, max(1, args.repeat))
+        report["speedup"] = round(report["langchain"]["seconds"] / report["fast"]["seconds"], 2)
+        for name in ("langchain", "fast"):
+            r = report[name]
+            print(f"{name:>10}: {r['mb_per_s']:>8} MB/s  {r['chunks']:>8} chunks  {r['seconds']} s")
+        print(f"speedup: {report['speedup']}x on {report['mb']} MB")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if not ok:
+        raise SystemExit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 from __future__ import annotations
+import asyncio
+import math
 import os
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
@@ -13,7 +18,14 @@ from pydantic import BaseModel
 from multi_doc_chat.src.document_ingestion.data_ingestion import ChatIngestor
 from multi_doc_chat.src.document_chat.retrieval import ConversationalRAG
 from langchain_core.messages import HumanMessage, AIMessage
-from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
+from multi_doc_chat.exceptions.custom_exception import DeadlineExceeded, DocumentPortalException, UpstreamOverloaded
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.metrics import REGISTRY, current_record, request_record, span
+from multi_doc_chat.utils.shared_index import index_version
+from multi_doc_chat.utils.blob_store import BlobStore, ChunkCache
+from multi_doc_chat.utils.config_loader import load_config
+from multi_doc_chat.utils.session_gc import SessionReaper
+from multi_doc_chat.utils.deadline import deadline_scope
 
 
 # ----------------------------
@@ -28,6 +40,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Failed uploads name their session so the client can resume them
+    expose_headers=["X-Session-Id"],
 )
 
 # Static and templates
@@ -38,11 +52,218 @@ app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 templates = Jinja2Templates(directory=str(templates_dir))
 
 
+# ----------------------------
+# Request timing / metrics
+# ----------------------------
+HTTP_LATENCY = REGISTRY.histogram("mdc_http_request_duration_seconds", "HTTP request latency by route.")
+HTTP_REQUESTS = REGISTRY.counter("mdc_http_requests_total", "HTTP requests by route and status.")
+UNTIMED_PATHS = ("/metrics", "/health", "/static")
+
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    if request.url.path.startswith(UNTIMED_PATHS):
+        return await call_next(request)
+
+    with request_record("http", method=request.method, path=request.url.path) as record:
+        t0 = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            if record.spans:
+                response.headers["Server-Timing"] = record.server_timing()
+            return response
+        finally:
+            route = getattr(request.scope.get("route"), "path", request.url.path)
+            HTTP_LATENCY.observe(time.perf_counter() - t0, route=route)
+            HTTP_REQUESTS.inc(route=route, status=status)
+            record.fields["status"] = status
+            if record.spans:
+                log.info("Request timing", **record.as_dict())
+
+
 # ----------------------------
 # Simple in-memory chat history
 # ----------------------------
 SESSIONS: Dict[str, List[dict]] = {}
 
+# Per-session retriever/chain cache; replaced atomically after an append re-indexes a session
+RAG_CACHE: Dict[str, ConversationalRAG] = {}
+RAG_CACHE_LOCK = threading.Lock()
+SESSION_WRITE_LOCKS: Dict[str, asyncio.Lock] = {}
+
+FAISS_BASE = "faiss_index"
+UPLOAD_BASE = "data"
+# Format produced by generate_session_id(); guards routes that touch session dirs on disk
+SESSION_ID_RE = re.compile(r"session_\d{8}_\d{6}_[0-9a-f]{8}")
+SEARCH_PARAMS = {"search_type": "mmr", "fetch_k": 20, "lambda_mult": 0.5}
+
+
+def _build_rag(session_id: str) -> ConversationalRAG:
+    """Build RAG and load retriever from persisted FAISS with MMR."""
+    rag = ConversationalRAG(session_id=session_id)
+    rag.load_retriever_from_faiss(index_path=f"{FAISS_BASE}/{session_id}", **SEARCH_PARAMS)
+    return rag
+
+
+def _get_rag(session_id: str) -> ConversationalRAG:
+    with RAG_CACHE_LOCK:
+        rag = RAG_CACHE.get(session_id)
+    # Another worker process may have published a newer snapshot of this index
+    if rag is not None and rag.index_version == index_version(f"{FAISS_BASE}/{session_id}"):
+        return rag
+    rag = _build_rag(session_id)
+    with RAG_CACHE_LOCK:
+        cached = RAG_CACHE.get(session_id)
+        if cached is not None and cached.index_version >= rag.index_version:
+            return cached
+        RAG_CACHE[session_id] = rag
+        return rag
+
+
+def _refresh_rag(session_id: str):
+    """Swap in a retriever over the updated index; drop the cached one if reload fails."""
+    try:
+        rag = _build_rag(session_id)
+    except Exception:
+        with RAG_CACHE_LOCK:
+            RAG_CACHE.pop(session_id, None)
+        raise
+    with RAG_CACHE_LOCK:
+        RAG_CACHE[session_id] = rag
+
+
+# ----------------------------
+# Deadlines / client disconnects
+# ----------------------------
+DEADLINES = {"chat_seconds": 60, "ingest_seconds": 600, "disconnect_poll_ms": 250,
+             **(load_config().get("deadlines", {}) or {})}
+REQUESTS_CANCELLED = REGISTRY.counter(
+    "mdc_requests_cancelled_total", "Requests whose upstream work was cancelled, by route and reason."
+)
+
+
+def _request_budget(request: Request, default: float) -> float:
+    """Deadline in seconds: the configured default, tightened by an X-Request-Timeout header."""
+    try:
+        asked = float(request.headers.get("x-request-timeout", "0"))
+    except ValueError:
+        asked = 0.0
+    return min(default, asked) if asked > 0 else default
+
+
+async def _run_until_disconnect(request: Request, coro, route: str):
+    """Await `coro`, cancelling it (and its in-flight LLM call) if the client goes away."""
+    task = asyncio.ensure_future(coro)
+    poll = float(DEADLINES["disconnect_poll_ms"]) / 1000.0
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                REQUESTS_CANCELLED.inc(route=route, reason="disconnect")
+                log.info("Client disconnected; upstream call cancelled", route=route)
+                try:
+                    await task
+                except BaseException:
+                    pass
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# ----------------------------
+# Session garbage collection
+# ----------------------------
+def _session_busy(session_id: str) -> bool:
+    lock = SESSION_WRITE_LOCKS.get(session_id)
+    return lock is not None and lock.locked()
+
+
+def _forget_session(session_id: str):
+    SESSIONS.pop(session_id, None)
+    SESSION_WRITE_LOCKS.pop(session_id, None)
+    with RAG_CACHE_LOCK:
+        RAG_CACHE.pop(session_id, None)
+
+
+def _build_reaper() -> SessionReaper:
+    config = load_config()
+    storage = config.get("storage", {}) or {}
+    blob_store = chunk_cache = None
+    if storage.get("dedupe_uploads", True):
+        blob_store = BlobStore(storage.get("blob_dir") or "data/blobs")
+        if storage.get("chunk_cache", True):
+            chunk_cache = ChunkCache(storage.get("chunk_cache_dir") or "data/chunk_cache")
+    return SessionReaper(
+        data_base=UPLOAD_BASE,
+        faiss_base=FAISS_BASE,
+        blob_store=blob_store,
+        chunk_cache=chunk_cache,
+        settings=config.get("session_gc", {}) or {},
+        is_busy=_session_busy,
+        on_reap=_forget_session,
+    )
+
+
+REAPER = _build_reaper()
+
+
+@app.on_event("startup")
+def _start_reaper():
+    REAPER.start()
+
+
+@app.on_event("shutdown")
+def _stop_reaper():
+    REAPER.stop()
+
+
+def _upstream_error(exc: BaseException) -> Optional[HTTPException]:
+    """
+    Map (possibly wrapped) upstream failures: admission-control rejection -> fast 503 with
+    Retry-After, request deadline exceeded -> 504.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, UpstreamOverloaded):
+            return HTTPException(
+                status_code=503,
+                detail=f"Service busy ({exc.upstream}: {exc.reason}). Please retry.",
+                headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+            )
+        if isinstance(exc, DeadlineExceeded):
+            return HTTPException(status_code=504, detail=f"Request deadline exceeded at {exc.stage}")
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def _resumable_error(exc: HTTPException, ingestor: Optional[ChatIngestor]) -> HTTPException:
+    """
+    Tag a failed upload's error with its session (detail and X-Session-Id header), so a
+    client can finish an interrupted ingestion via POST /sessions/{session_id}/resume.
+    """
+    if ingestor is None:
+        return exc
+    session_id = ingestor.session_id
+    exc.headers = {**(exc.headers or {}), "X-Session-Id": session_id}
+    if ingestor.checkpoint is not None and ingestor.checkpoint.files:
+        exc.detail = f"{exc.detail} (session_id={session_id}; resume with POST /sessions/{session_id}/resume)"
+    else:
+        exc.detail = f"{exc.detail} (session_id={session_id})"
+    return exc
+
+
+def _set_record_session(session_id: str):
+    record = current_record()
+    if record is not None:
+        record.fields["session_id"] = session_id
+
 
 # ----------------------------
 # Adapters
@@ -65,6 +286,8 @@ class UploadResponse(BaseModel):
     session_id: str
     indexed: bool
     message: str | None = None
+    # Near-duplicate filter report (chunks removed, estimated tokens/cost saved) when enabled
+    dedup: Dict[str, Any] | None = None
 
 
 class ChatRequest(BaseModel):
@@ -84,6 +307,11 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request) -> HTMLResponse:
     return templates.TemplateResponse("index.html", {"request": request})
@@ -94,33 +322,103 @@ async def upload(files: List[UploadFile] = File(...)) -> UploadResponse:
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
+    ingestor: Optional[ChatIngestor] = None
     try:
         # Wrap FastAPI files to preserve filename/ext and provide a read buffer
         wrapped_files = [FastAPIFileAdapter(f) for f in files]
 
-        ingestor = ChatIngestor(use_session_dirs=True)
+        ingestor = ChatIngestor(faiss_base=FAISS_BASE, use_session_dirs=True)
         session_id = ingestor.session_id
+        _set_record_session(session_id)
 
-        # Save, load, split, embed, and write FAISS index with MMR
-        ingestor.build_retriever(
-            uploaded_files=wrapped_files,
-            search_type="mmr",
-            fetch_k=20,
-            lambda_mult=0.5
-        )
+        # Held while indexing so the session reaper never deletes a half-built session
+        lock = SESSION_WRITE_LOCKS.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            # Save, load, split, embed, and write FAISS index with MMR (off the event loop)
+            with deadline_scope(float(DEADLINES["ingest_seconds"])):
+                await asyncio.to_thread(ingestor.build_retriever, uploaded_files=wrapped_files, **SEARCH_PARAMS)
 
         # Initialize empty history for this session
         SESSIONS[session_id] = []
 
-        return UploadResponse(session_id=session_id, indexed=True, message="Indexing complete with MMR")
+        return UploadResponse(
+            session_id=session_id, indexed=True, message="Indexing complete with MMR", dedup=ingestor.last_dedup
+        )
     except DocumentPortalException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _resumable_error(_upstream_error(e) or HTTPException(status_code=500, detail=str(e)), ingestor)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
+        raise _resumable_error(
+            _upstream_error(e) or HTTPException(status_code=500, detail=f"Upload failed: {e}"), ingestor
+        )
+
+
+@app.post("/sessions/{session_id}/documents", response_model=UploadResponse)
+async def append_documents(session_id: str, files: List[UploadFile] = File(...)) -> UploadResponse:
+    if session_id not in SESSIONS:
+        raise HTTPException(status_code=404, detail="Unknown or expired session_id. Upload documents first.")
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    _set_record_session(session_id)
+
+    lock = SESSION_WRITE_LOCKS.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        try:
+            wrapped_files = [FastAPIFileAdapter(f) for f in files]
+
+            # Append to the existing session index; only unseen chunks are embedded
+            ingestor = ChatIngestor(faiss_base=FAISS_BASE, use_session_dirs=True, session_id=session_id)
+            with deadline_scope(float(DEADLINES["ingest_seconds"])):
+                await asyncio.to_thread(ingestor.build_retriever, uploaded_files=wrapped_files, **SEARCH_PARAMS)
+            await asyncio.to_thread(_refresh_rag, session_id)
+            REAPER.touch(session_id)
+
+            return UploadResponse(
+                session_id=session_id,
+                indexed=True,
+                message=f"Appended {ingestor.last_added} new chunks",
+                dedup=ingestor.last_dedup,
+            )
+        except DocumentPortalException as e:
+            raise _upstream_error(e) or HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            raise _upstream_error(e) or HTTPException(status_code=500, detail=f"Append failed: {e}")
+
+
+@app.post("/sessions/{session_id}/resume", response_model=UploadResponse)
+async def resume_ingestion(session_id: str) -> UploadResponse:
+    """Finish an ingestion that was interrupted (crash, deadline, upstream failure) from its checkpoint."""
+    if not SESSION_ID_RE.fullmatch(session_id) or not (Path(UPLOAD_BASE) / session_id).is_dir():
+        raise HTTPException(status_code=404, detail="Unknown session_id")
+    _set_record_session(session_id)
+
+    lock = SESSION_WRITE_LOCKS.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        try:
+            ingestor = ChatIngestor(faiss_base=FAISS_BASE, use_session_dirs=True, session_id=session_id)
+            if ingestor.checkpoint is None or not ingestor.checkpoint.files:
+                raise HTTPException(status_code=404, detail="No interrupted ingestion for this session")
+            with deadline_scope(float(DEADLINES["ingest_seconds"])):
+                await asyncio.to_thread(ingestor.resume_retriever, **SEARCH_PARAMS)
+            SESSIONS.setdefault(session_id, [])
+            await asyncio.to_thread(_refresh_rag, session_id)
+            REAPER.touch(session_id)
+
+            return UploadResponse(
+                session_id=session_id,
+                indexed=True,
+                message=f"Resumed ingestion; {ingestor.last_added} new chunks",
+                dedup=ingestor.last_dedup,
+            )
+        except HTTPException:
+            raise
+        except DocumentPortalException as e:
+            raise _upstream_error(e) or HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            raise _upstream_error(e) or HTTPException(status_code=500, detail=f"Resume failed: {e}")
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest) -> ChatResponse:
+async def chat(req: ChatRequest, request: Request) -> ChatResponse:
     session_id = req.session_id
     message = req.message.strip()
     if not session_id or session_id not in SESSIONS:
@@ -128,29 +426,30 @@ async def chat(req: ChatRequest) -> ChatResponse:
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
+    _set_record_session(session_id)
+    REAPER.touch(session_id)
+
     try:
-        # Build RAG and load retriever from persisted FAISS with MMR
-        rag = ConversationalRAG(session_id=session_id)
-        index_path = f"faiss_index/{session_id}"
-        rag.load_retriever_from_faiss(
-            index_path=index_path,
-            search_type="mmr",
-            fetch_k=20,
-            lambda_mult=0.5
-        )
+        # A cold or stale cache entry loads the index from disk; keep that off the event loop
+        rag = await asyncio.to_thread(_get_rag, session_id)
 
         # Use simple in-memory history and convert to BaseMessage list
         simple = SESSIONS.get(session_id, [])
         lc_history = []
-        for m in simple:
-            role = m.get("role")
-            content = m.get("content", "")
-            if role == "user":
-                lc_history.append(HumanMessage(content=content))
-            elif role == "assistant":
-                lc_history.append(AIMessage(content=content))
-
-        answer = rag.invoke(message, chat_history=lc_history)
+        with span("chat.history_convert"):
+            for m in simple:
+                role = m.get("role")
+                content = m.get("content", "")
+                if role == "user":
+                    lc_history.append(HumanMessage(content=content))
+                elif role == "assistant":
+                    lc_history.append(AIMessage(content=content))
+
+        # Async chain: cancelled on client disconnect, bounded by the request deadline
+        with deadline_scope(_request_budget(request, float(DEADLINES["chat_seconds"]))):
+            answer = await _run_until_disconnect(
+                request, rag.ainvoke(message, chat_history=lc_history), route="/chat"
+            )
 
         # Update history
         simple.append({"role": "user", "content": message})
@@ -158,10 +457,12 @@ async def chat(req: ChatRequest) -> ChatResponse:
         SESSIONS[session_id] = simple
 
         return ChatResponse(answer=answer)
+    except HTTPException:
+        raise
     except DocumentPortalException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _upstream_error(e) or HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chat failed: {e}")
+        raise _upstream_error(e) or HTTPException(status_code=500, detail=f"Chat failed: {e}")
 
 
 # Uvicorn entrypoint for `python main.py` (optional)
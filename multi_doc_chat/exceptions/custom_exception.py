@@ -50,4 +50,21 @@ class DocumentPortalException(Exception):
         return base
 
     def __repr__(self):
-        return f"DocumentPortalException(file={self.file_name!r}, line={self.lineno}, message={self.error_message!r})"
\ No newline at end of file
+        return f"DocumentPortalException(file={self.file_name!r}, line={self.lineno}, message={self.error_message!r})"
+
+class UpstreamOverloaded(DocumentPortalException):
+    """An upstream (LLM/embeddings) admission queue is full or the wait timed out."""
+
+    def __init__(self, upstream: str, retry_after: float, reason: str = "queue full"):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"Upstream '{upstream}' overloaded ({reason}); retry after {retry_after:g}s")
+
+
+class DeadlineExceeded(DocumentPortalException):
+    """The request's deadline passed before (or while) an upstream stage ran."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Request deadline exceeded at '{stage}'")
@@ -1,10 +1,4 @@
-import logging
+from multi_doc_chat.logger.custom_logger import CustomLogger
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
-)
-
-# Expose a global logger instance
-GLOBAL_LOGGER = logging.getLogger("multi_doc_chat")
+# Process-wide structured logger; records go through a bounded queue to a background writer
+GLOBAL_LOGGER = CustomLogger().get_logger("multi_doc_chat")
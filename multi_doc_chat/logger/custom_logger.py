@@ -1,49 +1,134 @@
 import os
+import atexit
+import queue
+import random
 import logging
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 import structlog
 
+from multi_doc_chat.utils.metrics import REGISTRY
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "mdc_log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+LOG_RECORDS_SAMPLED_OUT = REGISTRY.counter(
+    "mdc_log_records_sampled_out_total", "High-volume info events skipped by log sampling."
+)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueue records without formatting them and without ever blocking the caller.
+
+    Rendering (JSON) happens on the listener thread; when the bounded queue is full the
+    record is dropped and counted instead of stalling the request hot path.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def _sampler(rate: float):
+    """Drop a fraction of info events logged with `sampled=True` (hot-path events)."""
+
+    def _sample(_, method_name, event_dict):
+        if event_dict.pop("sampled", False) and method_name == "info" and rate < 1.0:
+            if random.random() >= rate:
+                LOG_RECORDS_SAMPLED_OUT.inc()
+                raise structlog.DropEvent
+        return event_dict
+
+    return _sample
+
 
 class CustomLogger:
-    def __init__(self, log_dir="logs"):
-        # Ensure logs directory exists
-        self.logs_dir = os.path.join(os.getcwd(), log_dir)
-        os.makedirs(self.logs_dir, exist_ok=True)
+    """
+    Process-wide structured logging: one bounded queue drained by a background thread that
+    writes JSON lines to the console and a timestamped file under `log_dir`.
 
-        # Log file name with timestamp
-        log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-        self.log_file_path = os.path.join(self.logs_dir, log_file)
+    Configuration happens once per process; further instances/`get_logger` calls reuse it.
+    Environment: LOG_LEVEL, LOG_DIR, LOG_TO_FILE, LOG_QUEUE_SIZE, LOG_SAMPLE_RATE.
+    """
 
-    def get_logger(self, name=__file__):
-        logger_name = os.path.basename(name)
+    _lock = threading.Lock()
+    _listener = None
+    log_file_path = None
+
+    def __init__(self, log_dir=None):
+        self.log_dir = log_dir or os.getenv("LOG_DIR", "logs")
+        self._configure()
+
+    def _configure(self):
+        with CustomLogger._lock:
+            if CustomLogger._listener is not None:
+                return
 
-        # File handler
-        file_handler = logging.FileHandler(self.log_file_path)
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(logging.Formatter("%(message)s"))
-
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter("%(message)s"))
-
-        # Configure root logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(message)s",
-            handlers=[console_handler, file_handler]
-        )
-
-        # Configure structlog
-        structlog.configure(
-            processors=[
+            level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+            queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+            sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+            shared_processors = [
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.add_logger_name,
                 structlog.processors.TimeStamper(fmt="iso", utc=True, key="timestamp"),
-                structlog.processors.add_log_level,
-                structlog.processors.EventRenamer(to="event"),
-                structlog.processors.JSONRenderer()
-            ],
-            logger_factory=structlog.stdlib.LoggerFactory(),
-            cache_logger_on_first_use=True,
-        )
+            ]
+            formatter = structlog.stdlib.ProcessorFormatter(
+                processors=[
+                    structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                    structlog.processors.format_exc_info,
+                    structlog.processors.JSONRenderer(),
+                ],
+                foreign_pre_chain=shared_processors,
+            )
+
+            handlers = []
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+            if os.getenv("LOG_TO_FILE", "true").lower() not in ("0", "false", "no"):
+                logs_dir = os.path.join(os.getcwd(), self.log_dir)
+                os.makedirs(logs_dir, exist_ok=True)
+                log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+                CustomLogger.log_file_path = os.path.join(logs_dir, log_file)
+                file_handler = logging.FileHandler(CustomLogger.log_file_path)
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
 
+            log_queue = queue.Queue(maxsize=queue_size)
+            root = logging.getLogger()
+            for h in list(root.handlers):
+                root.removeHandler(h)
+            root.addHandler(_NonBlockingQueueHandler(log_queue))
+            root.setLevel(level)
+
+            structlog.configure(
+                processors=[
+                    structlog.stdlib.filter_by_level,
+                    _sampler(sample_rate),
+                    *shared_processors,
+                    structlog.stdlib.PositionalArgumentsFormatter(),
+                    structlog.processors.StackInfoRenderer(),
+                    structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+                ],
+                logger_factory=structlog.stdlib.LoggerFactory(),
+                wrapper_class=structlog.stdlib.BoundLogger,
+                cache_logger_on_first_use=True,
+            )
+
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            CustomLogger._listener = listener
+
+    def get_logger(self, name=__file__):
+        logger_name = os.path.basename(name)
         return structlog.get_logger(logger_name)
@@ -1,21 +1,64 @@
 import sys
 import os
+import asyncio
+import hashlib
+import json
+from functools import partial
 from operator import itemgetter
 from typing import List, Optional, Dict, Any
 
 from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
 from langchain_community.vectorstores import FAISS
 
 from multi_doc_chat.utils.model_loader import ModelLoader  # OpenRouter-only loader
-from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
+from multi_doc_chat.utils.config_loader import load_config
+from multi_doc_chat.utils.metrics import REGISTRY, current_record, span
+from multi_doc_chat.utils.deadline import check as check_deadline, remaining as deadline_remaining
+from multi_doc_chat.utils.admission import gated
+from multi_doc_chat.utils.answer_cache import get_answer_cache
+from multi_doc_chat.utils.single_flight import SingleFlight
+from multi_doc_chat.utils.shared_index import corpus_fingerprint, index_version, load_vectorstore
+from multi_doc_chat.utils.context_ops import (
+    ContextSpan,
+    assemble_context,
+    estimate_tokens,
+    format_context,
+    pack_context,
+)
+from multi_doc_chat.exceptions.custom_exception import DeadlineExceeded, DocumentPortalException
 from multi_doc_chat.logger import GLOBAL_LOGGER as log
 from multi_doc_chat.promts.prompt_library import PROMPT_REGISTRY  # ensure the package path is correct
 from multi_doc_chat.model.models import PromptType, ChatAnswer
 from pydantic import ValidationError
 
 
+def _timed(stage: str, runnable: Runnable) -> Runnable:
+    """Wrap a runnable so each (a)invoke is recorded as a timing span (skipped past the deadline)."""
+
+    def _run(x, config):
+        check_deadline(stage)
+        with span(stage):
+            return runnable.invoke(x, config)
+
+    async def _arun(x, config):
+        check_deadline(stage)
+        with span(stage):
+            return await runnable.ainvoke(x, config)
+
+    return RunnableLambda(_run, afunc=_arun, name=stage)
+
+
+# Identical concurrent questions (same corpus, input and history) share one chain run
+_CHAT_FLIGHT = SingleFlight("chat")
+
+CONTEXT_TOKENS = REGISTRY.counter(
+    "mdc_context_tokens_total", "Estimated retrieved-context tokens, packed into the prompt or dropped by the budget."
+)
+
+
 class ConversationalRAG:
     """
     LCEL-based Conversational RAG with lazy retriever initialization.
@@ -29,6 +72,10 @@ class ConversationalRAG:
     def __init__(self, session_id: Optional[str], retriever=None):
         try:
             self.session_id = session_id
+            config = load_config()
+            self.context_cfg: Dict[str, Any] = config.get("context", {}) or {}
+            # Opt-in semantic answer cache (None when disabled)
+            self.answer_cache = get_answer_cache(config.get("answer_cache"))
 
             # Load LLM (OpenRouter) and prompts once
             self.llm = self._load_llm()
@@ -41,13 +88,18 @@ class ConversationalRAG:
 
             # Lazy pieces
             self.retriever = retriever
+            self.vectorstore: Optional[FAISS] = None
+            self.search_type: Optional[str] = None
+            self.search_kwargs: Dict[str, Any] = {}
+            self.index_version = 0
+            self.corpus_key: Optional[str] = None
             self.chain = None
             if self.retriever is not None:
                 self._build_lcel_chain()
 
-            log.info(f"ConversationalRAG initialized. session_id={self.session_id}")
+            log.info("ConversationalRAG initialized", session_id=self.session_id)
         except Exception as e:
-            log.error(f"Failed to initialize ConversationalRAG: {e}")
+            log.error("Failed to initialize ConversationalRAG", error=str(e))
             raise DocumentPortalException("Initialization error in ConversationalRAG", e) from e
 
     # ---------- Public API ----------
@@ -70,13 +122,13 @@ class ConversationalRAG:
                 raise FileNotFoundError(f"FAISS index directory not found: {index_path}")
 
             embeddings = ModelLoader().load_embeddings()  # OpenRouter embeddings
-            log.info(f"Loading FAISS index from {index_path}")
-            vectorstore = FAISS.load_local(
-                index_path,
-                embeddings=embeddings,
-                index_name=index_name,
-                allow_dangerous_deserialization=True,
-            )
+            log.info("Loading FAISS index", index_path=index_path)
+            with span("rag.load_index"):
+                # Read before loading: a concurrent publish then only causes a spare reload
+                version = index_version(index_path)
+                fingerprint = corpus_fingerprint(index_path)
+                # Per-session directory or a pointer into a shared corpus index
+                vectorstore = load_vectorstore(index_path, embeddings, index_name=index_name)
 
             if search_kwargs is None:
                 search_kwargs = {"k": k}
@@ -87,65 +139,197 @@ class ConversationalRAG:
             self.retriever = vectorstore.as_retriever(
                 search_type=search_type, search_kwargs=search_kwargs
             )
+            # Kept so retrieval can time query embedding and index search separately
+            self.vectorstore = vectorstore
+            self.index_version = version
+            # Same corpus + same retrieval settings => answers are interchangeable (cache/coalescing)
+            settings = json.dumps({"search_type": search_type, **search_kwargs}, sort_keys=True)
+            self.corpus_key = hashlib.sha256(f"{fingerprint}|{settings}".encode("utf-8")).hexdigest()
+            self.search_type = search_type
+            self.search_kwargs = dict(search_kwargs)
             self._build_lcel_chain()
 
             log.info(
-                f"FAISS retriever loaded successfully. index_path={index_path}, "
-                f"index_name={index_name}, search_type={search_type}, k={k}, "
-                f"fetch_k={(fetch_k if search_type == 'mmr' else 'n/a')}, "
-                f"lambda_mult={(lambda_mult if search_type == 'mmr' else 'n/a')}, "
-                f"session_id={self.session_id}"
+                "FAISS retriever loaded successfully",
+                index_path=index_path,
+                index_name=index_name,
+                search_type=search_type,
+                search_kwargs=search_kwargs,
+                session_id=self.session_id,
             )
             return self.retriever
 
         except Exception as e:
-            log.error(f"Failed to load retriever from FAISS: {e}")
+            log.error("Failed to load retriever from FAISS", error=str(e))
             raise DocumentPortalException("Loading error in ConversationalRAG", e) from e
 
     def invoke(self, user_input: str, chat_history: Optional[List[BaseMessage]] = None) -> str:
         """Invoke the LCEL pipeline."""
         try:
-            if self.chain is None:
-                raise DocumentPortalException(
-                    "RAG chain not initialized. Call load_retriever_from_faiss() before invoke().", sys
-                )
             chat_history = chat_history or []
-            payload = {"input": user_input, "chat_history": chat_history}
-            answer = self.chain.invoke(payload)
-            if not answer:
-                log.warning(f"No answer generated. user_input={user_input}, session_id={self.session_id}")
-                return "no answer generated."
+            payload = self._payload(user_input, chat_history)
+            answer = _CHAT_FLIGHT.do(self._flight_key(user_input, chat_history), lambda: self.chain.invoke(payload))
+            return self._finalize(user_input, answer)
+        except Exception as e:
+            log.error("Failed to invoke ConversationalRAG", error=str(e))
+            raise DocumentPortalException("Invocation error in ConversationalRAG", e) from e
+
+    async def ainvoke(self, user_input: str, chat_history: Optional[List[BaseMessage]] = None) -> str:
+        """
+        Async variant of `invoke`. Cancelling the awaiting task cancels the in-flight LLM call;
+        the current request deadline (utils.deadline) bounds the whole chain.
+        """
+        try:
+            chat_history = chat_history or []
+            payload = self._payload(user_input, chat_history)
+            left = deadline_remaining()
             try:
-                validated = ChatAnswer(answer=str(answer))
-                answer = validated.answer
-            except ValidationError as ve:
-                log.error(f"Invalid chat answer: {ve}")
-                raise DocumentPortalException("Invalid chat answer", ve) from ve
-            log.info(
-                f"Chain invoked successfully. session_id={self.session_id}, "
-                f"user_input={user_input}, answer_preview={str(answer)[:150]}"
-            )
-            return answer
+                answer = await _CHAT_FLIGHT.ado(
+                    self._flight_key(user_input, chat_history),
+                    lambda: asyncio.wait_for(self.chain.ainvoke(payload), timeout=left),
+                )
+            except asyncio.TimeoutError as te:
+                raise DeadlineExceeded("rag.chain") from te
+            return self._finalize(user_input, answer)
+        except asyncio.CancelledError:
+            log.info("Chat invocation cancelled", session_id=self.session_id)
+            raise
         except Exception as e:
-            log.error(f"Failed to invoke ConversationalRAG: {e}")
+            log.error("Failed to invoke ConversationalRAG", error=str(e))
             raise DocumentPortalException("Invocation error in ConversationalRAG", e) from e
 
     # ---------- Internals ----------
 
+    def _payload(self, user_input: str, chat_history: List[BaseMessage]) -> Dict[str, Any]:
+        if self.chain is None:
+            raise DocumentPortalException(
+                "RAG chain not initialized. Call load_retriever_from_faiss() before invoke().", sys
+            )
+        return {"input": user_input, "chat_history": chat_history}
+
+    def _finalize(self, user_input: str, answer) -> str:
+        if not answer:
+            log.warning("No answer generated", input_chars=len(user_input), session_id=self.session_id)
+            return "no answer generated."
+        try:
+            with span("rag.validate"):
+                validated = ChatAnswer(answer=str(answer))
+            answer = validated.answer
+        except ValidationError as ve:
+            log.error("Invalid chat answer", error=str(ve))
+            raise DocumentPortalException("Invalid chat answer", ve) from ve
+        log.info(
+            "Chain invoked successfully",
+            session_id=self.session_id,
+            input_chars=len(user_input),
+            answer_chars=len(answer),
+            sampled=True,
+        )
+        return answer
+
+    def _flight_key(self, user_input: str, chat_history: List[BaseMessage]) -> str:
+        h = hashlib.sha256((self.corpus_key or f"rag-{id(self)}").encode("utf-8"))
+        for m in chat_history:
+            h.update(f"\0{m.type}\0{m.content}".encode("utf-8"))
+        h.update(f"\0input\0{user_input}".encode("utf-8"))
+        return h.hexdigest()
+
     def _load_llm(self):
         try:
             llm = ModelLoader().load_llm()  # OpenRouter LLM
             if not llm:
                 raise ValueError("LLM could not be loaded")
-            log.info(f"LLM loaded successfully. session_id={self.session_id}")
+            log.info("LLM loaded successfully", session_id=self.session_id)
             return llm
         except Exception as e:
-            log.error(f"Failed to load LLM: {e}")
+            log.error("Failed to load LLM", error=str(e))
             raise DocumentPortalException("LLM loading error in ConversationalRAG", e) from e
 
-    @staticmethod
-    def _format_docs(docs) -> str:
-        return "\n\n".join(getattr(d, "page_content", str(d)) for d in docs)
+    def _embed_question(self, x: Dict[str, Any]) -> Optional[List[float]]:
+        """Embed the standalone question once; reused by the answer cache and the search."""
+        vs = self.vectorstore
+        if vs is None or vs.embeddings is None or self.search_type not in ("mmr", "similarity"):
+            return None
+        with span("rag.embed_query"):
+            return vs.embeddings.embed_query(x["question"])
+
+    def _retrieve(self, x: Dict[str, Any]):
+        """Search the index by the question vector (MMR or similarity), else via the retriever."""
+        vs = self.vectorstore
+        query_vector = x.get("query_vector")
+        if query_vector is None:
+            with span("rag.retrieve"):
+                return self.retriever.invoke(x["question"])
+
+        with span("rag.search"):
+            if self.search_type == "mmr":
+                return vs.max_marginal_relevance_search_by_vector(query_vector, **self.search_kwargs)
+            return vs.similarity_search_by_vector(query_vector, **self.search_kwargs)
+
+    def _route(self, x: Dict[str, Any]):
+        """Serve a cached answer for a near-identical question, else run retrieval + answer."""
+        cache = self.answer_cache
+        if cache is None or self.corpus_key is None or x.get("query_vector") is None:
+            return self._answer_chain
+        with span("rag.answer_cache"):
+            cached = cache.lookup(self.corpus_key, x["query_vector"])
+        if cached is not None:
+            answer, similarity = cached
+            log.info("Answer cache hit", session_id=self.session_id, similarity=round(similarity, 4), sampled=True)
+            return answer
+        return self._answer_chain | RunnableLambda(partial(self._store_answer, x))
+
+    def _store_answer(self, x: Dict[str, Any], answer: str) -> str:
+        if answer:
+            self.answer_cache.put(self.corpus_key, x["query_vector"], x["question"], answer)
+        return answer
+
+    def _format_docs(self, docs) -> str:
+        with span("rag.context"):
+            return self._assemble(docs)
+
+    def _assemble(self, docs) -> str:
+        cfg = self.context_cfg
+        if cfg.get("dedupe_overlaps", True):
+            spans = assemble_context(
+                docs,
+                adjacency_gap=int(cfg.get("adjacency_gap", 2)),
+                min_overlap=int(cfg.get("min_overlap", 20)),
+            )
+        else:
+            spans = [
+                ContextSpan(None, None, None, getattr(d, "page_content", str(d)), rank)
+                for rank, d in enumerate(docs)
+            ]
+
+        max_tokens = cfg.get("max_tokens")
+        chars_per_token = float(cfg.get("chars_per_token", 4.0))
+        if max_tokens:
+            spans, stats = pack_context(spans, int(max_tokens), chars_per_token=chars_per_token)
+        else:
+            stats = {
+                "packed_tokens": sum(estimate_tokens(s.text, chars_per_token) for s in spans),
+                "dropped_tokens": 0,
+            }
+        stats["chunks"] = len(docs)
+        # The instance is shared by concurrent requests: stats go on the request's own record
+        record = current_record()
+        if record is not None:
+            record.fields["context"] = stats
+        CONTEXT_TOKENS.inc(stats["packed_tokens"], outcome="packed")
+        if stats["dropped_tokens"]:
+            CONTEXT_TOKENS.inc(stats["dropped_tokens"], outcome="dropped")
+
+        log.info(
+            "Context assembled",
+            chunks=len(docs),
+            spans=len(spans),
+            packed_tokens=stats["packed_tokens"],
+            dropped_tokens=stats["dropped_tokens"],
+            session_id=self.session_id,
+            sampled=True,
+        )
+        return format_context(spans)
 
     def _build_lcel_chain(self):
         try:
@@ -153,29 +337,33 @@ class ConversationalRAG:
                 raise DocumentPortalException("No retriever set before building chain", sys)
 
             # 1) Rewrite user question with chat history context
-            question_rewriter = (
+            question_rewriter = _timed(
+                "rag.rewrite",
                 {"input": itemgetter("input"), "chat_history": itemgetter("chat_history")}
                 | self.contextualize_prompt
-                | self.llm
-                | StrOutputParser()
+                | gated("chat_llm", self.llm)
+                | StrOutputParser(),
             )
 
-            # 2) Retrieve docs for rewritten question
-            retrieve_docs = question_rewriter | self.retriever | self._format_docs
+            # 2) Embed the standalone question (shared by the answer cache and the search)
+            prepare = RunnablePassthrough.assign(question=question_rewriter) | RunnablePassthrough.assign(
+                query_vector=RunnableLambda(self._embed_question)
+            )
 
-            # 3) Answer using retrieved context + original input + chat history
-            self.chain = (
+            # 3) Retrieve docs and answer using context + original input + chat history
+            self._answer_chain = (
                 {
-                    "context": retrieve_docs,
+                    "context": RunnableLambda(self._retrieve) | self._format_docs,
                     "input": itemgetter("input"),
                     "chat_history": itemgetter("chat_history"),
                 }
-                | self.qa_prompt
-                | self.llm
-                | StrOutputParser()
+                | _timed("rag.answer", self.qa_prompt | gated("chat_llm", self.llm) | StrOutputParser())
             )
 
-            log.info(f"LCEL graph built successfully. session_id={self.session_id}")
+            # 4) A semantic cache hit short-circuits step 3
+            self.chain = prepare | RunnableLambda(self._route)
+
+            log.info("LCEL graph built successfully", session_id=self.session_id)
         except Exception as e:
-            log.error(f"Failed to build LCEL chain: {e}. session_id={self.session_id}")
+            log.error("Failed to build LCEL chain", error=str(e), session_id=self.session_id)
             raise DocumentPortalException("Failed to build LCEL chain", e) from e
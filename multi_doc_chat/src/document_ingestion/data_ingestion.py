@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Iterable, List, Optional, Dict, Any
+from typing import Iterable, Iterator, List, Optional, Dict, Any
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
@@ -10,10 +10,22 @@ from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
 import json
 import uuid
 from datetime import datetime
-from multi_doc_chat.utils.file_io import save_uploaded_files
-from multi_doc_chat.utils.document_ops import load_documents
+from multi_doc_chat.utils.file_io import save_uploaded_files, iter_supported_uploads, read_uploaded_file
+from multi_doc_chat.utils.blob_store import BlobStore, ChunkCache
+from multi_doc_chat.utils.shared_index import load_vectorstore, read_session_map, write_session_map, write_shared_ref
+from multi_doc_chat.utils.admission import PRIORITY_BULK, upstream_priority
+from multi_doc_chat.utils.index_store import current_version, current_version_dir, index_lock, publish_version
+from contextlib import contextmanager
+from multi_doc_chat.utils.document_ops import iter_documents
+from multi_doc_chat.utils.metrics import span
+from multi_doc_chat.utils.text_splitter import FastTextSplitter, token_length
+from multi_doc_chat.utils.near_dedup import NearDuplicateFilter, get_near_dedup
+from multi_doc_chat.utils.text_normalize import TextNormalizer, get_normalizer
+from multi_doc_chat.utils.ingest_checkpoint import Embed, IngestCheckpoint, get_checkpoint
 import hashlib
+import itertools
 import sys
+import tempfile
 
 
 def generate_session_id() -> str:
@@ -43,17 +55,42 @@ class ChatIngestor:
 
             self.temp_dir = self._resolve_dir(self.temp_base)
             self.faiss_dir = self._resolve_dir(self.faiss_base)
+            self.last_added = 0
+            self.shared_corpus_dir: Optional[Path] = None
+
+            # Content-addressed uploads + per-file chunk/vector cache (shared across sessions)
+            self.storage_cfg: Dict[str, Any] = self.model_loader.config.get("storage", {}) or {}
+            self.ingest_cfg: Dict[str, Any] = self.model_loader.config.get("ingestion", {}) or {}
+            self.normalizer: Optional[TextNormalizer] = get_normalizer(self.ingest_cfg.get("normalize"))
+            self.near_dedup: Optional[NearDuplicateFilter] = get_near_dedup(self.ingest_cfg.get("near_dedup"))
+            self.last_normalization: List[Dict[str, Any]] = []
+            # Embedding progress of an interrupted ingestion survives a crash (per session)
+            self.checkpoint: Optional[IngestCheckpoint] = get_checkpoint(
+                self.temp_dir, self.ingest_cfg.get("checkpoint")
+            )
+            self.last_dedup: Optional[Dict[str, Any]] = None
+            self.blob_store: Optional[BlobStore] = None
+            self.chunk_cache: Optional[ChunkCache] = None
+            if self.storage_cfg.get("index_mode", "per_session") == "shared":
+                corpus = self.storage_cfg.get("shared_corpus", "default")
+                self.shared_corpus_dir = self.faiss_base / "_shared" / corpus
+            if self.storage_cfg.get("dedupe_uploads", True):
+                self.blob_store = BlobStore(self.storage_cfg.get("blob_dir") or self.temp_base / "blobs")
+                if self.storage_cfg.get("chunk_cache", True):
+                    self.chunk_cache = ChunkCache(
+                        self.storage_cfg.get("chunk_cache_dir") or self.temp_base / "chunk_cache"
+                    )
 
             log.info(
-                f"ChatIngestor initialized. "
-                f"session_id={self.session_id}, "
-                f"temp_dir={self.temp_dir}, "
-                f"faiss_dir={self.faiss_dir}, "
-                f"sessionized={self.use_session}"
+                "ChatIngestor initialized",
+                session_id=self.session_id,
+                temp_dir=str(self.temp_dir),
+                faiss_dir=str(self.faiss_dir),
+                sessionized=self.use_session,
             )
 
         except Exception as e:
-            log.error(f"Failed to initialize ChatIngestor: {e}")
+            log.error("Failed to initialize ChatIngestor", error=str(e))
             raise DocumentPortalException("Initialization error in ChatIngestor", e) from e
 
     def _resolve_dir(self, base: Path):
@@ -63,15 +100,170 @@ class ChatIngestor:
             return d
         return base
 
-    def _split(self, docs: List[Document], chunk_size=1000, chunk_overlap=200) -> List[Document]:
-        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        chunks = splitter.split_documents(docs)
-        log.info(f"Documents split. chunks={len(chunks)}, chunk_size={chunk_size}, overlap={chunk_overlap}")
+    def _save(self, uploaded_files: Iterable) -> List[Dict[str, Any]]:
+        """
+        Persist uploads. With the blob store each file is stored once by sha256 and referenced
+        by this session; the session manifest (files.json) records hashes and original names.
+        """
+        if self.blob_store is None:
+            return [{"sha256": None, "name": p.name, "path": str(p)}
+                    for p in save_uploaded_files(uploaded_files, self.temp_dir)]
+
+        manifest_path = self.temp_dir / "files.json"
+        manifest: List[Dict[str, Any]] = []
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8")) or []
+
+        saved: List[Dict[str, Any]] = []
+        for name, ext, uf in iter_supported_uploads(uploaded_files):
+            digest, path, created = self.blob_store.put(read_uploaded_file(uf), ext, owner=self.session_id)
+            entry = {"sha256": digest, "name": name, "path": str(path)}
+            if not any(s["sha256"] == digest for s in saved):
+                saved.append(entry)
+            if not any(m["sha256"] == digest for m in manifest):
+                manifest.append(entry)
+            log.info("File stored for ingestion", uploaded=name, sha256=digest, new_blob=created)
+        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        return saved
+
+    def _chunk_params(self, chunk_size: int, chunk_overlap: int, embedding_model: str) -> Dict[str, Any]:
+        params = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "embedding_model": embedding_model}
+        if self.ingest_cfg.get("length_unit", "chars") == "tokens":
+            # Both splitters produce identical character chunks; only the unit changes them
+            params["tokenizer"] = self.ingest_cfg.get("tokenizer", "cl100k_base")
+        if self.normalizer is not None:
+            params["normalize"] = self.normalizer.settings()
+        if self.near_dedup is not None:
+            params["near_dedup"] = self.near_dedup.settings()
+        return params
+
+    def _splitter(self, chunk_size: int, chunk_overlap: int):
+        # start_index lets retrieval stitch overlapping neighbours back together
+        kwargs: Dict[str, Any] = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "add_start_index": True}
+        if self.ingest_cfg.get("length_unit", "chars") == "tokens":
+            kwargs["length_function"] = token_length(self.ingest_cfg.get("tokenizer", "cl100k_base"))
+        if self.ingest_cfg.get("splitter", "fast") == "langchain":
+            return RecursiveCharacterTextSplitter(**kwargs)
+        return FastTextSplitter(**kwargs)
+
+    def _split(self, docs: List[Document], splitter) -> List[Document]:
+        with span("ingest.split"):
+            # Loaders that pre-split (mmap text) already carry start_index; don't re-split those
+            chunks = []
+            for doc in docs:
+                chunks.extend([doc] if "byte_start" in doc.metadata else splitter.split_documents([doc]))
         return chunks
 
+    def _normalize(self, docs: List[Document]) -> List[Document]:
+        if self.normalizer is None or not docs:
+            return docs
+        with span("ingest.normalize"):
+            docs, report = self.normalizer.normalize(docs)
+        # Per-file totals over the windows of a streamed file
+        for entry in report:
+            total = next((t for t in self.last_normalization if t["source"] == entry["source"]), None)
+            if total is None:
+                self.last_normalization.append(dict(entry))
+            else:
+                for key in ("documents", "chars_before", "chars_after"):
+                    total[key] += entry[key]
+        return docs
+
+    def _iter_file_chunks(
+        self, f: Dict[str, Any], chunk_size: int, chunk_overlap: int, batch_chunks: int
+    ) -> Iterator[List[Document]]:
+        """
+        Parse one saved file lazily and yield its chunks in batches of at most `batch_chunks`.
+        Documents are normalized and split a window (about `batch_chunks` chunks of text) at
+        a time, so memory stays bounded whatever the file size; header/footer detection sees
+        the pages of one window. A file's batches are the same on every run, which lets a
+        resumed job skip the ones already spooled.
+        """
+        splitter = self._splitter(chunk_size, chunk_overlap)
+        budget = batch_chunks * chunk_size
+        docs = iter_documents(
+            [Path(f["path"])], chunk_chars=chunk_size, sources={f["path"]: f["name"]}, chunk_overlap=chunk_overlap
+        )
+        window: List[Document] = []
+        chunks: List[Document] = []
+        chars = loaded = produced = 0
+        for doc in itertools.chain(docs, [None]):
+            if doc is not None:
+                window.append(doc)
+                chars += len(doc.page_content)
+                loaded += 1
+                if chars < budget:
+                    continue
+            if window:
+                chunks.extend(self._split(self._normalize(window), splitter))
+                window, chars = [], 0
+            while len(chunks) >= batch_chunks or (doc is None and chunks):
+                batch, chunks = chunks[:batch_chunks], chunks[batch_chunks:]
+                produced += len(batch)
+                yield batch
+        log.info("Documents loaded", file=f["name"], documents=loaded, chunks=produced,
+                 chunk_size=chunk_size, overlap=chunk_overlap)
+
+    def _spool_file(
+        self,
+        f: Dict[str, Any],
+        fm: "FaissManager",
+        spool: IngestCheckpoint,
+        embed: Embed,
+        dedup,
+        chunk_size: int,
+        chunk_overlap: int,
+        batch_chunks: int,
+    ):
+        """Chunk one file batch by batch, embed the chunks the index lacks and spool each batch."""
+        skip = spool.batch_count(f["path"])
+        embedded = indexed = 0
+        for n, chunks in enumerate(self._iter_file_chunks(f, chunk_size, chunk_overlap, batch_chunks)):
+            if n < skip:
+                # Spooled before an interruption
+                continue
+            cross_source = False
+            if dedup is not None:
+                with span("ingest.dedup"):
+                    chunks, report = self.near_dedup.filter(chunks, index=dedup)
+                cross_source = bool(report["cross_source"])
+                self.last_dedup = self.near_dedup.merge_reports(self.last_dedup, report)
+            # Chunks already in the index (e.g. unchanged rows of a table) need no vector
+            todo = [i for i, c in enumerate(chunks) if not fm.indexed(c)]
+            vectors: List[Optional[List[float]]] = [None] * len(chunks)
+            if todo:
+                with span("ingest.embed"):
+                    for i, v in zip(todo, embed([chunks[i].page_content for i in todo])):
+                        vectors[i] = v
+            spool.save_batch(f["path"], chunks, vectors, cross_source=cross_source)
+            embedded += len(todo)
+            indexed += len(chunks) - len(todo)
+        log.info("File embedded", file=f["name"], embedded=embedded, already_indexed=indexed, resumed_batches=skip)
+
+    def _cache_files(self, files: List[Dict[str, Any]], params: Dict[str, Any], spool: IngestCheckpoint):
+        """Cache files embedded in full whose chunk set does not depend on the other files."""
+        batches = spool.batches
+        for f in files:
+            mine = [b for b in batches if b["path"] == f["path"]]
+            if not f["sha256"] or not any(b["chunks"] for b in mine):
+                continue
+            # A partial entry would be served as the whole file; a file that lost chunks to
+            # another file has a batch-dependent chunk set
+            if any(b["vectors"] < b["chunks"] or b["cross_source"] for b in mine):
+                continue
+            try:
+                parts = ((docs, vectors) for docs, vectors in spool.iter_batches(f["path"]) if docs)
+                self.chunk_cache.put(f["sha256"], params, parts)
+            except Exception as e:
+                log.warning("Failed to cache chunks", sha256=f["sha256"], error=str(e))
+
+    def resume_retriever(self, **kwargs):
+        """Finish this session's interrupted ingestion from its checkpoint, without re-uploading."""
+        return self.build_retriever(None, **kwargs)
+
     def build_retriever(
         self,
-        uploaded_files: Iterable,
+        uploaded_files: Optional[Iterable],
         *,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
@@ -81,100 +273,451 @@ class ChatIngestor:
         lambda_mult: float = 0.5,
     ):
         try:
-            paths = save_uploaded_files(uploaded_files, self.temp_dir)
-            docs = load_documents(paths)
-            if not docs:
-                raise ValueError("No valid documents loaded")
-
-            chunks = self._split(docs, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-
-            fm = FaissManager(self.faiss_dir, self.model_loader)
-
-            texts = [c.page_content for c in chunks]
-            metas = [c.metadata for c in chunks]
-
-            vs = fm.load_or_create(texts=texts, metadatas=metas)
-            added = fm.add_documents(chunks)
-            log.info(f"FAISS index updated. added={added}, index={self.faiss_dir}")
-
-            search_kwargs = {"k": k}
-            if search_type == "mmr":
-                search_kwargs["fetch_k"] = fetch_k
-                search_kwargs["lambda_mult"] = lambda_mult
-                log.info(f"Using MMR search k={k}, fetch_k={fetch_k}, lambda_mult={lambda_mult}")
-
-            return vs.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+            # Embedding calls made while ingesting queue behind interactive chat traffic
+            with upstream_priority(PRIORITY_BULK):
+                if uploaded_files is None:
+                    files = self.checkpoint.files if self.checkpoint is not None else []
+                    if not files:
+                        raise ValueError("No interrupted ingestion to resume for this session")
+                else:
+                    with span("ingest.save"):
+                        files = self._save(uploaded_files)
+
+                if self.shared_corpus_dir is not None:
+                    fm = SharedFaissManager(self.shared_corpus_dir, self.session_id, self.model_loader)
+                else:
+                    fm = FaissManager(self.faiss_dir, self.model_loader)
+                params = self._chunk_params(chunk_size, chunk_overlap, getattr(fm.emb, "model", ""))
+                spool = self.checkpoint
+                embed = fm.emb.embed_documents
+                if spool is not None:
+                    embed = spool.embedder(fm.emb)
+                else:
+                    # Batches are spooled to disk either way; without checkpointing, for this run only
+                    spool = IngestCheckpoint(tempfile.mkdtemp(prefix="_ingest_spool_", dir=self.temp_dir))
+                try:
+                    spool.begin(IngestCheckpoint.job_key(files, params), files)
+                    vs = self._index_files(files, fm, params, spool, embed, chunk_size, chunk_overlap)
+                finally:
+                    if spool is not self.checkpoint:
+                        spool.clear()
+
+                search_kwargs = {"k": k}
+                if search_type == "mmr":
+                    search_kwargs["fetch_k"] = fetch_k
+                    search_kwargs["lambda_mult"] = lambda_mult
+                    log.info("Using MMR search", k=k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+
+                return vs.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
 
         except Exception as e:
-            log.error(f"Failed to build retriever: {e}")
+            log.error("Failed to build retriever", error=str(e))
             raise DocumentPortalException("Failed to build retriever", e) from e
 
+    def _index_files(
+        self,
+        files: List[Dict[str, Any]],
+        fm: "FaissManager",
+        params: Dict[str, Any],
+        spool: IngestCheckpoint,
+        embed: Embed,
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> FAISS:
+        """
+        Stream `files` through parse, normalize, split, dedup and embed into `spool` in
+        bounded batches, then append the spooled batches to the index and publish it once.
+        """
+        batch_chunks = max(1, int(self.ingest_cfg.get("batch_chunks", 512)))
+        self.last_normalization, self.last_dedup = [], None
+
+        # Known files (by content hash) skip straight to index assembly
+        cached = [f for f in files if self.chunk_cache is not None and f["sha256"]
+                  and self.chunk_cache.has(f["sha256"], params)]
+        pending = [f for f in files if f not in cached]
+        if cached:
+            log.info("Chunk cache hit", files=len(cached))
+        if spool.batches:
+            log.info("Resuming ingestion from checkpoint", batches=len(spool.batches),
+                     files_done=sum(spool.is_done(f["path"]) for f in pending), files=len(pending))
+
+        dedup = None
+        if self.near_dedup is not None and pending:
+            # Chunks kept earlier (cache hits, batches spooled before a restart) are dedup candidates
+            dedup = self.near_dedup.index()
+            for f in cached:
+                for part, _ in self.chunk_cache.parts(f["sha256"], params):
+                    self.near_dedup.remember(dedup, part)
+            for part, _ in spool.iter_batches():
+                self.near_dedup.remember(dedup, part)
+
+        # Manifest of the latest snapshot: decides which chunks need embedding
+        fm.source_names = {f["path"]: f["name"] for f in files}
+        fm.refresh()
+        for f in pending:
+            if not spool.is_done(f["path"]):
+                self._spool_file(f, fm, spool, embed, dedup, chunk_size, chunk_overlap, batch_chunks)
+                spool.file_done(f["path"])
+        if self.last_dedup is not None:
+            self.last_dedup.pop("cross_source")
+            log.info("Near duplicates removed", **self.last_dedup)
+        if not cached and not any(b["chunks"] for b in spool.batches):
+            raise ValueError("No valid documents loaded")
+        if self.chunk_cache is not None:
+            self._cache_files(pending, params, spool)
+
+        # Load-append-publish under the index write lock, one batch in memory at a time;
+        # readers keep the old snapshot until the single publish
+        added = total = 0
+        with fm.locked():
+            if fm.exists():
+                fm.load_or_create()
+            for f in cached:
+                for part, vectors in self.chunk_cache.parts(f["sha256"], params):
+                    added += fm.add_documents(part, vectors=vectors, embed=embed, publish=False)
+                    total += len(part)
+            for part, vectors in spool.iter_batches():
+                added += fm.add_documents(part, vectors=vectors, embed=embed, publish=False)
+                total += len(part)
+            fm.publish()
+        if self.shared_corpus_dir is not None:
+            write_shared_ref(self.faiss_dir, self.shared_corpus_dir, self.session_id)
+            vs = load_vectorstore(self.faiss_dir, fm.emb)
+        else:
+            vs = fm.vs
+        if vs is None:
+            raise ValueError("No chunks to index")
+        self.last_added = added
+        spool.clear()
+        log.info("FAISS index updated", added=added, chunks=total, index=str(self.faiss_dir))
+        return vs
+
 
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
 
 class FaissManager:
+    """
+    Session (or corpus) FAISS index with a fingerprint manifest.
+
+    Snapshots are versioned: every write is staged in a temp directory and published by an
+    atomic rename + CURRENT pointer swap (utils.index_store), so readers always load a
+    consistent index.faiss/index.pkl/manifest triple. Writers serialise on a per-index file
+    lock; wrap load + append in `with fm.locked():` to append on top of the latest version.
+    Batches appended with `publish=False` are published together by `publish()`.
+    """
+
     def __init__(self, index_dir: Path, model_loader: Optional[ModelLoader] = None):
         self.index_dir = Path(index_dir)
         self.index_dir.mkdir(parents=True, exist_ok=True)
 
-        self.meta_path = self.index_dir / "ingested_meta.json"
-        self._meta: Dict[str, Any] = {"rows": {}}
-
-        if self.meta_path.exists():
-            try:
-                self._meta = json.loads(self.meta_path.read_text(encoding="utf-8")) or {"rows": {}}
-            except Exception:
-                self._meta = {"rows": {}}
+        self.version = current_version(self.index_dir)
+        self._meta: Dict[str, Any] = self._read_meta()
+        self._locked = False
+        self._dirty = False
+        # Saved file path -> uploaded file name, for manifest keys
+        self.source_names: Dict[str, str] = {}
 
         self.model_loader = model_loader or ModelLoader()
         self.emb = self.model_loader.load_embeddings()
         self.vs: Optional[FAISS] = None
 
-    def _exists(self) -> bool:
-        return (self.index_dir / "index.faiss").exists() and (self.index_dir / "index.pkl").exists()
+    @property
+    def data_dir(self) -> Path:
+        """Directory of the currently published snapshot."""
+        return current_version_dir(self.index_dir)
 
-    @staticmethod
-    def _fingerprint(text: str, md: Dict[str, Any]) -> str:
+    def _read_meta(self) -> Dict[str, Any]:
+        meta_path = self.data_dir / "ingested_meta.json"
+        if meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8")) or {}
+                meta.setdefault("rows", {})
+                return meta
+            except Exception:
+                pass
+        return {"rows": {}}
+
+    def refresh(self):
+        """Re-read the version and manifest of the latest published snapshot."""
+        with index_lock(self.index_dir):
+            self.version = current_version(self.index_dir)
+            self._meta = self._read_meta()
+
+    @contextmanager
+    def locked(self):
+        """Hold the index write lock and refresh manifest state from the latest snapshot."""
+        with index_lock(self.index_dir):
+            self.version = current_version(self.index_dir)
+            self._meta = self._read_meta()
+            self.vs = None
+            self._dirty = False
+            self._locked = True
+            try:
+                yield self
+            finally:
+                self._locked = False
+
+    def exists(self) -> bool:
+        d = self.data_dir
+        return (d / "index.faiss").exists() and (d / "index.pkl").exists()
+
+    def _fingerprint(self, text: str, md: Dict[str, Any]) -> str:
         src = md.get("source") or md.get("file_path")
+        # Saved files are named by content hash: key by the uploaded name so an edited
+        # re-upload matches the chunks it shares with the previous version
+        src = self.source_names.get(src, src)
         rid = md.get("row_id")
-        if src is not None:
-            return f"{src}::{'' if rid is None else rid}"
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if src is not None and rid is not None:
+            # A row document longer than a chunk is split: sub-chunks differ by offset
+            start = md.get("start_index")
+            return f"{src}::{rid}@{start}" if start else f"{src}::{rid}"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        # Text chunks have no row_id: key them by content so every chunk of a source is kept
+        return f"{src}::{digest}" if src is not None else digest
 
-    def _save_meta(self):
-        self.meta_path.write_text(json.dumps(self._meta, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    def add_documents(self, docs: List[Document]):
-        if self.vs is None:
+    @staticmethod
+    def _doc_id(key: str, md: Dict[str, Any]) -> str:
+        """Docstore id; for hashed rows it changes with the row content."""
+        row_hash = md.get("row_hash")
+        seed = f"{key}::{row_hash}" if row_hash else key
+        return hashlib.sha256(seed.encode("utf-8")).hexdigest()[:32]
+
+    def indexed(self, doc: Document) -> bool:
+        """Whether the manifest already holds this chunk (rows: in their current version)."""
+        md = doc.metadata or {}
+        key = self._fingerprint(doc.page_content, md)
+        seen = self._meta["rows"].get(key)
+        if md.get("row_hash"):
+            return seen == self._doc_id(key, md)
+        return seen is not None
+
+    def _track_high_water(self, md: Dict[str, Any], previous: Dict[str, int], counts: Dict[str, int]):
+        """Record the highest rowid seen per table; count rows above the previous mark as new."""
+        table, rowid = md.get("table"), md.get("rowid")
+        if table is None or rowid is None:
+            return
+        mark = f"{md.get('source')}::{table}"
+        marks = self._meta.setdefault("high_water", {})
+        marks[mark] = max(int(marks.get(mark, 0)), int(rowid))
+        counts["new" if rowid > previous.get(mark, 0) else "changed"] += 1
+
+    def _save_meta(self, target_dir: Path):
+        (target_dir / "ingested_meta.json").write_text(
+            json.dumps(self._meta, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    def add_documents(
+        self,
+        docs: List[Document],
+        vectors: Optional[List[Optional[List[float]]]] = None,
+        embed: Optional[Embed] = None,
+        publish: bool = True,
+    ):
+        """
+        Index only unseen docs; creates the index on first use. Precomputed `vectors`
+        (aligned with `docs`) are used as-is; unseen docs without one (no `vectors`, or a
+        None entry) are embedded here with `embed` (e.g. a checkpointing embedder,
+        defaulting to the model's). With `publish=False` the docs are only appended in
+        memory until `publish()`.
+        """
+        if self.vs is None and self.exists():
             raise RuntimeError("Call load_or_create() before add_documents().")
+        if vectors is not None and len(vectors) != len(docs):
+            raise ValueError("vectors must align with docs")
 
+        rows = self._meta["rows"]
+        previous_marks = dict(self._meta.get("high_water", {}))
+        row_counts = {"new": 0, "changed": 0}
         new_docs: List[Document] = []
-        for d in docs:
-            key = self._fingerprint(d.page_content, d.metadata or {})
-            if key in self._meta["rows"]:
-                continue
-            self._meta["rows"][key] = True
+        new_vectors: List[List[float]] = []
+        new_ids: List[str] = []
+        stale_ids: List[str] = []
+        for i, d in enumerate(docs):
+            md = d.metadata or {}
+            key = self._fingerprint(d.page_content, md)
+            seen = rows.get(key)
+            if md.get("row_hash"):
+                # Keyed rows (e.g. SQLite): re-embed only when the row content changed
+                doc_id = self._doc_id(key, md)
+                if seen == doc_id:
+                    continue
+                if isinstance(seen, str):
+                    stale_ids.append(seen)
+                rows[key] = doc_id
+                self._track_high_water(md, previous_marks, row_counts)
+            else:
+                if seen is not None:
+                    continue
+                rows[key] = True
+                doc_id = uuid.uuid4().hex
             new_docs.append(d)
+            new_ids.append(doc_id)
+            new_vectors.append(vectors[i] if vectors is not None else None)
 
         if new_docs:
-            self.vs.add_documents(new_docs)
-            self.vs.save_local(str(self.index_dir))
-            self._save_meta()
+            self._write_index(
+                new_docs, new_vectors, ids=new_ids, delete_ids=stale_ids, embed=embed, publish=publish
+            )
+        if row_counts["new"] or row_counts["changed"]:
+            log.info("Row changes indexed", new_rows=row_counts["new"], changed_rows=row_counts["changed"], replaced=len(stale_ids))
         return len(new_docs)
 
+    def _write_index(
+        self,
+        docs: List[Document],
+        vectors: Optional[List[Optional[List[float]]]],
+        ids: Optional[List[str]] = None,
+        delete_ids: Optional[List[str]] = None,
+        embed: Optional[Embed] = None,
+        publish: bool = True,
+    ):
+        """Embed missing vectors, append to/create the FAISS store, drop superseded ids, then publish."""
+        texts = [d.page_content for d in docs]
+        vectors = list(vectors) if vectors is not None else [None] * len(docs)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            with span("ingest.embed"):
+                fresh = (embed or self.emb.embed_documents)([texts[i] for i in missing])
+            for i, v in zip(missing, fresh):
+                vectors[i] = v
+        with span("ingest.index_write"):
+            text_embeddings = list(zip(texts, vectors))
+            metadatas = [d.metadata for d in docs]
+            if self.vs is None:
+                self.vs = FAISS.from_embeddings(text_embeddings, embedding=self.emb, metadatas=metadatas, ids=ids)
+            else:
+                self.vs.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            if delete_ids:
+                self.vs.delete(delete_ids)
+            self._dirty = True
+            if publish:
+                self._publish()
+
+    def publish(self):
+        """Publish docs appended with `publish=False` as one snapshot."""
+        if self._dirty:
+            self._publish()
+
+    def _publish(self):
+        def _write(stage: Path):
+            self.vs.save_local(str(stage))
+            self._save_meta(stage)
+
+        if self._locked:
+            self.version = publish_version(self.index_dir, _write)
+        else:
+            with index_lock(self.index_dir):
+                self.version = publish_version(self.index_dir, _write)
+        self._dirty = False
+        log.info("FAISS snapshot published", index=str(self.index_dir), version=self.version)
+
     def load_or_create(self, texts: Optional[List[str]] = None, metadatas: Optional[List[dict]] = None):
-        if self._exists():
-            self.vs = FAISS.load_local(
-                str(self.index_dir),
-                embeddings=self.emb,
-                allow_dangerous_deserialization=True,
-            )
+        if self.exists():
+            with span("ingest.index_load"):
+                self.vs = FAISS.load_local(
+                    str(self.data_dir),
+                    embeddings=self.emb,
+                    allow_dangerous_deserialization=True,
+                )
             return self.vs
 
         if not texts:
             raise DocumentPortalException("No existing FAISS index and no data to create one", sys)
 
-        self.vs = FAISS.from_texts(texts=texts, embedding=self.emb, metadatas=metadatas or [])
-        self.vs.save_local(str(self.index_dir))
+        metadatas = metadatas or [{} for _ in texts]
+        self.add_documents([Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)])
         return self.vs
+
+
+class SharedFaissManager(FaissManager):
+    """
+    One FAISS index per corpus shared by many sessions. Each chunk is stored once (keyed by
+    fingerprint); `sessions.json` maps session ids to the docstore ids they may retrieve and
+    queries are restricted to those ids (see utils.shared_index.load_vectorstore).
+
+    Limits: FAISS snapshots are whole files, so every upload publishes (and every worker then
+    reloads) the entire corpus, and that cost grows with the corpus rather than the upload.
+    Reaping a session only detaches it; its vectors are purged when the session reaper
+    compacts the corpus (utils.shared_index.compact_corpus).
+    """
+
+    def __init__(self, corpus_dir: Path, session_id: str, model_loader: Optional[ModelLoader] = None):
+        super().__init__(corpus_dir, model_loader)
+        self.session_id = session_id
+        self._sessions = read_session_map(self.index_dir)
+        # Docstore ids of self.vs, kept across add_documents calls of one write
+        self._stored: Optional[set] = None
+
+    @contextmanager
+    def locked(self):
+        with super().locked():
+            self._sessions = read_session_map(self.index_dir)
+            self._stored = None
+            yield self
+
+    def indexed(self, doc: Document) -> bool:
+        md = doc.metadata or {}
+        key = self._fingerprint(doc.page_content, md)
+        return self._meta["rows"].get(key) == self._doc_id(key, md)
+
+    def add_documents(
+        self,
+        docs: List[Document],
+        vectors: Optional[List[Optional[List[float]]]] = None,
+        embed: Optional[Embed] = None,
+        publish: bool = True,
+    ):
+        if self.vs is None and self.exists():
+            raise RuntimeError("Call load_or_create() before add_documents().")
+        if vectors is not None and len(vectors) != len(docs):
+            raise ValueError("vectors must align with docs")
+
+        owned = set(self._sessions.get(self.session_id, []))
+        if self._stored is None:
+            self._stored = set(self.vs.index_to_docstore_id.values()) if self.vs is not None else set()
+        stored = self._stored
+        previous_marks = dict(self._meta.get("high_water", {}))
+        row_counts = {"new": 0, "changed": 0}
+        new_docs: List[Document] = []
+        new_vectors: List[List[float]] = []
+        new_ids: List[str] = []
+        for i, d in enumerate(docs):
+            md = d.metadata or {}
+            key = self._fingerprint(d.page_content, md)
+            doc_id = self._doc_id(key, md)
+            seen = self._meta["rows"].get(key)
+            if seen != doc_id:
+                if md.get("row_hash"):
+                    if isinstance(seen, str):
+                        # Changed row: this session now sees the new version only. The old
+                        # vector stays for any other session that still references it.
+                        owned.discard(seen)
+                    self._track_high_water(md, previous_marks, row_counts)
+                self._meta["rows"][key] = doc_id
+            if doc_id not in stored:
+                stored.add(doc_id)
+                new_docs.append(d)
+                new_ids.append(doc_id)
+                new_vectors.append(vectors[i] if vectors is not None else None)
+            owned.add(doc_id)
+
+        if new_docs:
+            self._write_index(new_docs, new_vectors, ids=new_ids, embed=embed, publish=publish)
+        if row_counts["new"] or row_counts["changed"]:
+            log.info("Row changes indexed", new_rows=row_counts["new"], changed_rows=row_counts["changed"])
+        self._sessions[self.session_id] = sorted(owned)
+        if publish:
+            write_session_map(self.index_dir, self._sessions)
+        return len(new_docs)
+
+    def publish(self):
+        super().publish()
+        # Written after the snapshot so a session never points at ids the index lacks
+        write_session_map(self.index_dir, self._sessions)
+
+    def release_session(self, session_id: str):
+        """Detach a session; its vectors stay available to other sessions that share them."""
+        with self.locked():
+            if self._sessions.pop(session_id, None) is not None:
+                write_session_map(self.index_dir, self._sessions)
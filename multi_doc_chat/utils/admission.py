@@ -0,0 +1,253 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from multi_doc_chat.exceptions.custom_exception import DeadlineExceeded, UpstreamOverloaded
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.config_loader import load_config
+from multi_doc_chat.utils.deadline import remaining as deadline_remaining
+from multi_doc_chat.utils.metrics import REGISTRY
+
+# Lower value = served first. Chat (interactive) work outranks bulk ingestion embeddings.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+ADMISSION_WAIT = REGISTRY.histogram(
+    "mdc_admission_wait_seconds", "Time spent queued for an upstream concurrency slot."
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "mdc_admission_rejected_total", "Upstream calls rejected by admission control, by reason."
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("mdc_admission_in_flight", "Upstream calls currently holding a slot.")
+ADMISSION_QUEUED = REGISTRY.gauge("mdc_admission_queued", "Upstream calls waiting for a slot.")
+
+DEFAULT_ADMISSION_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "chat_llm": {"max_concurrency": 8, "max_queue": 32, "queue_timeout_seconds": 10, "interactive_reserve": 0},
+    "embeddings": {"max_concurrency": 4, "max_queue": 64, "queue_timeout_seconds": 30, "interactive_reserve": 1},
+}
+
+_priority: ContextVar[int] = ContextVar("mdc_upstream_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def upstream_priority(level: int) -> Iterator[None]:
+    """Run upstream calls made in this context (and threads started from it) at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class UpstreamGate:
+    """
+    Concurrency limit for one upstream with a bounded, priority-ordered wait queue.
+
+    At most `max_concurrency` calls hold a slot; up to `max_queue` more wait (interactive
+    before bulk, FIFO within a priority) for at most `queue_timeout_seconds`. A full queue or
+    an expired wait raises UpstreamOverloaded so the API can answer 503 + Retry-After at once.
+    `interactive_reserve` slots are never handed to bulk callers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        queue_timeout_seconds: float = 10.0,
+        interactive_reserve: int = 0,
+        retry_after_seconds: float = 5.0,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout_seconds)
+        self.interactive_reserve = min(max(0, int(interactive_reserve)), self.max_concurrency - 1)
+        self.retry_after = float(retry_after_seconds)
+        self._active = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # Queued coroutines: ticket -> (their event loop, event set when the head may move)
+        self._async_waiters: Dict[Tuple[int, int], Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+    def _limit(self, priority: int) -> int:
+        if priority > PRIORITY_INTERACTIVE:
+            return self.max_concurrency - self.interactive_reserve
+        return self.max_concurrency
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.inc(upstream=self.name, reason=reason)
+        log.warning("Upstream call rejected", upstream=self.name, reason=reason, active=self._active)
+        raise UpstreamOverloaded(self.name, self.retry_after, reason)
+
+    def _publish_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self._active, upstream=self.name)
+        ADMISSION_QUEUED.set(len(self._waiting), upstream=self.name)
+
+    def _queue_deadline(self, t0: float) -> Tuple[float, bool]:
+        """Absolute end of the wait and whether the request deadline (not the queue timeout) sets it."""
+        # Never queue past the request's own deadline
+        request_left = deadline_remaining()
+        bounded_by_request = request_left is not None and request_left < self.queue_timeout
+        return t0 + (request_left if bounded_by_request else self.queue_timeout), bounded_by_request
+
+    def _expire(self, bounded_by_request: bool):
+        if bounded_by_request:
+            raise DeadlineExceeded(f"{self.name}.queue")
+        self._reject("queue_timeout")
+
+    def _enqueue_locked(self, priority: int) -> Optional[Tuple[int, int]]:
+        """Take a free slot (None) or join the queue (the ticket). Caller holds `_cond`."""
+        if not self._waiting and self._active < self._limit(priority):
+            self._active += 1
+            self._publish_gauges()
+            return None
+        if len(self._waiting) >= self.max_queue:
+            self._reject("queue_full")
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        self._publish_gauges()
+        return ticket
+
+    def _admit_locked(self, ticket: Tuple[int, int]) -> bool:
+        if self._waiting[0] == ticket and self._active < self._limit(ticket[0]):
+            heapq.heappop(self._waiting)
+            self._active += 1
+            return True
+        return False
+
+    def _leave_locked(self, ticket: Tuple[int, int]):
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+
+    def _notify_locked(self):
+        """Wake every waiter to re-check the head: threads via the condition, tasks via their loop."""
+        self._cond.notify_all()
+        for loop, event in self._async_waiters.values():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop already closed; its waiter is gone with it
+                pass
+
+    def acquire(self, priority: Optional[int] = None):
+        priority = _priority.get() if priority is None else priority
+        t0 = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue_locked(priority)
+            if ticket is None:
+                return
+            deadline, bounded_by_request = self._queue_deadline(t0)
+            try:
+                while not self._admit_locked(ticket):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._expire(bounded_by_request)
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._leave_locked(ticket)
+                raise
+            finally:
+                self._publish_gauges()
+                # Head may have changed (we left or took a slot): let the next waiter re-check
+                self._notify_locked()
+        ADMISSION_WAIT.observe(time.perf_counter() - t0, upstream=self.name)
+
+    async def acquire_async(self, priority: Optional[int] = None):
+        """
+        `acquire` for coroutines: the wait is an asyncio.Event on the caller's loop, so a
+        queued task holds no thread (asyncio.to_thread's pool is left to ingestion work).
+        Cancellation while queued leaves the queue; no slot is taken.
+        """
+        priority = _priority.get() if priority is None else priority
+        t0 = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue_locked(priority)
+            if ticket is None:
+                return
+            event = asyncio.Event()
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), event)
+        deadline, bounded_by_request = self._queue_deadline(t0)
+        try:
+            while True:
+                with self._cond:
+                    if self._admit_locked(ticket):
+                        break
+                    # Cleared under the lock: a release after this point sets it again
+                    event.clear()
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    with self._cond:
+                        self._expire(bounded_by_request)
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                self._leave_locked(ticket)
+            raise
+        finally:
+            with self._cond:
+                self._async_waiters.pop(ticket, None)
+                self._publish_gauges()
+                self._notify_locked()
+        ADMISSION_WAIT.observe(time.perf_counter() - t0, upstream=self.name)
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._publish_gauges()
+            self._notify_locked()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None) -> Iterator[None]:
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_GATES: Dict[str, UpstreamGate] = {}
+_GATES_LOCK = threading.Lock()
+
+
+def get_gate(name: str) -> UpstreamGate:
+    """Process-wide gate for an upstream ("chat_llm" or "embeddings"), from `admission` config."""
+    with _GATES_LOCK:
+        gate = _GATES.get(name)
+        if gate is None:
+            cfg = load_config().get("admission", {}) or {}
+            settings = {**DEFAULT_ADMISSION_SETTINGS.get(name, {}), **(cfg.get(name) or {})}
+            settings.setdefault("retry_after_seconds", cfg.get("retry_after_seconds", 5))
+            gate = _GATES[name] = UpstreamGate(name, **settings)
+        return gate
+
+
+def gated(name: str, runnable: Runnable) -> Runnable:
+    """Wrap a runnable so each (a)invoke holds a slot of the named upstream gate."""
+    gate = get_gate(name)
+
+    def _run(x, config):
+        with gate.slot():
+            return runnable.invoke(x, config)
+
+    async def _arun(x, config):
+        await gate.acquire_async()
+        try:
+            return await runnable.ainvoke(x, config)
+        finally:
+            gate.release()
+
+    return RunnableLambda(_run, afunc=_arun, name=f"{name}.gated")
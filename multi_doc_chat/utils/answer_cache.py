@@ -0,0 +1,158 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.metrics import REGISTRY
+
+ANSWER_CACHE_LOOKUPS = REGISTRY.counter(
+    "mdc_answer_cache_lookups_total", "Semantic answer cache lookups by result (hit, miss, near_miss)."
+)
+ANSWER_CACHE_SIMILARITY = REGISTRY.histogram(
+    "mdc_answer_cache_similarity",
+    "Best cosine similarity per lookup (for tuning the threshold).",
+    buckets=(0.5, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0),
+)
+ANSWER_CACHE_ENTRIES = REGISTRY.gauge("mdc_answer_cache_entries", "Entries held by the semantic answer cache.")
+
+DEFAULT_ANSWER_CACHE_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "similarity_threshold": 0.95,
+    # Lookups scoring within this margin below the threshold are counted as near misses
+    "near_miss_margin": 0.05,
+    "ttl_seconds": 3600,
+    "max_entries": 2000,
+}
+
+
+class _Entry:
+    __slots__ = ("namespace", "vector", "question", "answer", "expires")
+
+    def __init__(self, namespace: str, vector, question: str, answer: str, expires: float):
+        self.namespace = namespace
+        self.vector = vector
+        self.question = question
+        self.answer = answer
+        self.expires = expires
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of answers keyed by corpus fingerprint (`namespace`) and the embedding
+    of the standalone question. A lookup hits when the cosine similarity to a stored question
+    of the same corpus reaches `similarity_threshold`. Entries expire after `ttl_seconds`;
+    beyond `max_entries` the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        near_miss_margin: float = 0.05,
+        ttl_seconds: float = 3600,
+        max_entries: int = 2000,
+    ):
+        self.threshold = float(similarity_threshold)
+        self.near_miss_margin = float(near_miss_margin)
+        self.ttl = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_namespace: Dict[str, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        import numpy as np
+
+        v = np.asarray(vector, dtype="float32")
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else v
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._by_namespace.get(entry.namespace)
+        if ids is not None:
+            ids.remove(entry_id)
+            if not ids:
+                del self._by_namespace[entry.namespace]
+
+    def lookup(self, namespace: str, vector) -> Optional[Tuple[str, float]]:
+        """Return (answer, similarity) on a hit, else None. Records hit/miss/near-miss stats."""
+        import numpy as np
+
+        query = self._normalize(vector)
+        now = time.time()
+        best_id, best_sim = None, -1.0
+        with self._lock:
+            for entry_id in list(self._by_namespace.get(namespace, ())):
+                entry = self._entries[entry_id]
+                if entry.expires <= now:
+                    self._remove(entry_id)
+                    continue
+                if entry.vector.shape != query.shape:
+                    continue
+                sim = float(np.dot(entry.vector, query))
+                if sim > best_sim:
+                    best_id, best_sim = entry_id, sim
+            hit = best_id is not None and best_sim >= self.threshold
+            if hit:
+                self._entries.move_to_end(best_id)
+                answer = self._entries[best_id].answer
+            ANSWER_CACHE_ENTRIES.set(len(self._entries))
+
+        if best_id is not None:
+            ANSWER_CACHE_SIMILARITY.observe(best_sim)
+        if hit:
+            ANSWER_CACHE_LOOKUPS.inc(result="hit")
+            return answer, best_sim
+        near = best_id is not None and best_sim >= self.threshold - self.near_miss_margin
+        ANSWER_CACHE_LOOKUPS.inc(result="near_miss" if near else "miss")
+        if near:
+            log.info("Answer cache near miss", similarity=round(best_sim, 4), threshold=self.threshold)
+        return None
+
+    def put(self, namespace: str, vector, question: str, answer: str):
+        entry = _Entry(namespace, self._normalize(vector), question, answer, time.time() + self.ttl)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._by_namespace.setdefault(namespace, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            ANSWER_CACHE_ENTRIES.set(len(self._entries))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "hits": ANSWER_CACHE_LOOKUPS.value(result="hit"),
+            "misses": ANSWER_CACHE_LOOKUPS.value(result="miss"),
+            "near_misses": ANSWER_CACHE_LOOKUPS.value(result="near_miss"),
+            "threshold": self.threshold,
+        }
+
+
+_CACHE: Optional[SemanticAnswerCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_answer_cache(settings: Optional[Dict[str, Any]]) -> Optional[SemanticAnswerCache]:
+    """Process-wide cache built from the `answer_cache` config section; None when disabled."""
+    global _CACHE
+    cfg = {**DEFAULT_ANSWER_CACHE_SETTINGS, **(settings or {})}
+    if not cfg.get("enabled"):
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = SemanticAnswerCache(
+                similarity_threshold=cfg["similarity_threshold"],
+                near_miss_margin=cfg["near_miss_margin"],
+                ttl_seconds=cfg["ttl_seconds"],
+                max_entries=cfg["max_entries"],
+            )
+            log.info("Semantic answer cache enabled", **cfg)
+        return _CACHE
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
+from multi_doc_chat.utils.index_store import file_lock
+
+
+def _atomic_write_text(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class BlobStore:
+    """
+    Content-addressed store for uploaded files, keyed by sha256.
+
+    Each blob is written once under `<root>/<aa>/<sha256><ext>`; `refs.json` records which
+    owners (session ids) reference it, and a blob is deleted when its last owner releases it.
+    Updates to `refs.json` hold `refs.lock` (thread and OS file lock), so every BlobStore
+    instance over the same root, in any process, sees each other's references.
+    """
+
+    def __init__(self, root: str | Path = "data/blobs"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refs_path = self.root / "refs.json"
+        self.lock_path = self.root / "refs.lock"
+
+    def _load_refs(self) -> Dict[str, Dict[str, Any]]:
+        if not self.refs_path.exists():
+            return {}
+        try:
+            return json.loads(self.refs_path.read_text(encoding="utf-8")) or {}
+        except Exception:
+            return {}
+
+    def total_bytes(self) -> int:
+        return sum(int(e.get("size", 0)) for e in self._load_refs().values())
+
+    def references(self) -> Dict[str, Tuple[int, List[str]]]:
+        """Snapshot of every blob: digest -> (size in bytes, owners)."""
+        return {d: (int(e.get("size", 0)), list(e.get("owners", []))) for d, e in self._load_refs().items()}
+
+    def path_for(self, digest: str, ext: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{ext}"
+
+    def put(self, data: bytes, ext: str, owner: str) -> Tuple[str, Path, bool]:
+        """Store `data` (if new) and add `owner` as a reference. Returns (sha256, path, created)."""
+        try:
+            digest = hashlib.sha256(data).hexdigest()
+            path = self.path_for(digest, ext)
+            with file_lock(self.lock_path):
+                created = not path.exists()
+                if created:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = path.with_name(f".{path.name}.tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, path)
+                refs = self._load_refs()
+                entry = refs.setdefault(digest, {"ext": ext, "size": len(data), "owners": []})
+                if owner not in entry["owners"]:
+                    entry["owners"].append(owner)
+                _atomic_write_text(self.refs_path, json.dumps(refs, indent=2))
+            return digest, path, created
+        except Exception as e:
+            log.error("Failed to store blob", error=str(e), root=str(self.root))
+            raise DocumentPortalException("Failed to store uploaded file", e) from e
+
+    def refcount(self, digest: str) -> int:
+        return len(self._load_refs().get(digest, {}).get("owners", []))
+
+    def release(self, owner: str, on_delete: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Drop every reference held by `owner`; delete unreferenced blobs. Returns bytes freed.
+        `on_delete(digest)` is called for each deleted blob (e.g. to drop its chunk cache).
+        """
+        freed = 0
+        with file_lock(self.lock_path):
+            refs = self._load_refs()
+            for digest in list(refs):
+                entry = refs[digest]
+                if owner not in entry.get("owners", []):
+                    continue
+                entry["owners"].remove(owner)
+                if entry["owners"]:
+                    continue
+                path = self.path_for(digest, entry.get("ext", ""))
+                if path.exists():
+                    freed += path.stat().st_size
+                    path.unlink()
+                del refs[digest]
+                if on_delete is not None:
+                    on_delete(digest)
+            _atomic_write_text(self.refs_path, json.dumps(refs, indent=2))
+        if freed:
+            log.info("Blobs released", owner=owner, bytes_freed=freed)
+        return freed
+
+
+class ChunkCache:
+    """
+    Parsed chunks and their embedding vectors per file hash and chunking/embedding params,
+    so a repeat upload of a known file skips load, split and embed.
+
+    An entry is a sequence of parts (one per ingestion batch), each a chunks JSON file plus a
+    vectors .npy, so neither writing nor reading an entry holds a whole large file in memory.
+    `<key>.parts.json` is written last and marks the entry complete; entries written before
+    parts existed (`<key>.chunks.json` + `<key>.vectors.npy`) read as a single part.
+    """
+
+    def __init__(self, root: str | Path = "data/chunk_cache"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def _paths(self, digest: str, params: Dict[str, Any], part: Optional[int] = None) -> Tuple[Path, Path]:
+        base = self.root / digest[:2] / digest
+        key = self.params_key(params) if part is None else f"{self.params_key(params)}.{part:05d}"
+        return base / f"{key}.chunks.json", base / f"{key}.vectors.npy"
+
+    def _manifest(self, digest: str, params: Dict[str, Any]) -> Path:
+        return self.root / digest[:2] / digest / f"{self.params_key(params)}.parts.json"
+
+    def _part_paths(self, digest: str, params: Dict[str, Any]) -> Optional[List[Tuple[Path, Path]]]:
+        manifest = self._manifest(digest, params)
+        if manifest.exists():
+            try:
+                count = int(json.loads(manifest.read_text(encoding="utf-8"))["parts"])
+            except Exception:
+                return None
+            paths = [self._paths(digest, params, i) for i in range(count)]
+        else:
+            paths = [self._paths(digest, params)]
+        if not all(c.exists() and v.exists() for c, v in paths):
+            return None
+        return paths
+
+    def has(self, digest: str, params: Dict[str, Any]) -> bool:
+        return self._part_paths(digest, params) is not None
+
+    def parts(self, digest: str, params: Dict[str, Any]) -> Iterator[Tuple[List[Document], List[List[float]]]]:
+        """Yield the entry's (chunks, vectors) parts; an unreadable entry is dropped and the error raised."""
+        import numpy as np
+
+        for chunks_path, vectors_path in self._part_paths(digest, params) or []:
+            try:
+                items = json.loads(chunks_path.read_text(encoding="utf-8"))
+                vectors = np.load(vectors_path).tolist()
+                if len(items) != len(vectors):
+                    raise ValueError(f"{len(items)} chunks but {len(vectors)} vectors")
+            except Exception as e:
+                log.warning("Chunk cache entry unreadable; dropping it", digest=digest, error=str(e))
+                self.drop(digest)
+                raise
+            yield [Document(page_content=i["text"], metadata=i["metadata"]) for i in items], vectors
+
+    def put(
+        self, digest: str, params: Dict[str, Any], parts: Iterable[Tuple[List[Document], List[List[float]]]]
+    ):
+        import numpy as np
+
+        count = 0
+        for chunks, vectors in parts:
+            chunks_path, vectors_path = self._paths(digest, params, count)
+            chunks_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_vectors = vectors_path.with_name(f".{vectors_path.name}.tmp")
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, np.asarray(vectors, dtype="float32"))
+            os.replace(tmp_vectors, vectors_path)
+            items = [{"text": c.page_content, "metadata": c.metadata} for c in chunks]
+            _atomic_write_text(chunks_path, json.dumps(items, ensure_ascii=False))
+            count += 1
+        if count:
+            # parts manifest is written last: its presence marks the entry complete
+            _atomic_write_text(self._manifest(digest, params), json.dumps({"parts": count}))
+
+    def drop(self, digest: str) -> int:
+        base = self.root / digest[:2] / digest
+        freed = 0
+        if base.exists():
+            for p in base.iterdir():
+                freed += p.stat().st_size
+                p.unlink()
+            base.rmdir()
+        return freed
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+
+
+# Metadata naming the sub-page unit a chunk was split from (row group, heading section,
+# paragraph block); `start_index` offsets are relative to that unit
+UNIT_KEYS = ("row_id", "section", "paragraph")
+
+
+class ContextSpan:
+    """A contiguous piece of one source/page assembled from one or more retrieved chunks."""
+
+    __slots__ = ("source", "page", "unit", "start", "text", "rank", "chunks")
+
+    def __init__(self, source: Any, page: Any, start: Optional[int], text: str, rank: int, unit: Any = None):
+        self.source = source
+        self.page = page
+        # Sub-page document unit (row group, section): offsets are only comparable within one
+        self.unit = unit
+        self.start = start
+        self.text = text
+        self.rank = rank
+        self.chunks = 1
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+    def __repr__(self):
+        return (
+            f"ContextSpan(source={self.source!r}, page={self.page!r}, start={self.start}, "
+            f"chars={len(self.text)}, rank={self.rank}, chunks={self.chunks})"
+        )
+
+
+def _suffix_prefix_overlap(left: str, right: str, min_overlap: int, max_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    if len(right) < min_overlap:
+        return 0
+    tail = left[-max_overlap:]
+    probe = right[:min_overlap]
+    idx = tail.find(probe)
+    while idx != -1:
+        n = len(tail) - idx
+        if right.startswith(tail[idx:]):
+            return n
+        idx = tail.find(probe, idx + 1)
+    return 0
+
+
+def _merge_positioned(span: ContextSpan, start: int, text: str, adjacency_gap: int, min_overlap: int, max_overlap: int) -> bool:
+    """Merge a chunk with a known start offset into `span` if they touch or overlap."""
+    end = span.end
+    if start > end + adjacency_gap:
+        return False
+    if start >= end:
+        span.text = f"{span.text}\n{text}"
+    elif start + len(text) <= end:
+        # Fully contained in what we already have
+        pass
+    else:
+        overlap = end - start
+        if span.text.endswith(text[:overlap]):
+            span.text += text[overlap:]
+        else:
+            # Offsets disagree with the text (e.g. repeated passages); trust the text
+            n = _suffix_prefix_overlap(span.text, text, min_overlap, max_overlap)
+            span.text = span.text + text[n:] if n else f"{span.text}\n{text}"
+    span.chunks += 1
+    return True
+
+
+def _merge_unpositioned(spans: List[ContextSpan], text: str, min_overlap: int, max_overlap: int) -> bool:
+    """Attach a chunk without offsets to a span it overlaps (on either side)."""
+    for span in spans:
+        if text in span.text:
+            span.chunks += 1
+            return True
+        n = _suffix_prefix_overlap(span.text, text, min_overlap, max_overlap)
+        if n:
+            span.text += text[n:]
+            span.chunks += 1
+            return True
+        n = _suffix_prefix_overlap(text, span.text, min_overlap, max_overlap)
+        if n:
+            span.text = text + span.text[n:]
+            if span.start is not None:
+                span.start = max(0, span.start - (len(text) - n))
+            span.chunks += 1
+            return True
+    return False
+
+
+def assemble_context(
+    docs: Iterable[Document],
+    *,
+    adjacency_gap: int = 2,
+    min_overlap: int = 20,
+    max_overlap: int = 400,
+) -> List[ContextSpan]:
+    """
+    Merge adjacent/overlapping chunks of the same source and page into contiguous spans.
+
+    Chunks carrying a `start_index` (set by the splitter) are merged by offset; older indexes
+    without offsets fall back to suffix/prefix text matching. Spans of a source/page are
+    ordered by document position, and groups keep the rank of their best retrieved chunk.
+    """
+    groups: Dict[Tuple[Any, Any, Any], List[Tuple[Optional[int], int, str]]] = {}
+    for rank, d in enumerate(docs):
+        text = getattr(d, "page_content", str(d))
+        if not text:
+            continue
+        md = getattr(d, "metadata", None) or {}
+        unit = next((md[k] for k in UNIT_KEYS if md.get(k) is not None), None)
+        key = (md.get("source") or md.get("file_path"), md.get("page"), unit)
+        start = md.get("start_index")
+        groups.setdefault(key, []).append((start if isinstance(start, int) and start >= 0 else None, rank, text))
+
+    spans: List[ContextSpan] = []
+    for (source, page, unit), items in groups.items():
+        positioned = sorted((i for i in items if i[0] is not None), key=lambda i: (i[0], i[1]))
+        group: List[ContextSpan] = []
+        for start, rank, text in positioned:
+            if group and _merge_positioned(group[-1], start, text, adjacency_gap, min_overlap, max_overlap):
+                group[-1].rank = min(group[-1].rank, rank)
+                continue
+            group.append(ContextSpan(source, page, start, text, rank, unit))
+
+        for start, rank, text in (i for i in items if i[0] is None):
+            if _merge_unpositioned(group, text, min_overlap, max_overlap):
+                continue
+            group.append(ContextSpan(source, page, None, text, rank, unit))
+        spans.extend(group)
+
+    group_rank: Dict[Tuple[Any, Any, Any], int] = {}
+    for s in spans:
+        key = (s.source, s.page, s.unit)
+        group_rank[key] = min(group_rank.get(key, s.rank), s.rank)
+
+    spans.sort(key=lambda s: (
+        group_rank[(s.source, s.page, s.unit)],
+        s.start is None,
+        s.start if s.start is not None else s.rank,
+    ))
+    return spans
+
+
+def format_context(spans: Iterable[ContextSpan]) -> str:
+    return "\n\n".join(s.text for s in spans)
+
+
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)|\n")
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Cheap, provider-agnostic token estimate (~4 chars/token for English prose)."""
+    if not text:
+        return 0
+    return max(1, int(round(len(text) / chars_per_token)))
+
+
+def truncate_at_sentence(text: str, max_chars: int) -> str:
+    """Cut `text` to at most `max_chars`, ending on the last full sentence that fits."""
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+    end = 0
+    for m in _SENTENCE_END.finditer(text, 0, max_chars):
+        end = m.end()
+    return text[:end].rstrip()
+
+
+def pack_context(
+    spans: List[ContextSpan],
+    max_tokens: int,
+    *,
+    chars_per_token: float = 4.0,
+    min_span_tokens: int = 16,
+) -> Tuple[List[ContextSpan], Dict[str, int]]:
+    """
+    Fill a token budget with spans in rank order, truncating the span that overflows at a
+    sentence boundary. Packed spans keep their incoming (document) order.
+
+    Returns the packed spans and a stats dict with packed/dropped token and span counts.
+    """
+    stats = {
+        "budget_tokens": max_tokens,
+        "packed_tokens": 0,
+        "dropped_tokens": 0,
+        "spans_packed": 0,
+        "spans_dropped": 0,
+        "spans_truncated": 0,
+    }
+    keep: Dict[int, ContextSpan] = {}
+    remaining = max_tokens
+    for idx in sorted(range(len(spans)), key=lambda i: spans[i].rank):
+        span = spans[idx]
+        tokens = estimate_tokens(span.text, chars_per_token)
+        if tokens <= remaining:
+            keep[idx] = span
+            remaining -= tokens
+            stats["packed_tokens"] += tokens
+            continue
+
+        text = truncate_at_sentence(span.text, int(remaining * chars_per_token)) if remaining >= min_span_tokens else ""
+        used = estimate_tokens(text, chars_per_token)
+        if not text or used > remaining:
+            stats["dropped_tokens"] += tokens
+            stats["spans_dropped"] += 1
+            continue
+        cut = ContextSpan(span.source, span.page, span.start, text, span.rank, span.unit)
+        cut.chunks = span.chunks
+        keep[idx] = cut
+        remaining -= used
+        stats["packed_tokens"] += used
+        stats["dropped_tokens"] += tokens - used
+        stats["spans_truncated"] += 1
+
+    stats["spans_packed"] = len(keep)
+    return [keep[i] for i in sorted(keep)], stats
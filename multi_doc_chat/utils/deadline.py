@@ -0,0 +1,50 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from multi_doc_chat.exceptions.custom_exception import DeadlineExceeded
+
+# Absolute deadline (time.monotonic()) of the current request; copied into worker threads
+# and tasks started from the request context.
+_deadline: ContextVar[Optional[float]] = ContextVar("mdc_request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Bound all work in this context to `seconds` from now (nested scopes only tighten)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    new = time.monotonic() + float(seconds)
+    current = _deadline.get()
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (None when unbounded)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(stage: str):
+    """Raise DeadlineExceeded if the current deadline has already passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(stage)
+
+
+def timeout_for(stage: str, default: Optional[float]) -> Optional[float]:
+    """Timeout for an upstream call: `default`, capped by the time left on the deadline."""
+    check(stage)
+    left = remaining()
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
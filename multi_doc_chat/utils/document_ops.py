@@ -1,31 +1,124 @@
 from pathlib import Path
-from typing import List, Iterable
+from typing import Callable, Dict, Iterator, List, Iterable, Optional
 from langchain_core.documents import Document
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
+from langchain_community.document_loaders import TextLoader
 from multi_doc_chat.logger import GLOBAL_LOGGER as log
 from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
+from multi_doc_chat.utils.config_loader import load_config
+from multi_doc_chat.utils.pdf_backends import iter_pdf_documents
+from multi_doc_chat.utils.tabular_loaders import TABULAR_EXTENSIONS, iter_tabular_documents
+from multi_doc_chat.utils.sqlite_loader import SQLITE_EXTENSIONS, iter_sqlite_documents
+from multi_doc_chat.utils.text_loader import iter_text_documents
+from multi_doc_chat.utils.structured_loaders import (
+    iter_docx_documents,
+    iter_markdown_documents,
+    iter_pptx_documents,
+)
 
-SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+# A parser yields documents for one file. It receives the path plus keyword options:
+#   chunk_chars: target chunk size (for loaders that pre-group content)
+#   chunk_overlap: overlap for loaders that pre-split content themselves
+#   source:      logical source name (original upload name), may be None
+#   options:     the `parsers` config section
+Parser = Callable[..., Iterator[Document]]
+PARSERS: Dict[str, Parser] = {}
 
 
-def load_documents(paths: Iterable[Path]) -> List[Document]:
+def register_parser(*extensions: str):
+    """Register a parser for one or more extensions (later registrations win)."""
+
+    def _register(fn: Parser) -> Parser:
+        for ext in extensions:
+            PARSERS[ext.lower()] = fn
+        return fn
+
+    return _register
+
+
+@register_parser(".pdf")
+def _parse_pdf(path: Path, *, options: Dict, **_) -> Iterator[Document]:
+    return iter_pdf_documents(path, backend=options.get("pdf_backend", "auto"))
+
+
+@register_parser(".docx")
+def _parse_docx(path: Path, *, chunk_chars: int, **_) -> Iterator[Document]:
+    return iter_docx_documents(path, chunk_chars=chunk_chars)
+
+
+@register_parser(".txt")
+def _parse_txt(path: Path, *, chunk_chars: int, chunk_overlap: int, options: Dict, **_) -> Iterator[Document]:
+    # Large files are memory-mapped and pre-split instead of read into one Document
+    threshold = float(options.get("mmap_text_min_mb", 16)) * 1024 * 1024
+    if path.stat().st_size >= threshold:
+        return iter_text_documents(path, chunk_chars=chunk_chars, chunk_overlap=chunk_overlap)
+    return TextLoader(str(path), encoding="utf-8").lazy_load()
+
+
+@register_parser(".pptx")
+def _parse_pptx(path: Path, *, chunk_chars: int, **_) -> Iterator[Document]:
+    return iter_pptx_documents(path, chunk_chars=chunk_chars)
+
+
+@register_parser(".md")
+def _parse_markdown(path: Path, *, chunk_chars: int, **_) -> Iterator[Document]:
+    return iter_markdown_documents(path, chunk_chars=chunk_chars)
+
+
+@register_parser(*TABULAR_EXTENSIONS)
+def _parse_tabular(path: Path, *, chunk_chars: int, **_) -> Iterator[Document]:
+    return iter_tabular_documents(path, chunk_chars=chunk_chars)
+
+
+@register_parser(*SQLITE_EXTENSIONS)
+def _parse_sqlite(path: Path, *, source: Optional[str], **_) -> Iterator[Document]:
+    # Logical source keeps row keys stable across uploads of an updated database
+    return iter_sqlite_documents(path, source=source)
+
+
+SUPPORTED_EXTENSIONS = set(PARSERS)
+
+
+def _parser_options() -> Dict:
+    try:
+        return load_config().get("parsers", {}) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def iter_documents(
+    paths: Iterable[Path],
+    chunk_chars: int = 1000,
+    sources: Optional[Dict[str, str]] = None,
+    chunk_overlap: int = 200,
+) -> Iterator[Document]:
+    """
+    Yield docs file by file using the parser registered for each extension. Parsers are
+    lazy (per page / row group / section), so downstream work can start before a file is
+    fully parsed. `sources` maps path -> original file name.
+    """
+    sources = sources or {}
+    options = _parser_options()
+    for p in paths:
+        parser = PARSERS.get(p.suffix.lower())
+        if parser is None:
+            log.warning("Unsupported extension skipped", path=str(p))
+            continue
+        yield from parser(
+            p, chunk_chars=chunk_chars, chunk_overlap=chunk_overlap, source=sources.get(str(p)), options=options
+        )
+
+
+def load_documents(
+    paths: Iterable[Path],
+    chunk_chars: int = 1000,
+    sources: Optional[Dict[str, str]] = None,
+    chunk_overlap: int = 200,
+) -> List[Document]:
     """Load docs using appropriate loader based on extension."""
-    docs: List[Document] = []
     try:
-        for p in paths:
-            ext = p.suffix.lower()
-            if ext == ".pdf":
-                loader = PyPDFLoader(str(p))
-            elif ext == ".docx":
-                loader = Docx2txtLoader(str(p))
-            elif ext == ".txt":
-                loader = TextLoader(str(p), encoding="utf-8")
-            else:
-                log.warning(f"Unsupported extension skipped. path={str(p)}")
-                continue
-            docs.extend(loader.load())
-        log.info(f"Documents loaded. count={len(docs)}")
+        docs = list(iter_documents(paths, chunk_chars=chunk_chars, sources=sources, chunk_overlap=chunk_overlap))
+        log.info("Documents loaded", count=len(docs))
         return docs
     except Exception as e:
-        log.error(f"Failed loading documents: {e}")
+        log.error("Failed loading documents", error=str(e))
         raise DocumentPortalException("Error loading documents", e) from e
@@ -3,7 +3,7 @@ from __future__ import annotations
 import re
 import uuid
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 from multi_doc_chat.logger.custom_logger import CustomLogger
 from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
 
@@ -13,43 +13,54 @@ SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".pptx", ".md", ".csv", ".xlsx"
 log = CustomLogger().get_logger(__name__)
 
 
+def uploaded_file_name(uf) -> str:
+    # Handle Starlette UploadFile (has .filename and .file) and generic objects (have .name)
+    return getattr(uf, "filename", getattr(uf, "name", "file"))
+
+
+def read_uploaded_file(uf) -> bytes:
+    """Read the full payload of an uploaded file object (UploadFile, file handle or getbuffer())."""
+    # Prefer underlying file buffer when available (e.g., Starlette UploadFile.file)
+    if hasattr(uf, "file") and hasattr(uf.file, "read"):
+        return uf.file.read()
+    if hasattr(uf, "read"):
+        data = uf.read()
+    else:
+        # Fallback for objects exposing a getbuffer()
+        buf = getattr(uf, "getbuffer", None)
+        if not callable(buf):
+            raise ValueError("Unsupported uploaded file object; no readable interface")
+        data = buf()
+    # If a memoryview is returned, convert to bytes; otherwise assume bytes
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return data
+
+
+def iter_supported_uploads(uploaded_files: Iterable) -> Iterable[Tuple[str, str, object]]:
+    """Yield (name, ext, file) for uploads with a supported extension; log and skip the rest."""
+    for uf in uploaded_files:
+        name = uploaded_file_name(uf)
+        ext = Path(name).suffix.lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            log.warning("Unsupported file skipped", filename=name)
+            continue
+        yield name, ext, uf
+
+
 def save_uploaded_files(uploaded_files: Iterable, target_dir: Path) -> List[Path]:
     """Save uploaded files (Streamlit-like) and return local paths."""
     try:
         target_dir.mkdir(parents=True, exist_ok=True)
         saved: List[Path] = []
-        for uf in uploaded_files:
-            # Handle Starlette UploadFile (has .filename and .file) and generic objects (have .name)
-            name = getattr(uf, "filename", getattr(uf, "name", "file"))
-            ext = Path(name).suffix.lower()
-            if ext not in SUPPORTED_EXTENSIONS:
-                log.warning("Unsupported file skipped", filename=name)
-                continue
+        for name, ext, uf in iter_supported_uploads(uploaded_files):
             # Clean file name (only alphanum, dash, underscore)
             safe_name = re.sub(r'[^a-zA-Z0-9_\-]', '_', Path(name).stem).lower()
             fname = f"{safe_name}_{uuid.uuid4().hex[:6]}{ext}"
             fname = f"{uuid.uuid4().hex[:8]}{ext}"
             out = target_dir / fname
             with open(out, "wb") as f:
-                # Prefer underlying file buffer when available (e.g., Starlette UploadFile.file)
-                if hasattr(uf, "file") and hasattr(uf.file, "read"):
-                    f.write(uf.file.read())
-                elif hasattr(uf, "read"):
-                    data = uf.read()
-                    # If a memoryview is returned, convert to bytes; otherwise assume bytes
-                    if isinstance(data, memoryview):
-                        data = data.tobytes()
-                    f.write(data)
-                else:
-                    # Fallback for objects exposing a getbuffer()
-                    buf = getattr(uf, "getbuffer", None)
-                    if callable(buf):
-                        data = buf()
-                        if isinstance(data, memoryview):
-                            data = data.tobytes()
-                        f.write(data)
-                    else:
-                        raise ValueError("Unsupported uploaded file object; no readable interface")
+                f.write(read_uploaded_file(uf))
             saved.append(out)
             log.info("File saved for ingestion", uploaded=name, saved_as=str(out))
         return saved
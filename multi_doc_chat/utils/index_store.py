@@ -0,0 +1,124 @@
+from __future__ import annotations
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+# Versioned index layout (per session or per shared corpus):
+#   <index_dir>/CURRENT          -> "v000007"
+#   <index_dir>/v000007/          index.faiss, index.pkl, ingested_meta.json
+#   <index_dir>/.lock             writer lock file
+# Directories written before versioning (files directly in <index_dir>) read as version 0.
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+KEEP_VERSIONS = 3
+
+_THREAD_LOCKS: Dict[str, threading.Lock] = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+def _thread_lock(path: Path) -> threading.Lock:
+    with _THREAD_LOCKS_GUARD:
+        return _THREAD_LOCKS.setdefault(str(path.resolve()), threading.Lock())
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock across threads (in-process lock) and processes (OS file lock)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _thread_lock(path):
+        with open(path, "a+b") as fh:
+            if os.name == "nt":
+                import msvcrt
+
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def index_lock(index_dir: Path):
+    return file_lock(Path(index_dir) / LOCK_FILE)
+
+
+def _version_name(version: int) -> str:
+    return f"v{version:06d}"
+
+
+def current_version(index_dir: Path) -> int:
+    """Published version number of an index directory (0 for legacy/unversioned)."""
+    pointer = Path(index_dir) / CURRENT_FILE
+    try:
+        return int(pointer.read_text(encoding="utf-8").strip().lstrip("v"))
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def current_version_dir(index_dir: Path) -> Path:
+    """Directory holding the currently published snapshot (index_dir itself when legacy)."""
+    index_dir = Path(index_dir)
+    version = current_version(index_dir)
+    if version:
+        return index_dir / _version_name(version)
+    return index_dir
+
+
+def publish_version(index_dir: Path, write: Callable[[Path], None]) -> int:
+    """
+    Stage a new snapshot with `write(stage_dir)` and make it current atomically.
+
+    The caller must hold `index_lock(index_dir)`. Readers resolving CURRENT before the swap
+    keep loading the previous complete snapshot; the last KEEP_VERSIONS are retained.
+    """
+    index_dir = Path(index_dir)
+    version = current_version(index_dir) + 1
+    stage = index_dir / f".stage-{uuid.uuid4().hex[:8]}"
+    stage.mkdir(parents=True)
+    try:
+        write(stage)
+        final = index_dir / _version_name(version)
+        if final.exists():
+            shutil.rmtree(final)
+        os.replace(stage, final)
+    except BaseException:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+
+    pointer_tmp = index_dir / f".{CURRENT_FILE}.{uuid.uuid4().hex[:8]}"
+    pointer_tmp.write_text(_version_name(version), encoding="utf-8")
+    os.replace(pointer_tmp, index_dir / CURRENT_FILE)
+
+    _prune(index_dir, version)
+    return version
+
+
+def _prune(index_dir: Path, version: int):
+    for p in index_dir.iterdir():
+        if not p.is_dir() or not p.name.startswith("v"):
+            continue
+        try:
+            n = int(p.name[1:])
+        except ValueError:
+            continue
+        if n <= version - KEEP_VERSIONS:
+            shutil.rmtree(p, ignore_errors=True)
+    # Legacy (pre-versioning) files at the root are superseded once a version is published
+    for name in ("index.faiss", "index.pkl", "ingested_meta.json"):
+        legacy = index_dir / name
+        if legacy.exists():
+            legacy.unlink()
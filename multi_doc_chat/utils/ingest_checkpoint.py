@@ -0,0 +1,188 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.blob_store import _atomic_write_text
+from multi_doc_chat.utils.metrics import REGISTRY
+
+CHECKPOINT_DIR = "_ingest_checkpoint"
+STATE_FILE = "job.json"
+BATCH_DIR = "batches"
+
+CHECKPOINT_BATCHES = REGISTRY.counter(
+    "mdc_ingest_checkpoint_batches_total", "Embedding batches by source (embedded, resumed)."
+)
+
+DEFAULT_CHECKPOINT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "batch_size": 64,
+}
+
+Embed = Callable[[List[str]], List[List[float]]]
+Vector = Optional[List[float]]
+
+
+class IngestCheckpoint:
+    """
+    Resumable state of one ingestion job, kept under the session's data directory:
+
+        _ingest_checkpoint/job.json             job key, saved files, spooled batches, finished files
+        _ingest_checkpoint/batches/000007.json  chunks of one batch (after normalize/split/dedup)
+        _ingest_checkpoint/batches/000007.npy   their vectors (chunks already indexed have none)
+        _ingest_checkpoint/vectors/             one .npy per completed embedding call
+
+    Ingestion streams through this spool: each bounded batch of chunks is embedded and
+    written here, and the index is assembled from the spool once every file is done, so a
+    job never holds all of its documents, chunks or vectors in memory. A job is identified by
+    its files (content hash, or path and size) and the chunking parameters; a different job
+    replaces the checkpoint. On restart finished files are not parsed again, the file in
+    progress skips the batches already spooled, and an interrupted batch reuses each
+    embedding call it completed (stored under the hash of its texts). The checkpoint is
+    removed once the index has been published.
+    """
+
+    def __init__(self, root: str | Path, batch_size: int = 64):
+        self.root = Path(root)
+        self.batch_size = max(1, int(batch_size))
+        self.state: Dict[str, Any] = self._read_state()
+
+    @staticmethod
+    def job_key(files: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        ids = sorted(f["sha256"] or f"{f['path']}:{os.path.getsize(f['path'])}" for f in files)
+        payload = json.dumps({"files": ids, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.root / STATE_FILE).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_state(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(self.root / STATE_FILE, json.dumps(self.state, indent=2))
+
+    @property
+    def files(self) -> List[Dict[str, Any]]:
+        """Saved files of the interrupted job (empty when there is none)."""
+        return list(self.state.get("files", []))
+
+    @property
+    def batches(self) -> List[Dict[str, Any]]:
+        """Spooled batches: source path, chunk count, vectors stored, lost chunks to another source."""
+        return list(self.state.get("batches", []))
+
+    def begin(self, job: str, files: List[Dict[str, Any]]):
+        """Start `job`, discarding a checkpoint left by a different one."""
+        if self.state.get("job") == job:
+            return
+        self.clear()
+        self.state = {"job": job, "files": files, "batches": [], "done": []}
+        self._write_state()
+
+    # ---------- progress cursor ----------
+
+    def is_done(self, path: str) -> bool:
+        return path in self.state.get("done", [])
+
+    def batch_count(self, path: str) -> int:
+        return sum(1 for b in self.state.get("batches", []) if b["path"] == path)
+
+    def file_done(self, path: str):
+        """Mark every batch of `path` as spooled; a resumed job will not parse it again."""
+        self.state.setdefault("done", []).append(path)
+        self._write_state()
+
+    # ---------- spool ----------
+
+    def save_batch(self, path: str, chunks: List[Document], vectors: List[Vector], cross_source: bool = False):
+        """Spool one batch of `path` (vectors aligned with chunks, None where not needed)."""
+        import numpy as np
+
+        batches = self.state.setdefault("batches", [])
+        name = f"{len(batches) + 1:06d}"
+        batch_dir = self.root / BATCH_DIR
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        stored = [v for v in vectors if v is not None]
+        if stored:
+            tmp = batch_dir / f".{name}.npy.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.asarray(stored, dtype="float32"))
+            os.replace(tmp, batch_dir / f"{name}.npy")
+        items = [{"text": c.page_content, "metadata": c.metadata, "vector": v is not None}
+                 for c, v in zip(chunks, vectors)]
+        _atomic_write_text(batch_dir / f"{name}.json", json.dumps(items, ensure_ascii=False))
+        batches.append({"path": path, "chunks": len(chunks), "vectors": len(stored), "cross_source": cross_source})
+        self._write_state()
+
+    def iter_batches(self, path: Optional[str] = None) -> Iterator[Tuple[List[Document], List[Vector]]]:
+        """Read spooled batches back one at a time (only those of `path`, if given)."""
+        import numpy as np
+
+        batch_dir = self.root / BATCH_DIR
+        for n, batch in enumerate(self.state.get("batches", []), start=1):
+            if path is not None and batch["path"] != path:
+                continue
+            items = json.loads((batch_dir / f"{n:06d}.json").read_text(encoding="utf-8"))
+            stored = iter(np.load(batch_dir / f"{n:06d}.npy").tolist() if batch["vectors"] else ())
+            docs = [Document(page_content=i["text"], metadata=i["metadata"]) for i in items]
+            yield docs, [next(stored) if i["vector"] else None for i in items]
+
+    # ---------- embedding ----------
+
+    def embed(self, emb, texts: List[str]) -> List[List[float]]:
+        """Embed `texts` in calls of `batch_size`, persisting each finished call's vectors."""
+        import numpy as np
+
+        vectors_dir = self.root / "vectors"
+        vectors_dir.mkdir(parents=True, exist_ok=True)
+        out: List[List[float]] = []
+        resumed = 0
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            digest = hashlib.sha256("\x1e".join(batch).encode("utf-8", "surrogatepass")).hexdigest()[:32]
+            path = vectors_dir / f"{digest}.npy"
+            vectors = None
+            if path.exists():
+                try:
+                    vectors = np.load(path).tolist()
+                except (OSError, ValueError):
+                    vectors = None
+                if vectors is not None and len(vectors) != len(batch):
+                    vectors = None
+            if vectors is not None:
+                resumed += 1
+                CHECKPOINT_BATCHES.inc(source="resumed")
+            else:
+                vectors = emb.embed_documents(batch)
+                tmp = path.with_name(f".{path.name}.tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, np.asarray(vectors, dtype="float32"))
+                os.replace(tmp, path)
+                CHECKPOINT_BATCHES.inc(source="embedded")
+            out.extend(vectors)
+        if resumed:
+            log.info("Embedding resumed from checkpoint", batches_reused=resumed, texts=len(texts))
+        return out
+
+    def embedder(self, emb) -> Embed:
+        return lambda texts: self.embed(emb, texts)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.state = {}
+
+
+def get_checkpoint(data_dir: Path, settings: Optional[Dict[str, Any]]) -> Optional[IngestCheckpoint]:
+    """Checkpoint for a session data dir from the `ingestion.checkpoint` config; None when disabled."""
+    cfg = {**DEFAULT_CHECKPOINT_SETTINGS, **(settings or {})}
+    if not cfg.get("enabled"):
+        return None
+    return IngestCheckpoint(Path(data_dir) / CHECKPOINT_DIR, batch_size=cfg["batch_size"])
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets (seconds) tuned for LLM/embedding calls: 5ms .. 60s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {v:g}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def snapshot(self, **labels) -> Dict[str, float]:
+        series = self._series.get(_label_key(labels))
+        if not series:
+            return {"count": 0, "sum": 0.0}
+        return {"count": sum(series[:-1]), "sum": series[-1]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', f'{bound:g}'))} {cumulative:g}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {cumulative:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Minimal in-process metrics registry rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "mdc_stage_latency_seconds", "Latency of pipeline stages (chat chain and ingestion)."
+)
+STAGE_CALLS = REGISTRY.counter(
+    "mdc_stage_calls_total", "Pipeline stage executions by outcome."
+)
+
+
+class TimingRecord:
+    """Per-request collection of stage timings (one structured record per request)."""
+
+    def __init__(self, kind: str, **fields):
+        self.kind = kind
+        self.fields: Dict[str, Any] = dict(fields)
+        self.spans: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, ok: bool):
+        with self._lock:
+            self.spans.append({"stage": stage, "ms": round(seconds * 1000.0, 2), "ok": ok})
+
+    def stage_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            totals[s["stage"]] = round(totals.get(s["stage"], 0.0) + s["ms"], 2)
+        return totals
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            **self.fields,
+            "total_ms": round((time.perf_counter() - self._t0) * 1000.0, 2),
+            "stages": self.stage_totals(),
+        }
+
+    def server_timing(self) -> str:
+        """Render as an HTTP `Server-Timing` header value."""
+        return ", ".join(f"{stage.replace('.', '_')};dur={ms}" for stage, ms in self.stage_totals().items())
+
+
+_current_record: ContextVar[Optional[TimingRecord]] = ContextVar("mdc_timing_record", default=None)
+
+
+@contextmanager
+def request_record(kind: str, **fields) -> Iterator[TimingRecord]:
+    """Bind a TimingRecord to the current context so nested spans are collected into it."""
+    record = TimingRecord(kind, **fields)
+    token = _current_record.set(record)
+    try:
+        yield record
+    finally:
+        _current_record.reset(token)
+
+
+def current_record() -> Optional[TimingRecord]:
+    return _current_record.get()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a stage: feeds the latency histogram/counters and the current request record."""
+    t0 = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_LATENCY.observe(elapsed, stage=stage)
+        STAGE_CALLS.inc(stage=stage, outcome="ok" if ok else "error")
+        record = _current_record.get()
+        if record is not None:
+            record.add(stage, elapsed, ok)
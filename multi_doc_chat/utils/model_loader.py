@@ -22,15 +22,15 @@ class ApiKeyManager:
             env_val = os.getenv(key)
             if env_val:
                 self.api_keys[key] = env_val
-                log.info(f"Loaded {key} from env var")
+                log.info("Loaded API key from env var", key=key)
 
         missing = [k for k in self.REQUIRED_KEYS if not self.api_keys.get(k)]
         if missing:
-            log.error(f"Missing required API keys: {missing}")
+            log.error("Missing required API keys", missing=missing)
             raise DocumentPortalException("Missing API keys", missing)
 
         masked_keys = {k: v[:6] + "..." for k, v in self.api_keys.items()}
-        log.info(f"API keys loaded: {masked_keys}")
+        log.info("API keys loaded", keys=masked_keys)
 
     def get(self, key: str) -> str:
         val = self.api_keys.get(key)
@@ -39,27 +39,32 @@ class ApiKeyManager:
         return val
 
 
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+
 class ModelLoader:
-    """Loads embedding models and LLMs from OpenRouter."""
+    """Loads embedding models and LLMs from OpenRouter (or any OpenAI-compatible base_url)."""
 
     def __init__(self):
         self.api_key_mgr = ApiKeyManager()
         self.config = load_config()
-        log.info(f"YAML config loaded. Keys: {list(self.config.keys())}")
+        log.info("YAML config loaded", keys=list(self.config.keys()))
 
     def load_embeddings(self):
         """Return a LangChain Embeddings object that calls OpenRouter (Qwen)."""
         try:
-            model_name = self.config["embedding_model"]["model_name"]
+            emb_config = self.config["embedding_model"]
+            model_name = emb_config["model_name"]
+            base_url = emb_config.get("base_url") or DEFAULT_BASE_URL
             api_key = self.api_key_mgr.get("OPENROUTER_API_KEY")
-            log.info(f"Loading embedding model: {model_name}")
+            log.info("Loading embedding model", model=model_name, base_url=base_url)
             return OpenRouterEmbeddingsClient(
                 model=model_name,
                 api_key=api_key,
-                base_url="https://openrouter.ai/api/v1",
+                base_url=base_url,
             )
         except Exception as e:
-            log.error(f"Error loading embedding model: {e}")
+            log.error("Error loading embedding model", error=str(e))
             raise DocumentPortalException("Failed to load embedding model", e)
 
     def load_llm(self):
@@ -68,25 +73,26 @@ class ModelLoader:
             llm_block = self.config["llm"]
             provider_key = os.getenv("LLM_PROVIDER", "openrouter")
             if provider_key not in llm_block:
-                log.error(f"LLM provider not found in config: {provider_key}")
+                log.error("LLM provider not found in config", provider=provider_key)
                 raise ValueError(f"LLM provider '{provider_key}' not found in config")
 
             llm_config = llm_block[provider_key]
             model_name = llm_config.get("model_name")
             temperature = llm_config.get("temperature", 0)
             max_tokens = llm_config.get("max_output_tokens", 2048)
+            base_url = llm_config.get("base_url") or DEFAULT_BASE_URL
 
-            log.info(f"Loading LLM (provider=openrouter, model={model_name})")
+            log.info("Loading LLM", provider=provider_key, model=model_name, base_url=base_url)
 
             return ChatOpenAI(
                 model=model_name,
                 api_key=self.api_key_mgr.get("OPENROUTER_API_KEY"),
-                base_url="https://openrouter.ai/api/v1",
+                base_url=base_url,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
         except Exception as e:
-            log.error(f"Error loading LLM: {e}")
+            log.error("Error loading LLM", error=str(e))
             raise DocumentPortalException("Failed to load LLM", e)
 
 
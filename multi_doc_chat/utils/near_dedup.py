@@ -0,0 +1,230 @@
+from __future__ import annotations
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.utils.metrics import REGISTRY
+
+DEDUP_CHUNKS_REMOVED = REGISTRY.counter(
+    "mdc_dedup_chunks_removed_total", "Chunks dropped as near duplicates before embedding."
+)
+DEDUP_TOKENS_SAVED = REGISTRY.counter(
+    "mdc_dedup_tokens_saved_total", "Estimated embedding tokens saved by near-duplicate removal."
+)
+
+DEFAULT_NEAR_DEDUP_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    # Estimated Jaccard similarity of word shingles at or above which a chunk is a duplicate
+    "threshold": 0.85,
+    # drop: discard duplicates; merge: also record where they occurred on the kept chunk
+    "mode": "drop",
+    "shingle_words": 3,
+    "num_perm": 128,
+    "bands": 16,
+    "chars_per_token": 4,
+    "cost_per_1k_tokens": 0.0,
+}
+
+_WORD = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+_MAX_ALSO_IN = 20
+
+
+class _LSHIndex:
+    """
+    Signatures of kept chunks, banded into LSH buckets. One index can serve successive
+    `NearDuplicateFilter.filter` calls, so a stream of batches is deduplicated as a whole.
+    Only each kept chunk's signature and metadata are retained, never its text.
+    """
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.reps: List[Tuple[Any, Dict[str, Any]]] = []
+
+    def _keys(self, sig) -> List[bytes]:
+        return [sig[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def match(self, sig, threshold: float) -> Optional[int]:
+        import numpy as np
+
+        candidates = set()
+        for band, key in enumerate(self._keys(sig)):
+            candidates.update(self.buckets[band].get(key, ()))
+        best, best_sim = None, threshold
+        for idx in sorted(candidates):
+            sim = float(np.count_nonzero(self.reps[idx][0] == sig)) / len(sig)
+            if sim >= best_sim:
+                best, best_sim = idx, sim
+        return best
+
+    def add(self, sig, metadata: Dict[str, Any]):
+        idx = len(self.reps)
+        self.reps.append((sig, metadata))
+        for band, key in enumerate(self._keys(sig)):
+            self.buckets[band].setdefault(key, []).append(idx)
+
+
+class NearDuplicateFilter:
+    """
+    MinHash LSH over word shingles. Each chunk gets a `num_perm` MinHash signature, split
+    into `bands` bands; chunks sharing any band bucket are candidates, and a candidate is a
+    duplicate when the signatures agree on at least `threshold` of their positions (the
+    MinHash estimate of Jaccard similarity). Chunks are visited in order, so the first
+    occurrence is the one kept. Row documents (tabular/SQLite, `row_id` metadata) are never
+    filtered: similar rows are distinct records.
+
+    Streaming ingestion filters batch by batch through one `index()`. Duplicates of earlier
+    batches are still dropped, but in merge mode `also_in` can only be recorded on a kept
+    chunk of the same batch (earlier batches have already been embedded and spooled).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        mode: str = "drop",
+        shingle_words: int = 3,
+        num_perm: int = 128,
+        bands: int = 16,
+        chars_per_token: float = 4,
+        cost_per_1k_tokens: float = 0.0,
+        seed: int = 1,
+    ):
+        import numpy as np
+
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        if mode not in ("drop", "merge"):
+            raise ValueError(f"Unknown near-duplicate mode '{mode}' (drop or merge)")
+        self.threshold = float(threshold)
+        self.mode = mode
+        self.shingle_words = max(1, int(shingle_words))
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self.chars_per_token = float(chars_per_token) or 4.0
+        self.cost_per_1k_tokens = float(cost_per_1k_tokens)
+        rng = np.random.default_rng(seed)
+        # a*h + b stays below 2**63 for 32-bit shingle hashes
+        self._a = rng.integers(1, 1 << 31, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str):
+        import numpy as np
+
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+        tokens = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+        k = min(self.shingle_words, len(tokens))
+        # Combine k consecutive word hashes into one 32-bit shingle hash
+        shingles = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+        for i in range(k):
+            shingles = (shingles * np.uint64(1_000_003) + tokens[i:len(tokens) - k + 1 + i]) & np.uint64(0xFFFFFFFF)
+        shingles = np.unique(shingles)
+        hashed = (np.outer(shingles, self._a) + self._b) % np.uint64(_PRIME)
+        return hashed.min(axis=0)
+
+    def settings(self) -> Dict[str, Any]:
+        """Settings that change which chunks survive (part of the chunk-cache key)."""
+        return {"threshold": self.threshold, "mode": self.mode, "shingle_words": self.shingle_words,
+                "num_perm": self.num_perm, "bands": self.bands}
+
+    def index(self, seen: Sequence[Document] = ()) -> _LSHIndex:
+        """Empty LSH index, seeded with chunks already embedded (`remember`)."""
+        index = _LSHIndex(self.bands, self.rows)
+        self.remember(index, seen)
+        return index
+
+    def remember(self, index: _LSHIndex, docs: Iterable[Document]):
+        """Add chunks that are kept as-is (e.g. from the chunk cache) to `index`."""
+        for doc in docs:
+            if "row_id" not in doc.metadata:
+                sig = self.signature(doc.page_content)
+                if sig is not None:
+                    index.add(sig, doc.metadata)
+
+    def filter(
+        self, chunks: List[Document], seen: Sequence[Document] = (), index: Optional[_LSHIndex] = None
+    ) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        Drop (or merge) near duplicates from `chunks`. `seen` are chunks already embedded
+        (e.g. from the chunk cache): they are kept as-is but new chunks duplicating them are
+        removed too. Pass the same `index` to successive calls to filter a stream of batches
+        (`seen` then goes into the index up front). Returns the kept chunks and a report.
+        """
+        if index is None:
+            index = self.index(seen)
+        kept: List[Document] = []
+        removed = chars_removed = 0
+        cross_source = set()
+        for doc in chunks:
+            sig = None if "row_id" in doc.metadata else self.signature(doc.page_content)
+            if sig is None:
+                kept.append(doc)
+                continue
+            match = index.match(sig, self.threshold)
+            if match is None:
+                index.add(sig, doc.metadata)
+                kept.append(doc)
+                continue
+            removed += 1
+            chars_removed += len(doc.page_content)
+            original = index.reps[match][1]
+            source = doc.metadata.get("source")
+            if source != original.get("source"):
+                cross_source.add(str(source))
+            if self.mode == "merge":
+                where = str(source) if doc.metadata.get("page") is None else f"{source}#{doc.metadata['page']}"
+                also_in = original.setdefault("also_in", [])
+                if where not in also_in and len(also_in) < _MAX_ALSO_IN:
+                    also_in.append(where)
+                original["near_duplicates"] = original.get("near_duplicates", 0) + 1
+
+        report = self._report(len(chunks), removed, chars_removed, cross_source)
+        if removed:
+            DEDUP_CHUNKS_REMOVED.inc(removed)
+            DEDUP_TOKENS_SAVED.inc(report["est_tokens_saved"])
+        return kept, report
+
+    def _report(self, chunks_in: int, removed: int, chars_removed: int, cross_source: Iterable[str]) -> Dict[str, Any]:
+        tokens = chars_removed / self.chars_per_token
+        return {
+            "chunks_in": chunks_in,
+            "chunks_removed": removed,
+            "chars_removed": chars_removed,
+            "est_tokens_saved": int(tokens),
+            "est_cost_saved": round(tokens / 1000 * self.cost_per_1k_tokens, 6),
+            # Sources that lost a chunk to a different source (their chunk set depends on the batch)
+            "cross_source": sorted(cross_source),
+        }
+
+    def merge_reports(self, total: Optional[Dict[str, Any]], report: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the reports of successive `filter` calls over one stream."""
+        if total is None:
+            return dict(report)
+        return self._report(
+            total["chunks_in"] + report["chunks_in"],
+            total["chunks_removed"] + report["chunks_removed"],
+            total["chars_removed"] + report["chars_removed"],
+            set(total["cross_source"]) | set(report["cross_source"]),
+        )
+
+
+def get_near_dedup(settings: Optional[Dict[str, Any]]) -> Optional[NearDuplicateFilter]:
+    """Filter built from the `ingestion.near_dedup` config section; None when disabled."""
+    cfg = {**DEFAULT_NEAR_DEDUP_SETTINGS, **(settings or {})}
+    if not cfg.get("enabled"):
+        return None
+    return NearDuplicateFilter(
+        threshold=cfg["threshold"],
+        mode=cfg["mode"],
+        shingle_words=cfg["shingle_words"],
+        num_perm=cfg["num_perm"],
+        bands=cfg["bands"],
+        chars_per_token=cfg["chars_per_token"],
+        cost_per_1k_tokens=cfg["cost_per_1k_tokens"],
+    )
@@ -1,7 +1,15 @@
 import requests
-from typing import List, Sequence
+from typing import Dict, List, Sequence
+from concurrent.futures import Future
 from langchain.embeddings.base import Embeddings
 
+from multi_doc_chat.utils.admission import get_gate
+from multi_doc_chat.utils.deadline import timeout_for
+from multi_doc_chat.utils.single_flight import SINGLE_FLIGHT_SAVED, Abandoned, SingleFlight
+
+# Shared by every client instance so identical texts in concurrent requests embed once
+_EMBED_FLIGHT = SingleFlight("embeddings")
+
 
 class OpenRouterEmbeddingsClient(Embeddings):
     """LangChain-compatible embeddings that call OpenRouter /embeddings endpoint."""
@@ -15,12 +23,15 @@ class OpenRouterEmbeddingsClient(Embeddings):
         self.timeout = timeout
 
     def _embed(self, inputs: Sequence[str]) -> List[List[float]]:
-        resp = requests.post(
-            f"{self.base_url}/embeddings",
-            headers={"Authorization": f"Bearer {self.api_key}"},
-            json={"model": self.model, "input": list(inputs)},
-            timeout=self.timeout,
-        )
+        # Bounded concurrency per upstream; ingestion runs at bulk priority behind chat
+        with get_gate("embeddings").slot():
+            resp = requests.post(
+                f"{self.base_url}/embeddings",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json={"model": self.model, "input": list(inputs)},
+                # Capped by the request deadline, if any
+                timeout=timeout_for("embeddings", self.timeout),
+            )
         resp.raise_for_status()
         data = resp.json()
         if "data" not in data or not isinstance(data["data"], list):
@@ -31,8 +42,49 @@ class OpenRouterEmbeddingsClient(Embeddings):
         return vectors
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return self._embed(texts)
+        """
+        Embed texts, sending each distinct text upstream at most once: duplicates within the
+        batch and texts already being embedded by a concurrent call reuse that result. Texts
+        whose concurrent call was abandoned (cancelled, timed out) are claimed and sent again.
+        """
+        unique = list(dict.fromkeys(texts))
+        if len(unique) < len(texts):
+            SINGLE_FLIGHT_SAVED.inc(len(texts) - len(unique), group="embeddings")
+
+        results: Dict[str, List[float]] = {}
+        pending = unique
+        while pending:
+            futures: Dict[str, Future] = {}
+            owned: List[str] = []
+            for text in pending:
+                fut, leader = _EMBED_FLIGHT.claim((self.base_url, self.model, text))
+                futures[text] = fut
+                if leader:
+                    owned.append(text)
+
+            if owned:
+                try:
+                    vectors = self._embed(owned)
+                    if len(vectors) != len(owned):
+                        raise ValueError(f"Expected {len(owned)} embeddings, got {len(vectors)}")
+                except BaseException as e:
+                    # Timeouts/cancellation release the texts to waiters instead of failing them
+                    for text in owned:
+                        _EMBED_FLIGHT.fail((self.base_url, self.model, text), e)
+                    raise
+                for text, vector in zip(owned, vectors):
+                    _EMBED_FLIGHT.resolve((self.base_url, self.model, text), vector)
+
+            retry: List[str] = []
+            for text, fut in futures.items():
+                try:
+                    # Bounded by this caller's deadline, not the leader's
+                    results[text] = _EMBED_FLIGHT.wait(fut)
+                except Abandoned:
+                    retry.append(text)
+            pending = retry
+
+        return [results[t] for t in texts]
 
     def embed_query(self, text: str) -> List[float]:
-        vectors = self._embed([text])
-        return vectors[0]
+        return self.embed_documents([text])[0]
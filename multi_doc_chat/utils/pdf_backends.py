@@ -0,0 +1,100 @@
+from __future__ import annotations
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+
+# Extract one page at a time: (page_index, text). Pages are produced lazily, so the
+# splitter/embedder can start on page 1 while later pages are still unread.
+PageIter = Iterator[Tuple[int, int, str]]  # (page_index, total_pages, text)
+
+
+def _pages_pymupdf(path: Path) -> PageIter:
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(path)) as pdf:
+        total = pdf.page_count
+        for i in range(total):
+            yield i, total, pdf.load_page(i).get_text("text")
+
+
+def _pages_pypdfium2(path: Path) -> PageIter:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        total = len(pdf)
+        for i in range(total):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield i, total, textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pages_pypdf(path: Path) -> PageIter:
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    total = len(reader.pages)
+    for i in range(total):
+        yield i, total, reader.pages[i].extract_text() or ""
+
+
+def _pages_langchain(path: Path) -> PageIter:
+    # Original loader (pypdf through LangChain); kept for output parity comparisons
+    from langchain_community.document_loaders import PyPDFLoader
+
+    for i, doc in enumerate(PyPDFLoader(str(path)).lazy_load()):
+        yield int(doc.metadata.get("page", i)), int(doc.metadata.get("total_pages", 0)), doc.page_content
+
+
+# name -> (importable module that must be present, page iterator); order = "auto" preference,
+# except "langchain", which "auto" only falls back to
+PDF_BACKENDS: Dict[str, Tuple[str, Callable[[Path], PageIter]]] = {
+    "pymupdf": ("fitz", _pages_pymupdf),
+    "pypdfium2": ("pypdfium2", _pages_pypdfium2),
+    "pypdf": ("pypdf", _pages_pypdf),
+    "langchain": ("langchain_community", _pages_langchain),
+}
+
+
+def available_pdf_backends() -> List[str]:
+    return [name for name, (module, _) in PDF_BACKENDS.items() if importlib.util.find_spec(module) is not None]
+
+
+def resolve_pdf_backend(name: str = "auto") -> str:
+    """Pick a configured backend, or the fastest installed one for "auto"."""
+    available = available_pdf_backends()
+    if name in (None, "", "auto"):
+        fast = [b for b in available if b != "langchain"]
+        if fast:
+            return fast[0]
+        if "langchain" in available:
+            log.warning("No fast PDF backend installed; falling back to PyPDFLoader",
+                        install="pypdfium2, pymupdf or pypdf")
+            return "langchain"
+        raise ImportError("No PDF backend installed (pymupdf, pypdfium2 or pypdf)")
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Choose from: auto, {', '.join(PDF_BACKENDS)}")
+    if name not in available:
+        raise ImportError(f"PDF backend '{name}' is not installed")
+    return name
+
+
+def iter_pdf_documents(path: Path, backend: str = "auto") -> Iterator[Document]:
+    """One Document per page, extracted lazily (metadata matches PyPDFLoader: 0-based page)."""
+    path = Path(path)
+    name = resolve_pdf_backend(backend)
+    for page, total, text in PDF_BACKENDS[name][1](path):
+        md = {"source": str(path), "page": page, "pdf_backend": name}
+        if total:
+            md["total_pages"] = total
+        yield Document(page_content=text, metadata=md)
@@ -0,0 +1,289 @@
+from __future__ import annotations
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.blob_store import BlobStore, ChunkCache
+from multi_doc_chat.utils.index_store import index_lock
+from multi_doc_chat.utils.metrics import REGISTRY, span
+from multi_doc_chat.utils.shared_index import compact_corpus, read_session_map, read_shared_ref, write_session_map
+
+GC_BYTES_RECLAIMED = REGISTRY.counter(
+    "mdc_gc_bytes_reclaimed_total", "Bytes deleted by the session reaper, by storage kind."
+)
+GC_SESSIONS_REAPED = REGISTRY.counter(
+    "mdc_gc_sessions_reaped_total", "Sessions deleted by the session reaper, by reason."
+)
+GC_VECTORS_PURGED = REGISTRY.counter(
+    "mdc_gc_vectors_purged_total", "Shared-corpus vectors purged after their last session was reaped."
+)
+GC_DISK_BYTES = REGISTRY.gauge(
+    "mdc_gc_disk_bytes", "Session storage in use after the last reaper sweep."
+)
+
+DEFAULT_GC_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "interval_seconds": 300,
+    "max_idle_hours": 24,
+    # 0 disables the quota; otherwise the least recently used sessions go first
+    "max_total_mb": 0,
+    "batch_size": 20,
+    "batch_pause_seconds": 0.5,
+    # Rewrite a shared corpus without unreferenced vectors once they are this share of it
+    "compact_min_orphan_ratio": 0.2,
+}
+
+
+def _dir_bytes(path: Path) -> int:
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except FileNotFoundError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return total
+
+
+class SessionReaper:
+    """
+    Deletes expired sessions: `data/<sid>`, `faiss_index/<sid>`, their blob references and
+    chunk-cache entries (once no other session uses the file), and any in-memory state via
+    `on_reap(sid)`.
+
+    A session expires when idle longer than `max_idle_hours` (last access is `touch()` in this
+    process, else the session directories' mtime); when usage exceeds `max_total_mb` the
+    least recently used sessions are removed too. Deletion runs in batches with a pause in
+    between, on a worker thread, so request handling is never blocked.
+
+    A session in a shared corpus is only detached from it; its vectors stay hidden from other
+    sessions until the corpus is compacted (`compact_min_orphan_ratio`), once per sweep.
+    """
+
+    def __init__(
+        self,
+        data_base: str | Path = "data",
+        faiss_base: str | Path = "faiss_index",
+        blob_store: Optional[BlobStore] = None,
+        chunk_cache: Optional[ChunkCache] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        is_busy: Optional[Callable[[str], bool]] = None,
+        on_reap: Optional[Callable[[str], None]] = None,
+    ):
+        self.data_base = Path(data_base)
+        self.faiss_base = Path(faiss_base)
+        self.blob_store = blob_store
+        self.chunk_cache = chunk_cache
+        self.settings = {**DEFAULT_GC_SETTINGS, **(settings or {})}
+        self.is_busy = is_busy or (lambda _sid: False)
+        self.on_reap = on_reap or (lambda _sid: None)
+        self._last_access: Dict[str, float] = {}
+        # Shared corpora that lost a session since the last compaction
+        self._detached: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ---------- access tracking ----------
+
+    def touch(self, session_id: str):
+        with self._lock:
+            self._last_access[session_id] = time.time()
+
+    def _last_used(self, session_id: str) -> float:
+        with self._lock:
+            seen = self._last_access.get(session_id, 0.0)
+        for d in (self.faiss_base / session_id, self.data_base / session_id):
+            try:
+                seen = max(seen, d.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+        return seen
+
+    def _session_ids(self) -> List[str]:
+        """Session directories under faiss_index/ (the shared corpus dir and dot-dirs excluded)."""
+        if not self.faiss_base.exists():
+            return []
+        with os.scandir(self.faiss_base) as it:
+            return [e.name for e in it if e.is_dir() and not e.name.startswith(("_", "."))]
+
+    # ---------- planning ----------
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Return [(session_id, reason)] to delete, idle sessions first, then quota (LRU)."""
+        now = now or time.time()
+        max_idle = float(self.settings["max_idle_hours"]) * 3600.0
+        quota = int(float(self.settings["max_total_mb"]) * 1024 * 1024)
+
+        sessions = [(sid, self._last_used(sid)) for sid in self._session_ids() if not self.is_busy(sid)]
+        victims: List[Tuple[str, str]] = []
+        keep: List[Tuple[str, float]] = []
+        for sid, last in sessions:
+            if max_idle > 0 and now - last > max_idle:
+                victims.append((sid, "idle"))
+            else:
+                keep.append((sid, last))
+
+        if quota > 0:
+            sizes = {sid: self.session_bytes(sid) for sid, _ in keep}
+            blobs = self.blob_store.references() if self.blob_store else {}
+            used = sum(sizes.values()) + sum(size for size, _ in blobs.values())
+            # Blobs of the idle victims are released too when their last owner goes
+            for sid, _ in victims:
+                used -= self._release_blobs(blobs, sid)
+            for sid, _ in sorted(keep, key=lambda x: x[1]):
+                if used <= quota:
+                    break
+                victims.append((sid, "quota"))
+                used -= sizes[sid] + self._release_blobs(blobs, sid)
+        return victims
+
+    @staticmethod
+    def _release_blobs(blobs: Dict[str, Tuple[int, List[str]]], session_id: str) -> int:
+        """Drop `session_id` from a references snapshot; returns bytes of blobs it was the last owner of."""
+        freed = 0
+        for digest, (size, owners) in list(blobs.items()):
+            if session_id in owners:
+                owners.remove(session_id)
+                if not owners:
+                    freed += size
+                    del blobs[digest]
+        return freed
+
+    def session_bytes(self, session_id: str) -> int:
+        return _dir_bytes(self.data_base / session_id) + _dir_bytes(self.faiss_base / session_id)
+
+    # ---------- deletion ----------
+
+    def reap(self, session_id: str, reason: str = "manual", compact: bool = True) -> Dict[str, int]:
+        """
+        Delete one session's on-disk and in-memory state. Returns bytes reclaimed by kind.
+        With `compact=False` a shared corpus it leaves is compacted by the next `compact()`.
+        """
+        reclaimed = {"data": 0, "index": 0, "blobs": 0, "chunk_cache": 0}
+        index_dir = self.faiss_base / session_id
+
+        ref = read_shared_ref(index_dir) if index_dir.exists() else None
+        if ref is not None:
+            # Shared corpus: only detach; vectors may still serve other sessions
+            corpus_dir = Path(ref["corpus_dir"])
+            with index_lock(corpus_dir):
+                sessions = read_session_map(corpus_dir)
+                if sessions.pop(session_id, None) is not None:
+                    write_session_map(corpus_dir, sessions)
+            with self._lock:
+                self._detached.add(str(corpus_dir))
+
+        if index_dir.exists():
+            reclaimed["index"] = _dir_bytes(index_dir)
+            with index_lock(index_dir):
+                shutil.rmtree(index_dir, ignore_errors=True)
+        data_dir = self.data_base / session_id
+        if data_dir.exists():
+            reclaimed["data"] = _dir_bytes(data_dir)
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        if self.blob_store is not None:
+            def _drop_cache(digest: str):
+                if self.chunk_cache is not None:
+                    reclaimed["chunk_cache"] += self.chunk_cache.drop(digest)
+
+            reclaimed["blobs"] = self.blob_store.release(session_id, on_delete=_drop_cache)
+
+        with self._lock:
+            self._last_access.pop(session_id, None)
+        self.on_reap(session_id)
+
+        for kind, n in reclaimed.items():
+            if n:
+                GC_BYTES_RECLAIMED.inc(n, kind=kind)
+        GC_SESSIONS_REAPED.inc(reason=reason)
+        log.info("Session reaped", session_id=session_id, reason=reason, **{f"{k}_bytes": v for k, v in reclaimed.items()})
+        if compact:
+            self.compact()
+        return reclaimed
+
+    def compact(self) -> int:
+        """Purge unreferenced vectors from shared corpora that lost sessions. Returns vectors purged."""
+        with self._lock:
+            corpora, self._detached = self._detached, set()
+        ratio = float(self.settings["compact_min_orphan_ratio"])
+        purged = 0
+        for corpus_dir in sorted(corpora):
+            try:
+                n = compact_corpus(corpus_dir, min_orphan_ratio=ratio)
+            except Exception as e:
+                log.warning("Shared corpus compaction failed", corpus_dir=corpus_dir, error=str(e))
+                continue
+            if n:
+                GC_VECTORS_PURGED.inc(n)
+                purged += n
+        return purged
+
+    def sweep(self) -> Dict[str, int]:
+        """One full pass: plan, then delete in batches with a pause between batches."""
+        batch_size = max(1, int(self.settings["batch_size"]))
+        pause = float(self.settings["batch_pause_seconds"])
+        summary = {"sessions": 0, "bytes": 0}
+        with span("gc.sweep"):
+            victims = self.plan()
+            for i in range(0, len(victims), batch_size):
+                if self._stop.is_set():
+                    break
+                if i:
+                    self._stop.wait(pause)
+                for sid, reason in victims[i:i + batch_size]:
+                    # Re-check: the session may have been used since planning
+                    if self.is_busy(sid) or (reason == "idle" and self._recently_used(sid)):
+                        continue
+                    try:
+                        reclaimed = self.reap(sid, reason, compact=False)
+                    except Exception as e:
+                        log.warning("Session reap failed", session_id=sid, error=str(e))
+                        continue
+                    summary["sessions"] += 1
+                    summary["bytes"] += sum(reclaimed.values())
+            summary["vectors_purged"] = self.compact()
+            in_use = sum(self.session_bytes(sid) for sid in self._session_ids())
+            GC_DISK_BYTES.set(in_use + (self.blob_store.total_bytes() if self.blob_store else 0))
+        if summary["sessions"]:
+            log.info("Session sweep complete", **summary)
+        return summary
+
+    def _recently_used(self, session_id: str) -> bool:
+        max_idle = float(self.settings["max_idle_hours"]) * 3600.0
+        return time.time() - self._last_used(session_id) <= max_idle
+
+    # ---------- background loop ----------
+
+    def start(self) -> Optional[threading.Thread]:
+        """Run `sweep()` every `interval_seconds` on a daemon thread (no-op when disabled)."""
+        if not self.settings.get("enabled", True):
+            return None
+        interval = float(self.settings["interval_seconds"])
+
+        def _loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    log.error("Session sweep failed", error=str(e))
+
+        thread = threading.Thread(target=_loop, name="session-reaper", daemon=True)
+        thread.start()
+        log.info("Session reaper started", **self.settings)
+        return thread
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.blob_store import _atomic_write_text
+from multi_doc_chat.utils.index_store import current_version, current_version_dir, index_lock, publish_version
+
+# Written into faiss_index/<session_id>/ when the session lives in a shared corpus index
+SHARED_REF_FILE = "shared_ref.json"
+# Corpus-level map of session id -> docstore ids, replaced atomically after each publish
+SESSIONS_FILE = "sessions.json"
+
+_CORPUS_CACHE: Dict[str, Tuple[int, FAISS, Dict[str, int]]] = {}
+_CORPUS_LOCK = threading.Lock()
+
+
+class SessionScopedIndex:
+    """
+    Proxy over a FAISS index that restricts every `search` to a fixed set of vector ids
+    using a faiss IDSelector. Everything else (reconstruct, ntotal, d, ...) is delegated,
+    so a LangChain FAISS store built on it behaves exactly like a per-session index.
+    """
+
+    def __init__(self, index, positions: Iterable[int]):
+        import faiss
+        import numpy as np
+
+        self._index = index
+        ids = np.asarray(sorted(positions), dtype="int64")
+        self.size = int(ids.shape[0])
+        self._selector = faiss.IDSelectorBatch(ids)
+        self._params = faiss.SearchParameters(sel=self._selector)
+
+    def search(self, x, k, **kwargs):
+        kwargs.setdefault("params", self._params)
+        return self._index.search(x, k, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+def read_shared_ref(index_path: str | Path) -> Optional[Dict[str, Any]]:
+    ref = Path(index_path) / SHARED_REF_FILE
+    if not ref.exists():
+        return None
+    return json.loads(ref.read_text(encoding="utf-8"))
+
+
+def write_shared_ref(index_path: str | Path, corpus_dir: str | Path, session_id: str):
+    ref = {"corpus_dir": str(corpus_dir), "session_id": session_id}
+    _atomic_write_text(Path(index_path) / SHARED_REF_FILE, json.dumps(ref, indent=2))
+
+
+def read_session_map(corpus_dir: str | Path) -> Dict[str, List[str]]:
+    """Session -> doc ids of a shared corpus (falls back to the pre-versioning manifest)."""
+    path = Path(corpus_dir) / SESSIONS_FILE
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    legacy = current_version_dir(corpus_dir) / "ingested_meta.json"
+    if legacy.exists():
+        return json.loads(legacy.read_text(encoding="utf-8")).get("sessions", {}) or {}
+    return {}
+
+
+def write_session_map(corpus_dir: str | Path, sessions: Dict[str, List[str]]):
+    _atomic_write_text(Path(corpus_dir) / SESSIONS_FILE, json.dumps(sessions, indent=2))
+
+
+def _load_local(index_dir: str | Path, embeddings, index_name: str) -> Tuple[int, FAISS]:
+    """
+    Load the published snapshot of `index_dir`. A writer may publish (and prune) between
+    resolving CURRENT and reading the files, so one failed attempt re-resolves and retries.
+    """
+    for attempt in (0, 1):
+        version = current_version(index_dir)
+        try:
+            vs = FAISS.load_local(
+                str(current_version_dir(index_dir)),
+                embeddings=embeddings,
+                index_name=index_name,
+                allow_dangerous_deserialization=True,
+            )
+            return version, vs
+        except Exception:
+            if attempt or current_version(index_dir) == version:
+                raise
+            log.info("Index snapshot changed during load; retrying", index_dir=str(index_dir))
+
+
+def _load_corpus(corpus_dir: str, embeddings, index_name: str) -> Tuple[FAISS, Dict[str, int]]:
+    """Load a shared corpus once per process and keep it resident until a new version is published."""
+    version = current_version(corpus_dir)
+    with _CORPUS_LOCK:
+        cached = _CORPUS_CACHE.get(corpus_dir)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        version, vs = _load_local(corpus_dir, embeddings, index_name)
+        positions = {doc_id: pos for pos, doc_id in vs.index_to_docstore_id.items()}
+        _CORPUS_CACHE[corpus_dir] = (version, vs, positions)
+        log.info("Shared corpus index loaded", corpus_dir=corpus_dir, version=version, vectors=vs.index.ntotal)
+        return vs, positions
+
+
+def index_version(index_path: str | Path) -> int:
+    """Published version backing a session directory (the corpus version in shared mode)."""
+    ref = read_shared_ref(index_path)
+    return current_version(ref["corpus_dir"] if ref else index_path)
+
+
+def corpus_fingerprint(index_path: str | Path) -> str:
+    """
+    Stable hash of the chunks a session can retrieve: the manifest entries of a per-session
+    index (key plus doc id, so an updated row changes it), or the session's doc ids in a
+    shared corpus. Equal corpora give equal fingerprints.
+    """
+    ref = read_shared_ref(index_path)
+    if ref is not None:
+        keys = read_session_map(ref["corpus_dir"]).get(ref["session_id"], [])
+    else:
+        meta_path = current_version_dir(index_path) / "ingested_meta.json"
+        rows = json.loads(meta_path.read_text(encoding="utf-8")).get("rows", {}) if meta_path.exists() else {}
+        # Text chunks map to True (their key hashes the content); hashed rows to a doc id
+        # derived from row_hash
+        keys = [f"{key}\0{seen}" if isinstance(seen, str) else key for key, seen in rows.items()]
+    h = hashlib.sha256()
+    for key in sorted(keys):
+        h.update(key.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def compact_corpus(
+    corpus_dir: str | Path, embeddings=None, min_orphan_ratio: float = 0.0, index_name: str = "index"
+) -> int:
+    """
+    Purge vectors that no session references any more (left behind by reaped sessions,
+    which are only detached from sessions.json) and publish the smaller corpus. Every
+    compaction rewrites the whole index, so it is skipped while orphans are below
+    `min_orphan_ratio` of the vectors. Returns the number of vectors removed.
+    """
+    corpus_dir = Path(corpus_dir)
+    with index_lock(corpus_dir):
+        if not (current_version_dir(corpus_dir) / f"{index_name}.faiss").exists():
+            return 0
+        _, vs = _load_local(corpus_dir, embeddings, index_name)
+        live = {doc_id for ids in read_session_map(corpus_dir).values() for doc_id in ids}
+        orphans = [doc_id for doc_id in vs.index_to_docstore_id.values() if doc_id not in live]
+        total = vs.index.ntotal
+        if not orphans or len(orphans) < min_orphan_ratio * total:
+            return 0
+
+        meta_path = current_version_dir(corpus_dir) / "ingested_meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        dropped = set(orphans)
+        # Forget purged chunks so a later upload of the same content indexes them again
+        meta["rows"] = {key: doc_id for key, doc_id in (meta.get("rows") or {}).items() if doc_id not in dropped}
+        vs.delete(orphans)
+
+        def _write(stage: Path):
+            vs.save_local(str(stage), index_name=index_name)
+            (stage / "ingested_meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        version = publish_version(corpus_dir, _write)
+    log.info("Shared corpus compacted", corpus_dir=str(corpus_dir), version=version,
+             vectors_removed=len(orphans), vectors_left=total - len(orphans))
+    return len(orphans)
+
+
+def load_vectorstore(index_path: str | Path, embeddings, index_name: str = "index") -> FAISS:
+    """
+    Load a session's vector store from either layout: a per-session FAISS directory, or a
+    session directory pointing into a shared corpus index (restricted to the session's ids).
+    """
+    ref = read_shared_ref(index_path)
+    if ref is None:
+        return _load_local(index_path, embeddings, index_name)[1]
+
+    corpus_dir = ref["corpus_dir"]
+    base, positions = _load_corpus(corpus_dir, embeddings, index_name)
+    doc_ids = read_session_map(corpus_dir).get(ref["session_id"], [])
+    scoped = SessionScopedIndex(base.index, (positions[d] for d in doc_ids if d in positions))
+    return FAISS(
+        embedding_function=embeddings,
+        index=scoped,
+        docstore=base.docstore,
+        index_to_docstore_id=base.index_to_docstore_id,
+    )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+import requests
+
+from multi_doc_chat.exceptions.custom_exception import DeadlineExceeded
+from multi_doc_chat.utils.deadline import timeout_for
+from multi_doc_chat.utils.metrics import REGISTRY
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "mdc_singleflight_upstream_total", "Upstream calls made by single-flight groups."
+)
+SINGLE_FLIGHT_SAVED = REGISTRY.counter(
+    "mdc_singleflight_saved_total", "Calls served by joining an identical in-flight call instead of calling upstream."
+)
+
+
+# Outcomes of the leader's own cancellation or time budget, not of the call itself
+_GAVE_UP = (asyncio.CancelledError, asyncio.TimeoutError, FutureTimeout, TimeoutError, DeadlineExceeded, requests.Timeout)
+
+
+class Abandoned(Exception):
+    """Set on a shared call whose leader was cancelled or ran out of time; claim again."""
+
+
+def _gave_up(exc: BaseException) -> bool:
+    """True if `exc`, or an exception it wraps, is a cancellation or timeout."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, _GAVE_UP):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: the first caller for a key (the leader) runs the
+    call, everyone arriving while it is in flight waits for and shares its result (or error).
+    Completed results are not retained; this is coalescing, not caching.
+
+    Works across threads and event loops: waiters block on, or await, the same Future, each
+    for no longer than its own request deadline. If the leader is cancelled or times out
+    (its deadline, a client timeout), waiters retry instead of inheriting that error.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return (future, is_leader). The leader must `resolve` or `fail` the key."""
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                SINGLE_FLIGHT_SAVED.inc(group=self.group)
+                return fut, False
+            fut = self._calls[key] = Future()
+        SINGLE_FLIGHT_CALLS.inc(group=self.group)
+        return fut, True
+
+    def resolve(self, key: Hashable, result: Any):
+        with self._lock:
+            fut = self._calls.pop(key, None)
+        if fut is not None:
+            fut.set_result(result)
+
+    def fail(self, key: Hashable, exc: BaseException):
+        """
+        Fail the call's waiters with `exc`. A leader that gave up for its own reasons
+        (cancelled, timed out) must not hand that outcome to callers that are still live:
+        they get `Abandoned`, retry, and one becomes the new leader.
+        """
+        if _gave_up(exc):
+            exc = Abandoned()
+        with self._lock:
+            fut = self._calls.pop(key, None)
+        if fut is not None:
+            fut.set_exception(exc)
+
+    def wait(self, fut: Future) -> Any:
+        """Result of a joined call, waiting no longer than the caller's deadline."""
+        stage = f"{self.group}.wait"
+        try:
+            return fut.result(timeout=timeout_for(stage, None))
+        except FutureTimeout as e:
+            raise DeadlineExceeded(stage) from e
+
+    async def await_result(self, fut: Future) -> Any:
+        """Async `wait`. Shielded: a waiter being cancelled must not cancel the shared future."""
+        stage = f"{self.group}.wait"
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout_for(stage, None))
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(stage) from e
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        while True:
+            fut, leader = self.claim(key)
+            if leader:
+                break
+            try:
+                return self.wait(fut)
+            except Abandoned:
+                continue
+        try:
+            result = fn()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.resolve(key, result)
+        return result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            fut, leader = self.claim(key)
+            if leader:
+                break
+            try:
+                return await self.await_result(fut)
+            except Abandoned:
+                continue
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.resolve(key, result)
+        return result
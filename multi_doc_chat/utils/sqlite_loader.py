@@ -0,0 +1,94 @@
+from __future__ import annotations
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.tabular_loaders import format_row
+
+SQLITE_EXTENSIONS = {".db", ".sqlite", ".sqlite3"}
+FETCH_ROWS = 500
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def row_hash(values: Sequence[Any]) -> str:
+    h = hashlib.sha256()
+    for v in values:
+        h.update(repr(v).encode("utf-8", "replace"))
+        h.update(b"\x1f")
+    return h.hexdigest()[:16]
+
+
+def _row_key_sql(conn: sqlite3.Connection, table: str) -> Tuple[str, List[str]]:
+    """SELECT prefix yielding a stable row key: rowid, else the primary key columns."""
+    try:
+        conn.execute(f"SELECT rowid FROM {_quote(table)} LIMIT 0")
+        return "rowid", ["rowid"]
+    except sqlite3.OperationalError:
+        pk = [r[1] for r in sorted(conn.execute(f"PRAGMA table_info({_quote(table)})"), key=lambda r: r[5]) if r[5]]
+        if not pk:
+            return "", []
+        return ", ".join(_quote(c) for c in pk), pk
+
+
+def iter_sqlite_documents(path: Path, source: Optional[str] = None, fetch_rows: int = FETCH_ROWS) -> Iterator[Document]:
+    """
+    Stream every table of a SQLite database as one document per row.
+
+    Rows are fetched `fetch_rows` at a time from an open cursor (never the whole table).
+    Metadata: `source` (the logical name, so keys survive re-uploads of an updated file),
+    `table`, `row_id` ("table:rowid" or primary key), `rowid` when available, and `row_hash`
+    so the index manifest can re-embed only new or changed rows.
+    """
+    path = Path(path)
+    source = source or str(path)
+    conn = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+    try:
+        tables = [
+            r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        for table in tables:
+            key_sql, key_cols = _row_key_sql(conn, table)
+            cur = conn.cursor()
+            select = f"SELECT {key_sql + ', ' if key_sql else ''}* FROM {_quote(table)}"
+            if key_sql:
+                select += f" ORDER BY {key_sql}"
+            cur.execute(select)
+            n_key = len(key_cols)
+            header = [d[0] for d in cur.description][n_key:]
+            count = 0
+            max_rowid: Optional[int] = None
+            while True:
+                batch = cur.fetchmany(fetch_rows)
+                if not batch:
+                    break
+                for row in batch:
+                    count += 1
+                    key_vals, values = row[:n_key], row[n_key:]
+                    text = format_row(header, values)
+                    if not text:
+                        continue
+                    rid = ",".join(str(v) for v in key_vals) if key_vals else str(count)
+                    md = {
+                        "source": source,
+                        "file_path": str(path),
+                        "table": table,
+                        "row_id": f"{table}:{rid}",
+                        "row_hash": row_hash(values),
+                    }
+                    if key_cols == ["rowid"]:
+                        md["rowid"] = int(key_vals[0])
+                        max_rowid = md["rowid"] if max_rowid is None else max(max_rowid, md["rowid"])
+                    yield Document(page_content=f"table: {table}; {text}", metadata=md)
+            cur.close()
+            log.info("SQLite table loaded", source=source, table=table, rows=count, max_rowid=max_rowid)
+    finally:
+        conn.close()
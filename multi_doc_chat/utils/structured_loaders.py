@@ -0,0 +1,256 @@
+from __future__ import annotations
+import io
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+
+_NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_NS_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_NOTES_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide"
+_NS_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+# ---------- shared ----------
+
+def merge_sections(
+    sections: Iterable[Tuple[str, Dict]],
+    *,
+    source: str,
+    chunk_chars: int,
+    unit: str,
+) -> Iterator[Document]:
+    """
+    Emit one document per section, merging runs of consecutive small sections while the
+    result stays within `chunk_chars`. Boundaries only ever fall between sections; a section
+    longer than a chunk is left whole for the splitter. Metadata of a merged document is
+    that of its first section plus `<unit>_end`.
+    """
+    buf: List[str] = []
+    first: Optional[Dict] = None
+    last: Optional[Dict] = None
+    size = 0
+
+    def _flush() -> Document:
+        md = {"source": source, **first}
+        if last is not first:
+            md[f"{unit}_end"] = last[unit]
+        return Document(page_content="\n\n".join(buf), metadata=md)
+
+    for text, md in sections:
+        text = text.strip()
+        if not text:
+            continue
+        if buf and size + len(text) + 2 > chunk_chars:
+            yield _flush()
+            buf, size, first = [], 0, None
+        if first is None:
+            first = md
+        buf.append(text)
+        last = md
+        size += len(text) + 2
+    if buf:
+        yield _flush()
+
+
+# ---------- PPTX ----------
+
+def _paragraphs(xml_bytes: bytes) -> List[str]:
+    """Text of each <a:p> paragraph (runs concatenated), in document order."""
+    paras: List[str] = []
+    runs: List[str] = []
+    for _, elem in ET.iterparse(io.BytesIO(xml_bytes), events=("end",)):
+        if elem.tag == f"{_NS_A}t":
+            runs.append(elem.text or "")
+        elif elem.tag == f"{_NS_A}br":
+            runs.append("\n")
+        elif elem.tag == f"{_NS_A}p":
+            text = "".join(runs).strip()
+            if text:
+                paras.append(text)
+            runs = []
+            elem.clear()
+    return paras
+
+
+def _rels(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """Relationship id -> (type, absolute target part) for a package part."""
+    base, name = posixpath.split(part)
+    rels_path = posixpath.join(base, "_rels", f"{name}.rels")
+    try:
+        root = ET.fromstring(zf.read(rels_path))
+    except KeyError:
+        return {}
+    out = {}
+    for rel in root.iter(f"{_NS_PKG_REL}Relationship"):
+        target = posixpath.normpath(posixpath.join(base, rel.get("Target", "")))
+        out[rel.get("Id")] = (rel.get("Type", ""), target)
+    return out
+
+
+def _slide_parts(zf: zipfile.ZipFile) -> List[str]:
+    """Slide parts in presentation order (falls back to slideN numbering)."""
+    try:
+        pres = ET.fromstring(zf.read("ppt/presentation.xml"))
+        rels = _rels(zf, "ppt/presentation.xml")
+        ordered = [rels[s.get(f"{_NS_R}id")][1] for s in pres.iter(f"{_NS_P}sldId") if s.get(f"{_NS_R}id") in rels]
+        if ordered:
+            return ordered
+    except (KeyError, ET.ParseError):
+        pass
+    names = [n for n in zf.namelist() if re.fullmatch(r"ppt/slides/slide\d+\.xml", n)]
+    return sorted(names, key=lambda n: int(re.search(r"(\d+)\.xml$", n).group(1)))
+
+
+def iter_pptx_sections(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """Yield (text, metadata) per slide: slide text, then speaker notes if present."""
+    with zipfile.ZipFile(path) as zf:
+        for number, part in enumerate(_slide_parts(zf), start=1):
+            paras = _paragraphs(zf.read(part))
+            notes = []
+            for rel_type, target in _rels(zf, part).values():
+                if rel_type == _NOTES_REL and target in zf.namelist():
+                    # Notes pages repeat the slide number placeholder; keep only real text
+                    notes = [p for p in _paragraphs(zf.read(target)) if not p.isdigit()]
+            text = "\n".join(paras)
+            if notes:
+                text += "\nNotes: " + "\n".join(notes)
+            md = {"page": number, "slide": number}
+            if paras:
+                md["title"] = paras[0][:200]
+            yield text, md
+
+
+def iter_pptx_documents(path: Path, chunk_chars: int = 1000) -> Iterator[Document]:
+    path = Path(path)
+    count = 0
+    for doc in merge_sections(iter_pptx_sections(path), source=str(path), chunk_chars=chunk_chars, unit="slide"):
+        count += 1
+        yield doc
+    log.info("PPTX loaded", path=str(path), documents=count)
+
+
+# ---------- DOCX ----------
+
+def iter_docx_paragraphs(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (text, {"paragraph": n}) for each non-empty paragraph of word/document.xml,
+    parsed incrementally from the compressed zip member. Finished elements are cleared
+    from the tree as we go, so memory stays bounded regardless of document size.
+    """
+    with zipfile.ZipFile(path) as zf, zf.open("word/document.xml") as member:
+        parts: List[str] = []
+        body = None
+        depth = 0
+        ordinal = 0
+        for event, elem in ET.iterparse(member, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if elem.tag == f"{_NS_W}body":
+                    body = elem
+                continue
+            depth -= 1
+            tag = elem.tag
+            if tag == f"{_NS_W}t":
+                parts.append(elem.text or "")
+            elif tag == f"{_NS_W}tab":
+                parts.append("\t")
+            elif tag in (f"{_NS_W}br", f"{_NS_W}cr"):
+                parts.append("\n")
+            elif tag == f"{_NS_W}p":
+                text = "".join(parts).strip()
+                parts = []
+                elem.clear()
+                if text:
+                    yield text, {"paragraph": ordinal}
+                    ordinal += 1
+            # document > body > block: once a top-level block ends, drop everything parsed
+            if depth == 2 and body is not None:
+                body.clear()
+
+
+def iter_docx_documents(path: Path, chunk_chars: int = 1000) -> Iterator[Document]:
+    """Paragraph-aligned blocks of about `chunk_chars`, produced while the XML is parsed."""
+    path = Path(path)
+    count = 0
+    blocks = merge_sections(iter_docx_paragraphs(path), source=str(path), chunk_chars=chunk_chars, unit="paragraph")
+    for doc in blocks:
+        count += 1
+        yield doc
+    log.info("DOCX loaded", path=str(path), documents=count)
+
+
+# ---------- Markdown ----------
+
+_ATX = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.*?)[ \t#]*$")
+_SETEXT = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+def iter_markdown_sections(lines: Iterable[str]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Split Markdown into heading sections (ATX and setext headings, fenced code ignored).
+    Metadata: `section` ordinal and `heading` path ("Intro > Setup").
+    """
+    path: List[Tuple[int, str]] = []
+    body: List[str] = []
+    fence: Optional[str] = None
+    ordinal = 0
+
+    def _emit():
+        nonlocal ordinal
+        text = "".join(body)
+        md = {"section": ordinal, "heading": " > ".join(t for _, t in path)}
+        ordinal += 1
+        return text, md
+
+    for line in lines:
+        stripped = line.rstrip("\r\n")
+        m = _FENCE.match(stripped)
+        if m:
+            marker = m.group(1)
+            if fence is None:
+                fence = marker[0] * 3
+            elif marker.startswith(fence):
+                fence = None
+            body.append(line)
+            continue
+        if fence is None:
+            level, title = None, None
+            atx = _ATX.match(stripped)
+            if atx:
+                level, title = len(atx.group(1)), atx.group(2).strip()
+            elif _SETEXT.match(stripped) and body and body[-1].strip():
+                # Previous line is the heading text
+                title = body.pop().strip()
+                level = 1 if stripped.strip().startswith("=") else 2
+                line = f"{'#' * level} {title}\n"
+            if level is not None:
+                if "".join(body).strip():
+                    yield _emit()
+                body = []
+                path = [p for p in path if p[0] < level] + [(level, title)]
+                body.append(line if line.endswith("\n") else line + "\n")
+                continue
+        body.append(line)
+    if "".join(body).strip():
+        yield _emit()
+
+
+def iter_markdown_documents(path: Path, chunk_chars: int = 1000) -> Iterator[Document]:
+    path = Path(path)
+    count = 0
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        sections = iter_markdown_sections(fh)
+        for doc in merge_sections(sections, source=str(path), chunk_chars=chunk_chars, unit="section"):
+            count += 1
+            yield doc
+    log.info("Markdown loaded", path=str(path), documents=count)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import codecs
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+
+WINDOW_BYTES = 1 << 20  # bytes decoded per refill
+SEPARATORS = ("\n\n", "\n", " ")
+
+# (text, char_start, byte_start, byte_end)
+TextChunk = Tuple[str, int, int, int]
+
+
+def _cut(buf: str, start: int, chunk_chars: int) -> int:
+    """End of the chunk starting at `start`: the last paragraph/line/word break in its second half."""
+    limit = start + chunk_chars
+    if limit >= len(buf):
+        return len(buf)
+    floor = start + chunk_chars // 2
+    for sep in SEPARATORS:
+        j = buf.rfind(sep, floor, limit)
+        if j != -1:
+            return j + len(sep)
+    return limit
+
+
+def iter_text_chunks(
+    path: Path,
+    chunk_chars: int = 1000,
+    chunk_overlap: int = 200,
+    encoding: str = "utf-8",
+    window_bytes: int = WINDOW_BYTES,
+) -> Iterator[TextChunk]:
+    """
+    Split a text file into chunks of at most `chunk_chars` without reading it into memory.
+
+    The file is memory-mapped and decoded one window at a time with an incremental decoder,
+    so a multi-byte character split across windows is handled and only about one window of
+    text is alive at once. Invalid bytes are decoded with surrogateescape, which keeps the
+    byte offsets of every chunk exact (they round-trip through encode()).
+    """
+    if chunk_overlap >= chunk_chars:
+        raise ValueError("chunk_overlap must be smaller than chunk_chars")
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="surrogateescape")
+            buf = ""
+            cur = 0  # chunk start within buf
+            buf_chars = 0  # file char offset of buf[cur]
+            buf_bytes = 0  # file byte offset of buf[cur]
+            read = 0
+            while True:
+                if read < size and len(buf) - cur < 2 * chunk_chars:
+                    # Refill: drop the consumed prefix, append the next decoded window
+                    nxt = min(size, read + window_bytes)
+                    buf = buf[cur:] + decoder.decode(mm[read:nxt], final=nxt >= size)
+                    cur = 0
+                    read = nxt
+                    continue
+                if cur >= len(buf):
+                    break
+                end = _cut(buf, cur, chunk_chars)
+                raw = buf[cur:end]
+                lead = len(raw) - len(raw.lstrip())
+                text = raw.strip()
+                if text:
+                    start_bytes = buf_bytes + len(raw[:lead].encode(encoding, "surrogateescape"))
+                    end_bytes = start_bytes + len(text.encode(encoding, "surrogateescape"))
+                    yield text, buf_chars + lead, start_bytes, end_bytes
+                if end >= len(buf) and read >= size:
+                    break
+                # Next chunk re-reads the overlap, starting on a word boundary when possible
+                nxt_start = end
+                if chunk_overlap:
+                    back = max(cur + 1, end - chunk_overlap)
+                    space = buf.find(" ", back, end)
+                    nxt_start = space + 1 if space != -1 else back
+                buf_bytes += len(buf[cur:nxt_start].encode(encoding, "surrogateescape"))
+                buf_chars += nxt_start - cur
+                cur = nxt_start
+
+
+def iter_text_documents(
+    path: Path,
+    chunk_chars: int = 1000,
+    chunk_overlap: int = 200,
+    encoding: str = "utf-8",
+) -> Iterator[Document]:
+    """
+    Pre-split documents for large text files. Metadata carries `start_index` (characters)
+    and `byte_start`/`byte_end` into the file; the ingestion splitter passes these through.
+    """
+    path = Path(path)
+    count = 0
+    for text, start, byte_start, byte_end in iter_text_chunks(path, chunk_chars, chunk_overlap, encoding):
+        if not text.isascii():
+            # Materialize: undecodable bytes kept as surrogates become U+FFFD only now
+            text = text.encode(encoding, "surrogateescape").decode(encoding, "replace")
+        count += 1
+        yield Document(
+            page_content=text,
+            metadata={"source": str(path), "start_index": start, "byte_start": byte_start, "byte_end": byte_end},
+        )
+    log.info("Text loaded (mmap)", path=str(path), documents=count)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+from multi_doc_chat.utils.metrics import REGISTRY
+
+NORMALIZE_CHARS_REMOVED = REGISTRY.counter(
+    "mdc_normalize_chars_removed_total", "Characters removed by text normalization before splitting."
+)
+
+DEFAULT_NORMALIZE_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "strip_control": True,
+    "dehyphenate": True,
+    "collapse_whitespace": True,
+    "strip_headers_footers": True,
+    # Lines at the top and bottom of each page that may be a header/footer
+    "edge_lines": 3,
+    # A line repeated (digits ignored) on at least this share of a file's pages is boilerplate
+    "min_repeat_ratio": 0.5,
+    "min_pages": 3,
+}
+
+# Documents joined with this separator are normalized with one regex pass per rule
+_SEP = "\ue000"
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u00ad\u200b\ufeff]")
+_HYPHEN_BREAK = re.compile(r"([^\W\d_])-[ \t]*\r?\n[ \t]*([^\W\d_])")
+_INNER_SPACES = re.compile(r"(?<=[^\s\ue000])(?:[ \t\u00a0]{2,}|\u00a0)")
+_TRAILING_SPACES = re.compile(r"[ \t\u00a0]+(?=\r?\n|\ue000|\Z)")
+_BLANK_LINES = re.compile(r"\n(?:[ \t]*\n){2,}")
+_DIGITS = re.compile(r"\d+")
+_WS = re.compile(r"\s+")
+
+
+def _dehyphen(m: re.Match) -> str:
+    # "infor-\nmation" -> "information"; keep the hyphen for "Jean-\nPaul" style compounds
+    return m.group(1) + m.group(2) if m.group(2).islower() else m.group(0)
+
+
+def _edge_key(line: str) -> str:
+    return _WS.sub(" ", _DIGITS.sub("#", line)).strip().lower()
+
+
+class TextNormalizer:
+    """
+    Cleanup between loading and splitting. Repeated page headers/footers are detected per
+    PDF file from the first/last `edge_lines` lines of each page (digits ignored, so "Page 3
+    of 9" matches across pages); other paged sources (e.g. PPTX slides, whose repeated title
+    placeholders are content) are left alone. Control characters, hyphenated line breaks and whitespace runs
+    are then handled for the whole batch at once: the documents are joined and each rule is
+    one regex pass in C rather than a Python loop per document. Leading indentation is kept.
+    Pre-split chunks (`byte_start`) and table/database rows (`row_id`) are left untouched.
+    """
+
+    def __init__(self, **settings):
+        cfg = {**DEFAULT_NORMALIZE_SETTINGS, **settings}
+        self.strip_control = bool(cfg["strip_control"])
+        self.dehyphenate = bool(cfg["dehyphenate"])
+        self.collapse_whitespace = bool(cfg["collapse_whitespace"])
+        self.strip_headers_footers = bool(cfg["strip_headers_footers"])
+        self.edge_lines = max(1, int(cfg["edge_lines"]))
+        self.min_repeat_ratio = float(cfg["min_repeat_ratio"])
+        self.min_pages = max(2, int(cfg["min_pages"]))
+
+    def settings(self) -> Dict[str, Any]:
+        """Settings that change the normalized text (part of the chunk-cache key)."""
+        return {
+            "strip_control": self.strip_control,
+            "dehyphenate": self.dehyphenate,
+            "collapse_whitespace": self.collapse_whitespace,
+            "strip_headers_footers": self.strip_headers_footers,
+            "edge_lines": self.edge_lines,
+            "min_repeat_ratio": self.min_repeat_ratio,
+            "min_pages": self.min_pages,
+        }
+
+    # ---------- rules ----------
+
+    def _edges(self, lines: List[str]) -> List[int]:
+        """Indices of the first and last `edge_lines` non-empty lines."""
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        return sorted(set(filled[:self.edge_lines] + filled[-self.edge_lines:]))
+
+    def _strip_repeated_edges(self, texts: List[str]) -> None:
+        """Remove header/footer lines repeated across the pages of one file (in place)."""
+        split = [t.split("\n") for t in texts]
+        counts: Counter = Counter()
+        for lines in split:
+            counts.update({_edge_key(lines[i]) for i in self._edges(lines)})
+        needed = max(2, self.min_repeat_ratio * len(texts))
+        repeated = {key for key, n in counts.items() if key and n >= needed}
+        if not repeated:
+            return
+        for i, lines in enumerate(split):
+            drop = {j for j in self._edges(lines) if _edge_key(lines[j]) in repeated}
+            if drop:
+                texts[i] = "\n".join(line for j, line in enumerate(lines) if j not in drop)
+
+    def _repair(self, text: str) -> str:
+        if self.strip_control:
+            text = _CONTROL.sub("", text)
+        if self.dehyphenate:
+            text = _HYPHEN_BREAK.sub(_dehyphen, text)
+        return text
+
+    def _collapse(self, text: str) -> str:
+        if self.collapse_whitespace:
+            text = _INNER_SPACES.sub(" ", text)
+            text = _TRAILING_SPACES.sub("", text)
+            text = _BLANK_LINES.sub("\n\n", text)
+        return text
+
+    def normalize_text(self, text: str) -> str:
+        """All rules except header/footer stripping (which needs the file's other pages)."""
+        return self._collapse(self._repair(text))
+
+    @staticmethod
+    def _batch(texts: List[str], rule) -> List[str]:
+        if any(_SEP in t for t in texts):
+            return [rule(t) for t in texts]
+        return rule(_SEP.join(texts)).split(_SEP)
+
+    def normalize(self, docs: List[Document]) -> Tuple[List[Document], List[Dict[str, Any]]]:
+        """
+        Normalize documents in place (page_content); returns them with a per-file report of
+        character counts before and after.
+        """
+        targets = [i for i, d in enumerate(docs) if "byte_start" not in d.metadata and "row_id" not in d.metadata]
+        texts = [docs[i].page_content for i in targets]
+        before = [len(t) for t in texts]
+        if not texts:
+            return docs, []
+
+        # Repair first, so rejoined hyphenated words don't look like repeated edge lines
+        texts = self._batch(texts, self._repair)
+        if self.strip_headers_footers:
+            by_source: Dict[str, List[int]] = {}
+            for pos, i in enumerate(targets):
+                # Pages from the PDF extractor only (they carry the backend that produced them)
+                if docs[i].metadata.get("page") is not None and "pdf_backend" in docs[i].metadata:
+                    by_source.setdefault(str(docs[i].metadata.get("source")), []).append(pos)
+            for positions in by_source.values():
+                if len(positions) >= self.min_pages:
+                    page_texts = [texts[p] for p in positions]
+                    self._strip_repeated_edges(page_texts)
+                    for p, t in zip(positions, page_texts):
+                        texts[p] = t
+
+        texts = self._batch(texts, self._collapse)
+
+        report: Dict[str, Dict[str, Any]] = {}
+        for pos, i in enumerate(targets):
+            doc = docs[i]
+            doc.page_content = texts[pos]
+            source = str(doc.metadata.get("source"))
+            entry = report.setdefault(source, {"source": source, "documents": 0, "chars_before": 0, "chars_after": 0})
+            entry["documents"] += 1
+            entry["chars_before"] += before[pos]
+            entry["chars_after"] += len(texts[pos])
+        for entry in report.values():
+            removed = entry["chars_before"] - entry["chars_after"]
+            if removed > 0:
+                NORMALIZE_CHARS_REMOVED.inc(removed)
+            log.info("Text normalized", **entry)
+        return docs, list(report.values())
+
+
+def get_normalizer(settings: Optional[Dict[str, Any]]) -> Optional[TextNormalizer]:
+    """Normalizer built from the `ingestion.normalize` config section; None when disabled."""
+    cfg = {**DEFAULT_NORMALIZE_SETTINGS, **(settings or {})}
+    if not cfg.pop("enabled"):
+        return None
+    return TextNormalizer(**cfg)
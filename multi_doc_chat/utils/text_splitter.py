@@ -0,0 +1,190 @@
+from __future__ import annotations
+import bisect
+import copy
+import itertools
+import operator
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from multi_doc_chat.logger import GLOBAL_LOGGER as log
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+Span = Tuple[int, int, bool]  # [start, end) into the text being split, merged?
+
+
+def token_length(encoding_name: str = "cl100k_base") -> Callable[[str], int]:
+    """Length function counting tiktoken tokens."""
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise ImportError("Token-aware splitting requires tiktoken: pip install tiktoken") from e
+    enc = tiktoken.get_encoding(encoding_name)
+    return lambda s: len(enc.encode(s, disallowed_special=()))
+
+
+class FastTextSplitter:
+    """
+    Drop-in replacement for RecursiveCharacterTextSplitter (keep_separator=True / "start",
+    the default separators, strip_whitespace) producing the same chunks.
+
+    LangChain's splitter materializes every split as a new string at each recursion level
+    and re-joins them when merging. Here splits are boundary offsets into the original text:
+    separators are located once per span with a compiled pattern, merging works on offsets
+    only (by bisection when measuring characters), and a chunk's text is sliced exactly once
+    when it is emitted. Because each chunk is a contiguous slice, `start_index` is the true
+    offset rather than the result of a str.find().
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 4000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+        length_function: Callable[[str], int] = len,
+        add_start_index: bool = False,
+        strip_whitespace: bool = True,
+    ):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be > 0, got {chunk_size}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must be >= 0, got {chunk_overlap}")
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or DEFAULT_SEPARATORS)
+        self._patterns = [re.compile(re.escape(s)) if s else None for s in self.separators]
+        self.add_start_index = add_start_index
+        self.strip_whitespace = strip_whitespace
+        # Character lengths come straight from offsets; other measures need the substring
+        self._char_length = length_function is len
+        self.length_function = length_function
+
+    @classmethod
+    def from_tiktoken_encoder(cls, encoding_name: str = "cl100k_base", **kwargs) -> "FastTextSplitter":
+        return cls(length_function=token_length(encoding_name), **kwargs)
+
+    # ---------- offsets ----------
+
+    def _bounds(self, text: str, start: int, end: int, level: int) -> Tuple[List[int], int]:
+        """
+        Split [start, end) on the first separator present. Returns the split boundaries
+        (strictly increasing, from `start` to `end`) and the separator level for recursion.
+        """
+        for i in range(level, len(self.separators)):
+            pattern = self._patterns[i]
+            if pattern is None:
+                return list(range(start, end + 1)), len(self.separators)
+            positions = [m.start() for m in pattern.finditer(text, start, end)]
+            if positions:
+                # keep_separator="start": each split begins with its separator
+                if positions[0] == start:
+                    return [*positions, end], i + 1
+                return [start, *positions, end], i + 1
+        # No separator matched (custom list without ""): the span is a single split
+        return [start, end], len(self.separators)
+
+    def _split_span(self, text: str, start: int, end: int, level: int, out: List[Span]) -> None:
+        bounds, next_level = self._bounds(text, start, end, level)
+        if self._char_length:
+            lengths = list(map(operator.sub, itertools.islice(bounds, 1, None), bounds))
+        else:
+            lengths = [self.length_function(text[a:b]) for a, b in zip(bounds, itertools.islice(bounds, 1, None))]
+        if max(lengths) < self.chunk_size:
+            self._merge(bounds, lengths, 0, len(lengths), out)
+            return
+        run = 0
+        for i, n in enumerate(lengths):
+            if n < self.chunk_size:
+                continue
+            if i > run:
+                self._merge(bounds, lengths, run, i, out)
+            if next_level >= len(self.separators):
+                out.append((bounds[i], bounds[i + 1], False))
+            else:
+                self._split_span(text, bounds[i], bounds[i + 1], next_level, out)
+            run = i + 1
+        if run < len(lengths):
+            self._merge(bounds, lengths, run, len(lengths), out)
+
+    def _merge(self, bounds: List[int], lengths: List[int], lo: int, hi: int, out: List[Span]) -> None:
+        """
+        Greedy window of TextSplitter._merge_splits over splits lo..hi-1, all shorter than
+        chunk_size. Splits are joined with "" because separators stay attached to them.
+        """
+        size, overlap = self.chunk_size, self.chunk_overlap
+        if self._char_length:
+            # A window's length is the distance between its boundaries, so both the chunk end
+            # and the overlap start are found by bisection instead of visiting every split.
+            first = lo
+            while True:
+                last = bisect.bisect_right(bounds, bounds[first] + size, first, hi + 1) - 1
+                if last >= hi:
+                    out.append((bounds[first], bounds[hi], True))
+                    return
+                out.append((bounds[first], bounds[last], True))
+                # Drop leading splits until the kept tail fits the overlap and the next split fits
+                floor = max(bounds[last] - overlap, bounds[last + 1] - size)
+                first = bisect.bisect_left(bounds, floor, first, last)
+
+        # Other measures may charge for the (empty) join separator, as LangChain does
+        sep = self.length_function("")
+        first = lo
+        total = 0
+        for i in range(lo, hi):
+            n = lengths[i]
+            if total + n + (sep if i > first else 0) > size:
+                if total > size:
+                    log.warning("Created a chunk larger than chunk_size", size=total, chunk_size=size)
+                if i > first:
+                    out.append((bounds[first], bounds[i], True))
+                    while total > overlap or (total + n + (sep if i > first else 0) > size and total > 0):
+                        total -= lengths[first] + (sep if i - first > 1 else 0)
+                        first += 1
+            total += n + (sep if i > first else 0)
+        out.append((bounds[first], bounds[hi], True))
+
+    def split_spans(self, text: str) -> List[Tuple[str, int]]:
+        """(chunk text, start offset) pairs."""
+        spans: List[Span] = []
+        if text:
+            self._split_span(text, 0, len(text), 0, spans)
+        chunks: List[Tuple[str, int]] = []
+        for a, b, merged in spans:
+            raw = text[a:b]
+            if not merged or not self.strip_whitespace:
+                # Oversized splits that could not be split further are emitted as-is, like LangChain
+                chunks.append((raw, a))
+                continue
+            chunk = raw.strip()
+            if chunk:
+                chunks.append((chunk, a + len(raw) - len(raw.lstrip())))
+        return chunks
+
+    # ---------- TextSplitter interface ----------
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _ in self.split_spans(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, md in zip(texts, metadatas):
+            for chunk, start in self.split_spans(text):
+                metadata = copy.deepcopy(md)
+                if self.add_start_index:
+                    metadata["start_index"] = start
+                documents.append(Document(page_content=chunk, metadata=metadata))
+        return documents
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        texts, metadatas = [], []
+        for doc in documents:
+            texts.append(doc.page_content)
+            metadatas.append(doc.metadata)
+        return self.create_documents(texts, metadatas=metadatas)
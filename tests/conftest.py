@@ -0,0 +1,78 @@
+import copy
+import hashlib
+import io
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from multi_doc_chat.src.document_ingestion import data_ingestion
+from multi_doc_chat.utils.config_loader import load_config
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic vectors from a text hash; records every completed embed_documents call."""
+
+    model = "fake-embedding"
+
+    def __init__(self, fail_after=None):
+        self.calls = []
+        self.fail_after = fail_after
+
+    @property
+    def texts(self):
+        return [t for call in self.calls for t in call]
+
+    def embed_documents(self, texts):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise RuntimeError("embedding upstream down")
+        self.calls.append(list(texts))
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [b / 255 for b in hashlib.sha256(text.encode("utf-8")).digest()[:8]]
+
+
+def _merge(base, overrides):
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def upload(name, data):
+    f = io.BytesIO(data if isinstance(data, bytes) else data.encode("utf-8"))
+    f.name = name
+    return f
+
+
+@pytest.fixture
+def make_ingestor(tmp_path, monkeypatch):
+    """
+    ChatIngestor factory over tmp_path with config overrides and a FakeEmbeddings, so
+    ingestion runs end to end without API keys or network.
+    """
+    config = load_config()
+
+    def make(root="run", embeddings=None, session_id=None, **overrides):
+        base = tmp_path / root
+        cfg = _merge(copy.deepcopy(config), {
+            "storage": {"blob_dir": str(base / "data" / "blobs"), "chunk_cache_dir": str(base / "data" / "chunk_cache")},
+        })
+        _merge(cfg, overrides)
+        emb = embeddings or FakeEmbeddings()
+
+        class _Loader:
+            def __init__(self):
+                self.config = cfg
+
+            def load_embeddings(self):
+                return emb
+
+        monkeypatch.setattr(data_ingestion, "ModelLoader", _Loader)
+        return data_ingestion.ChatIngestor(
+            temp_base=str(base / "data"), faiss_base=str(base / "faiss_index"), session_id=session_id
+        )
+
+    return make
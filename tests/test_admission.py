@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from multi_doc_chat.exceptions.custom_exception import UpstreamOverloaded
+from multi_doc_chat.utils.admission import PRIORITY_BULK, PRIORITY_INTERACTIVE, UpstreamGate
+
+
+def test_async_waiters_hold_no_threads():
+    gate = UpstreamGate("test", max_concurrency=1, max_queue=64, queue_timeout_seconds=5)
+    gate.acquire()
+    order = []
+
+    async def call(priority, n):
+        await gate.acquire_async(priority)
+        order.append(n)
+        gate.release()
+
+    async def main():
+        threads = threading.active_count()
+        tasks = [asyncio.create_task(call(PRIORITY_BULK, n)) for n in range(50)]
+        tasks.append(asyncio.create_task(call(PRIORITY_INTERACTIVE, "chat")))
+        await asyncio.sleep(0.05)
+        assert len(gate._waiting) == 51
+        assert threading.active_count() == threads
+        # Freed from another thread, as a synchronous embedding call would
+        await asyncio.to_thread(gate.release)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ["chat", *range(50)]
+    assert gate._active == 0 and not gate._async_waiters
+
+
+def test_async_waiter_cancel_and_timeout_leave_the_queue():
+    gate = UpstreamGate("test", max_concurrency=1, max_queue=4, queue_timeout_seconds=0.1)
+    gate.acquire()
+
+    async def main():
+        waiter = asyncio.create_task(gate.acquire_async())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not gate._waiting
+        with pytest.raises(UpstreamOverloaded):
+            await gate.acquire_async()
+        assert not gate._waiting and gate._active == 1
+
+    asyncio.run(main())
+    gate.release()
+    gate.acquire()
@@ -0,0 +1,87 @@
+from langchain_core.documents import Document
+
+from multi_doc_chat.utils.context_ops import (
+    ContextSpan,
+    assemble_context,
+    format_context,
+    pack_context,
+    truncate_at_sentence,
+)
+
+TEXT = "".join(f"Sentence number {i} of the source. " for i in range(40))
+
+
+def _chunk(start, size, source="a.pdf", page=0, text=TEXT):
+    return Document(page_content=text[start:start + size], metadata={"source": source, "page": page, "start_index": start})
+
+
+def test_merges_overlapping_and_adjacent_chunks_by_offset():
+    # Retrieved out of order, overlapping by 50 chars, the last one adjacent
+    docs = [_chunk(150, 200), _chunk(0, 200), _chunk(350, 100)]
+    spans = assemble_context(docs)
+    assert len(spans) == 1
+    # Overlap is stitched once; touching chunks are joined on a new line
+    assert spans[0].text == TEXT[:350] + "\n" + TEXT[350:450]
+    assert spans[0].start == 0 and spans[0].chunks == 3
+    assert spans[0].rank == 0
+
+
+def test_keeps_gaps_sources_and_pages_apart_in_rank_order():
+    docs = [_chunk(0, 100, source="b.pdf"), _chunk(500, 100), _chunk(0, 100), _chunk(0, 100, page=1)]
+    spans = assemble_context(docs)
+    assert [(s.source, s.page, s.start) for s in spans] == [
+        ("b.pdf", 0, 0), ("a.pdf", 0, 0), ("a.pdf", 0, 500), ("a.pdf", 1, 0),
+    ]
+    assert format_context(spans) == "\n\n".join(s.text for s in spans)
+
+
+def test_merges_chunks_without_offsets_by_text_overlap():
+    docs = [Document(page_content=TEXT[100:300], metadata={"source": "old"}),
+            Document(page_content=TEXT[0:150], metadata={"source": "old"})]
+    spans = assemble_context(docs)
+    assert [s.text for s in spans] == [TEXT[0:300]]
+
+
+def test_truncate_at_sentence_boundary():
+    text = "One sentence here. Another one follows! A third? Tail without end"
+    assert truncate_at_sentence(text, 200) == text
+    assert truncate_at_sentence(text, 30) == "One sentence here."
+    assert truncate_at_sentence(text, 49) == "One sentence here. Another one follows! A third?"
+    assert truncate_at_sentence(text, 10) == ""
+
+
+def test_pack_context_fills_budget_in_rank_order():
+    spans = [
+        ContextSpan("a", 0, 0, "x" * 400, rank=2),       # 100 tokens
+        ContextSpan("b", 0, 0, "y" * 200, rank=0),       # 50 tokens
+        ContextSpan("c", 0, 0, TEXT[:400], rank=1),      # 100 tokens, cut at a sentence
+    ]
+    packed, stats = pack_context(spans, max_tokens=120)
+    # b fits whole, c is truncated into the remaining 70 tokens, a does not fit
+    assert [s.source for s in packed] == ["b", "c"]
+    assert packed[1].text == truncate_at_sentence(TEXT[:400], 280) and packed[1].text.endswith(".")
+    assert stats["packed_tokens"] <= 120
+    assert stats["spans_packed"] == 2 and stats["spans_truncated"] == 1 and stats["spans_dropped"] == 1
+    assert stats["packed_tokens"] + stats["dropped_tokens"] == 250
+
+
+def test_context_stats_go_on_each_request_record(monkeypatch):
+    from multi_doc_chat.src.document_chat.retrieval import CONTEXT_TOKENS, ConversationalRAG
+    from multi_doc_chat.utils.metrics import request_record
+
+    monkeypatch.setattr(ConversationalRAG, "_load_llm", lambda self: object())
+    rag = ConversationalRAG(session_id="s")
+    rag.context_cfg = {"max_tokens": 60, "chars_per_token": 4.0}
+    packed_before = CONTEXT_TOKENS.value(outcome="packed")
+
+    with request_record("http") as first:
+        rag._assemble([_chunk(0, 100)])
+    with request_record("http") as second:
+        rag._assemble([_chunk(0, 200, source="x.pdf"), _chunk(500, 200, source="y.pdf")])
+
+    assert first.as_dict()["context"]["chunks"] == 1
+    assert first.fields["context"]["dropped_tokens"] == 0
+    assert second.fields["context"]["chunks"] == 2 and second.fields["context"]["dropped_tokens"] > 0
+    assert not hasattr(rag, "last_context_stats")
+    packed = first.fields["context"]["packed_tokens"] + second.fields["context"]["packed_tokens"]
+    assert CONTEXT_TOKENS.value(outcome="packed") - packed_before == packed
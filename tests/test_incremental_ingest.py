@@ -0,0 +1,71 @@
+import random
+import sqlite3
+
+from conftest import FakeEmbeddings, upload
+
+SPLIT = {"chunk_size": 200, "chunk_overlap": 0}
+
+
+def _paragraphs(seed, n):
+    rng = random.Random(seed)
+    return [" ".join(f"w{rng.randrange(10**6)}" for _ in range(15)) + "." for _ in range(n)]
+
+
+def _texts(retriever):
+    store = retriever.vectorstore
+    return sorted(store.docstore.search(i).page_content for i in store.index_to_docstore_id.values())
+
+
+def _ingest(make_ingestor, emb, session_id, files):
+    ingestor = make_ingestor("run", emb, session_id=session_id)
+    retriever = ingestor.build_retriever([upload(name, data) for name, data in files], **SPLIT)
+    return ingestor, retriever
+
+
+def test_reupload_embeds_only_new_chunks(make_ingestor):
+    emb = FakeEmbeddings()
+    original = _paragraphs(1, 10)
+    first, _ = _ingest(make_ingestor, emb, None, [("a.txt", "\n\n".join(original))])
+    assert first.last_added == 10 and len(emb.texts) == 10
+
+    # Unchanged file: nothing to embed or add
+    again, retriever = _ingest(make_ingestor, emb, first.session_id, [("a.txt", "\n\n".join(original))])
+    assert again.last_added == 0 and len(emb.texts) == 10
+    assert _texts(retriever) == sorted(original)
+
+    # Edited file (new content hash, so a new saved file): only the appended chunks are new
+    added = _paragraphs(2, 3)
+    edited, retriever = _ingest(make_ingestor, emb, first.session_id, [("a.txt", "\n\n".join(original + added))])
+    assert edited.last_added == 3
+    assert emb.texts[10:] == added
+    assert _texts(retriever) == sorted(original + added)
+
+
+def _database(path, rows):
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, qty INTEGER)")
+    conn.executemany("INSERT INTO items VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path.read_bytes()
+
+
+def test_edited_sqlite_row_is_reindexed(make_ingestor, tmp_path):
+    emb = FakeEmbeddings()
+    rows = [(i, f"item {i}", i * 10) for i in range(1, 6)]
+    first, retriever = _ingest(make_ingestor, emb, None, [("inventory.db", _database(tmp_path / "v1.db", rows))])
+    assert len(emb.texts) == 5
+    before = _texts(retriever)
+
+    # One row changed, one added
+    rows[2] = (3, "item 3", 999)
+    rows.append((6, "item 6", 60))
+    second, retriever = _ingest(make_ingestor, emb, first.session_id,
+                                [("inventory.db", _database(tmp_path / "v2.db", rows))])
+    assert len(emb.texts[5:]) == 2
+    assert any("999" in t for t in emb.texts[5:]) and any("item 6" in t for t in emb.texts[5:])
+    after = _texts(retriever)
+    assert len(after) == 6
+    assert not any("qty: 30" in t for t in after) and any("qty: 999" in t for t in after)
+    assert [t for t in before if "item 3" not in t] == [t for t in after if "item 3" not in t and "item 6" not in t]
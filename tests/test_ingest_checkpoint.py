@@ -0,0 +1,81 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from conftest import FakeEmbeddings, upload
+from multi_doc_chat.exceptions.custom_exception import DocumentPortalException
+from multi_doc_chat.utils.ingest_checkpoint import IngestCheckpoint
+
+SETTINGS = {
+    "ingestion": {
+        "batch_chunks": 20,
+        "checkpoint": {"enabled": True, "batch_size": 8},
+        "near_dedup": {"enabled": True},
+    },
+    "storage": {"chunk_cache": False},
+}
+SPLIT = {"chunk_size": 200, "chunk_overlap": 0}
+
+
+def _paragraphs(seed, n):
+    rng = random.Random(seed)
+    return [" ".join(f"w{rng.randrange(10**6)}" for _ in range(15)) + "." for _ in range(n)]
+
+
+def _files():
+    a = _paragraphs(1, 100)
+    # Near duplicate (same words) of a chunk spooled before the crash, found after it
+    a[90] = a[3].upper()
+    return [("a.txt", "\n\n".join(a)), ("b.txt", "\n\n".join(_paragraphs(2, 30)))]
+
+
+def _index(retriever):
+    store = retriever.vectorstore
+    docs = [store.docstore.search(i) for i in store.index_to_docstore_id.values()]
+    # Sources are blob paths: compare their content-addressed file names across roots
+    return sorted((d.page_content, Path(d.metadata["source"]).name, d.metadata.get("start_index")) for d in docs)
+
+
+def test_resume_after_crash_matches_uninterrupted_run(make_ingestor):
+    reference_emb = FakeEmbeddings()
+    reference = make_ingestor("reference", reference_emb, **SETTINGS)
+    expected = _index(reference.build_retriever([upload(n, d) for n, d in _files()], **SPLIT))
+    assert reference.last_dedup["chunks_removed"] == 1
+
+    # 20-chunk batches are embedded in calls of 8: the 8th call is the 1st of batch 3 (file a)
+    crashed_emb = FakeEmbeddings(fail_after=7)
+    crashed = make_ingestor("run", crashed_emb, **SETTINGS)
+    with pytest.raises(DocumentPortalException):
+        crashed.build_retriever([upload(n, d) for n, d in _files()], **SPLIT)
+    checkpoint = crashed.checkpoint
+    assert [b["path"] for b in checkpoint.batches] == [checkpoint.files[0]["path"]] * 2
+    assert not checkpoint.is_done(checkpoint.files[0]["path"])
+    assert len(list((checkpoint.root / "vectors").glob("*.npy"))) == 7
+
+    resumed_emb = FakeEmbeddings()
+    resumed = make_ingestor("run", resumed_emb, session_id=crashed.session_id, **SETTINGS)
+    assert _index(resumed.resume_retriever(**SPLIT)) == expected
+
+    # Every text embedded exactly once across both runs, in the same calls as without the crash
+    # (the call completed before the crash is read back from its vector file)
+    assert len(crashed_emb.calls) == 7
+    assert crashed_emb.calls + resumed_emb.calls == reference_emb.calls
+    assert resumed.last_dedup["chunks_removed"] == 1
+    assert not checkpoint.root.exists()
+
+
+def test_begin_discards_a_different_job(tmp_path):
+    files = [{"sha256": "abc", "name": "a.txt", "path": "a.txt"}]
+    checkpoint = IngestCheckpoint(tmp_path / "ckpt")
+    checkpoint.begin("job-1", files)
+    checkpoint.embed(FakeEmbeddings(), ["one", "two"])
+    checkpoint.file_done("a.txt")
+
+    checkpoint.begin("job-1", files)
+    assert checkpoint.is_done("a.txt")
+    assert IngestCheckpoint(tmp_path / "ckpt").is_done("a.txt")
+
+    checkpoint.begin("job-2", files)
+    assert not checkpoint.is_done("a.txt")
+    assert not list((tmp_path / "ckpt").glob("vectors/*.npy"))
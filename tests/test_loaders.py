@@ -0,0 +1,152 @@
+import sqlite3
+import zipfile
+
+from conftest import upload
+from multi_doc_chat.src.document_ingestion.data_ingestion import FaissManager
+from multi_doc_chat.utils.sqlite_loader import iter_sqlite_documents
+from multi_doc_chat.utils.structured_loaders import iter_docx_documents, iter_markdown_sections
+from multi_doc_chat.utils.tabular_loaders import iter_tabular_documents
+from multi_doc_chat.utils.text_loader import iter_text_documents
+
+ROW = "name: item {0}; qty: {1}"
+
+
+def test_csv_rows_are_batched_with_ranges(tmp_path):
+    path = tmp_path / "items.csv"
+    path.write_text("name,qty\n" + "".join(f"item {i},{i * 10}\n" for i in range(1, 8)), encoding="utf-8")
+    rows = [ROW.format(i, i * 10) for i in range(1, 8)]
+    # Room for three formatted rows per document
+    docs = list(iter_tabular_documents(path, chunk_chars=3 * (len(rows[0]) + 1)))
+    assert [d.page_content.split("\n") for d in docs] == [rows[:3], rows[3:6], rows[6:]]
+    assert [(d.metadata["row_start"], d.metadata["row_end"], d.metadata["row_id"]) for d in docs] == [
+        (1, 3, "1-3"), (4, 6, "4-6"), (7, 7, "7-7")
+    ]
+    assert docs[0].metadata["columns"] == "name, qty"
+
+
+def test_xlsx_sheets_are_batched_separately(tmp_path):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    first = wb.active
+    first.title = "Stock"
+    first.append(["name", "qty"])
+    for i in range(1, 5):
+        first.append([f"item {i}", i * 10])
+    other = wb.create_sheet("Empty header")
+    other.append([None, "note"])
+    other.append(["x", None])
+    path = tmp_path / "items.xlsx"
+    wb.save(path)
+
+    docs = list(iter_tabular_documents(path, chunk_chars=2 * (len(ROW.format(1, 10)) + 1)))
+    assert [(d.metadata["sheet"], d.metadata["row_id"]) for d in docs] == [
+        ("Stock", "Stock!1-2"), ("Stock", "Stock!3-4"), ("Empty header", "Empty header!1-1")
+    ]
+    assert docs[1].page_content == f"{ROW.format(3, 30)}\n{ROW.format(4, 40)}"
+    assert docs[2].page_content == "column_1: x"
+
+
+def _database(path, rows):
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (name TEXT, qty INTEGER)")
+    conn.executemany("INSERT INTO items (rowid, name, qty) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_sqlite_rows_carry_rowid_keys(tmp_path):
+    path = _database(tmp_path / "inventory.db", [(i, f"item {i}", i * 10) for i in (1, 2, 5)])
+    docs = list(iter_sqlite_documents(path, source="inventory.db", fetch_rows=2))
+    assert [d.page_content for d in docs] == [f"table: items; {ROW.format(i, i * 10)}" for i in (1, 2, 5)]
+    assert [(d.metadata["row_id"], d.metadata["rowid"]) for d in docs] == [("items:1", 1), ("items:2", 2), ("items:5", 5)]
+    assert {d.metadata["source"] for d in docs} == {"inventory.db"}
+
+
+def test_sqlite_high_water_mark_tracks_max_rowid(make_ingestor, tmp_path):
+    rows = [(i, f"item {i}", i * 10) for i in range(1, 4)]
+
+    def ingest(session_id=None):
+        ingestor = make_ingestor("run", session_id=session_id)
+        data = _database(tmp_path / "inventory.db", rows).read_bytes()
+        ingestor.build_retriever([upload("inventory.db", data)], chunk_size=200, chunk_overlap=0)
+        # Reads the manifest of the published snapshot
+        return ingestor, FaissManager(ingestor.faiss_dir, ingestor.model_loader)._meta["high_water"]
+
+    first, marks = ingest()
+    assert marks == {"inventory.db::items": 3}
+    rows.append((9, "item 9", 90))
+    _, marks = ingest(first.session_id)
+    assert marks == {"inventory.db::items": 9}
+
+
+def _docx(path, paragraphs):
+    w = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(
+        f'<w:p><w:pPr><w:pStyle w:val="{style}"/></w:pPr>'
+        + "".join(f"<w:r><w:t xml:space=\"preserve\">{run}</w:t></w:r>" for run in runs)
+        + "</w:p>"
+        for style, runs in paragraphs
+    )
+    xml = f'<?xml version="1.0"?><w:document xmlns:w="{w}"><w:body>{body}<w:sectPr/></w:body></w:document>'
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", xml)
+    return path
+
+
+def test_docx_paragraphs_are_merged_on_boundaries(tmp_path):
+    path = _docx(tmp_path / "report.docx", [
+        ("Heading1", ["Quarterly ", "report"]),
+        ("Normal", ["Revenue grew ", "ten percent."]),
+        ("Normal", []),
+        ("Normal", ["Costs were flat across every region this quarter."]),
+    ])
+    docs = list(iter_docx_documents(path, chunk_chars=50))
+    assert [d.page_content for d in docs] == [
+        "Quarterly report\n\nRevenue grew ten percent.",
+        "Costs were flat across every region this quarter.",
+    ]
+    assert docs[0].metadata == {"source": str(path), "paragraph": 0, "paragraph_end": 1}
+    assert docs[1].metadata == {"source": str(path), "paragraph": 2}
+
+
+def test_markdown_heading_sections():
+    lines = [
+        "Intro text\n",
+        "# Guide\n",
+        "Welcome.\n",
+        "## Setup\n",
+        "```\n",
+        "# not a heading\n",
+        "```\n",
+        "Usage\n",
+        "-----\n",
+        "Run it.\n",
+    ]
+    sections = list(iter_markdown_sections(lines))
+    assert [md for _, md in sections] == [
+        {"section": 0, "heading": ""},
+        {"section": 1, "heading": "Guide"},
+        {"section": 2, "heading": "Guide > Setup"},
+        {"section": 3, "heading": "Guide > Usage"},
+    ]
+    assert "# not a heading" in sections[2][0]
+    assert sections[3][0] == "## Usage\nRun it.\n"
+
+
+def test_mmap_text_byte_offsets_round_trip(tmp_path):
+    paragraph = "Café crème — naïve résumé. "
+    raw = ("\n\n".join(paragraph * 3 for _ in range(20))).encode("utf-8") + b"\xff tail"
+    path = tmp_path / "big.txt"
+    path.write_bytes(raw)
+
+    docs = list(iter_text_documents(path, chunk_chars=120, chunk_overlap=20))
+    assert len(docs) > 5
+    text = raw.decode("utf-8", "replace")
+    for doc in docs:
+        md = doc.metadata
+        assert raw[md["byte_start"]:md["byte_end"]].decode("utf-8", "replace") == doc.page_content
+        assert text[md["start_index"]:md["start_index"] + len(doc.page_content)] == doc.page_content
+    assert docs[-1].page_content.endswith("� tail")
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+from langchain_core.documents import Document
+
+from multi_doc_chat.utils.near_dedup import NearDuplicateFilter, get_near_dedup
+
+
+def _words(seed, n=40):
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(10**6)}" for _ in range(n))
+
+
+DISCLAIMER = _words(1)
+
+
+def _doc(text, source, page=None, **metadata):
+    md = {"source": source, **metadata}
+    if page is not None:
+        md["page"] = page
+    return Document(page_content=text, metadata=md)
+
+
+def test_drop_keeps_first_occurrence_and_reports_savings():
+    chunks = [
+        _doc(DISCLAIMER, "a.pdf", 0),
+        _doc(_words(2), "a.pdf", 1),
+        _doc(DISCLAIMER.upper() + "!", "b.pdf", 3),   # same words: near duplicate
+        _doc(_words(3), "b.pdf", 4),
+    ]
+    kept, report = NearDuplicateFilter(chars_per_token=4, cost_per_1k_tokens=1.0).filter(chunks)
+    assert [c.metadata["page"] for c in kept] == [0, 1, 4]
+    assert "also_in" not in kept[0].metadata
+    assert report["chunks_in"] == 4 and report["chunks_removed"] == 1
+    assert report["chars_removed"] == len(DISCLAIMER) + 1
+    assert report["est_tokens_saved"] == (len(DISCLAIMER) + 1) // 4
+    assert report["cross_source"] == ["b.pdf"]
+
+
+def test_dissimilar_chunks_survive():
+    base = _words(4).split()
+    # Half the words replaced: well under the 0.85 threshold
+    edited = " ".join(w if i % 2 else f"x{i}" for i, w in enumerate(base))
+    kept, report = NearDuplicateFilter().filter([_doc(" ".join(base), "a"), _doc(edited, "a")])
+    assert len(kept) == 2 and report["chunks_removed"] == 0
+
+
+def test_merge_records_where_duplicates_occurred():
+    chunks = [_doc(DISCLAIMER, "a.pdf", 0), _doc(DISCLAIMER, "a.pdf", 5), _doc(DISCLAIMER, "b.txt"),
+              _doc(DISCLAIMER, "a.pdf", 5)]
+    kept, report = NearDuplicateFilter(mode="merge").filter(chunks)
+    assert len(kept) == 1 and report["chunks_removed"] == 3
+    assert kept[0].metadata["also_in"] == ["a.pdf#5", "b.txt"]
+    assert kept[0].metadata["near_duplicates"] == 3
+
+
+def test_rows_are_never_dropped():
+    rows = [_doc("name: widget; qty: 1", "t.csv", row_id=f"t:{i}") for i in range(3)]
+    kept, report = NearDuplicateFilter().filter(rows + [_doc(DISCLAIMER, "a"), _doc(DISCLAIMER, "b")])
+    assert kept[:3] == rows and len(kept) == 4
+    assert report["chunks_removed"] == 1
+
+
+def test_shared_index_spans_batches_and_seen_chunks():
+    dedup = NearDuplicateFilter()
+    seen = [_doc(DISCLAIMER, "cached.pdf", 0)]
+    index = dedup.index(seen)
+    first, r1 = dedup.filter([_doc(_words(5), "a"), _doc(DISCLAIMER, "a")], index=index)
+    second, r2 = dedup.filter([_doc(_words(5), "b"), _doc(_words(6), "b")], index=index)
+    assert [c.page_content for c in first] == [_words(5)]
+    assert [c.page_content for c in second] == [_words(6)]
+    total = dedup.merge_reports(dedup.merge_reports(None, r1), r2)
+    assert total["chunks_in"] == 4 and total["chunks_removed"] == 2
+    assert total["cross_source"] == ["a", "b"]
+
+
+def test_config():
+    assert get_near_dedup({}) is None
+    assert get_near_dedup({"enabled": True, "mode": "merge"}).mode == "merge"
+    with pytest.raises(ValueError):
+        NearDuplicateFilter(num_perm=100, bands=16)
+    with pytest.raises(ValueError):
+        NearDuplicateFilter(mode="keep")
@@ -0,0 +1,17 @@
+import pytest
+
+from multi_doc_chat.utils import pdf_backends
+
+
+def test_auto_prefers_fast_backends(monkeypatch):
+    monkeypatch.setattr(pdf_backends, "available_pdf_backends", lambda: ["pypdf", "langchain"])
+    assert pdf_backends.resolve_pdf_backend("auto") == "pypdf"
+
+
+def test_auto_falls_back_to_langchain_only_when_nothing_else(monkeypatch):
+    monkeypatch.setattr(pdf_backends, "available_pdf_backends", lambda: ["langchain"])
+    assert pdf_backends.resolve_pdf_backend("auto") == "langchain"
+
+    monkeypatch.setattr(pdf_backends, "available_pdf_backends", lambda: [])
+    with pytest.raises(ImportError):
+        pdf_backends.resolve_pdf_backend("auto")
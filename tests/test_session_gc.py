@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+import time
+
+from multi_doc_chat.utils.blob_store import BlobStore, ChunkCache
+from multi_doc_chat.utils.session_gc import SessionReaper
+
+DATA = b"shared file contents"
+
+
+def _session(tmp_path, store: BlobStore, session_id: str):
+    (tmp_path / "data" / session_id).mkdir(parents=True)
+    (tmp_path / "faiss_index" / session_id).mkdir(parents=True)
+    store.put(DATA, ".txt", owner=session_id)
+
+
+def test_reap_concurrent_with_upload_of_same_blob(tmp_path):
+    blobs = tmp_path / "blobs"
+    _session(tmp_path, BlobStore(blobs), "old")
+
+    # The reaper and the upload each use their own BlobStore, as in the app
+    reaper_store = BlobStore(blobs)
+    upload_store = BlobStore(blobs)
+    reaper = SessionReaper(
+        data_base=tmp_path / "data",
+        faiss_base=tmp_path / "faiss_index",
+        blob_store=reaper_store,
+        chunk_cache=ChunkCache(tmp_path / "chunk_cache"),
+    )
+
+    # Stall the reaper between reading refs.json and writing it back
+    refs_read = threading.Event()
+    load_refs = reaper_store._load_refs
+
+    def slow_load_refs():
+        refs = load_refs()
+        refs_read.set()
+        time.sleep(0.3)
+        return refs
+
+    reaper_store._load_refs = slow_load_refs
+
+    def upload():
+        refs_read.wait(5)
+        upload_store.put(DATA, ".txt", owner="new")
+
+    uploader = threading.Thread(target=upload)
+    uploader.start()
+    reaper.reap("old", reason="idle")
+    uploader.join(5)
+
+    digest = hashlib.sha256(DATA).hexdigest()
+    refs = BlobStore(blobs)._load_refs()
+    assert refs[digest]["owners"] == ["new"]
+    assert upload_store.path_for(digest, ".txt").read_bytes() == DATA
+    assert not (tmp_path / "data" / "old").exists()
+
+
+def test_reap_keeps_blob_shared_with_live_session(tmp_path):
+    blobs = tmp_path / "blobs"
+    _session(tmp_path, BlobStore(blobs), "old")
+    _session(tmp_path, BlobStore(blobs), "live")
+
+    reaper = SessionReaper(data_base=tmp_path / "data", faiss_base=tmp_path / "faiss_index", blob_store=BlobStore(blobs))
+    reclaimed = reaper.reap("old", reason="idle")
+
+    digest = hashlib.sha256(DATA).hexdigest()
+    assert reclaimed["blobs"] == 0
+    assert BlobStore(blobs).refcount(digest) == 1
+    assert BlobStore(blobs).path_for(digest, ".txt").exists()
+
+
+def test_quota_evicts_only_until_blob_bytes_are_freed(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    now = time.time()
+    for session_id, data, age in (("old", b"o" * (2 << 20), 100), ("new", b"n" * 1024, 10)):
+        for base in ("data", "faiss_index"):
+            (tmp_path / base / session_id).mkdir(parents=True)
+            os.utime(tmp_path / base / session_id, (now - age, now - age))
+        blobs.put(data, ".txt", owner=session_id)
+
+    # Blobs (2 MB, owned by "old") alone exceed the 1 MB quota; releasing "old" frees them
+    reaper = SessionReaper(
+        data_base=tmp_path / "data", faiss_base=tmp_path / "faiss_index", blob_store=blobs,
+        settings={"max_total_mb": 1},
+    )
+    assert reaper.plan(now) == [("old", "quota")]
@@ -0,0 +1,80 @@
+import hashlib
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from multi_doc_chat.src.document_ingestion.data_ingestion import SharedFaissManager
+from multi_doc_chat.utils.index_store import current_version_dir
+from multi_doc_chat.utils.session_gc import SessionReaper
+from multi_doc_chat.utils.shared_index import load_vectorstore, read_session_map, write_shared_ref
+
+
+class _Embeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [b / 255 for b in hashlib.sha256(text.encode("utf-8")).digest()[:8]]
+
+
+class _Loader:
+    def load_embeddings(self):
+        return _Embeddings()
+
+
+def _ingest(tmp_path, session_id, docs):
+    corpus = tmp_path / "faiss_index" / "_shared" / "default"
+    fm = SharedFaissManager(corpus, session_id, _Loader())
+    with fm.locked():
+        if fm.exists():
+            fm.load_or_create()
+        fm.add_documents([Document(page_content=text, metadata={"source": source}) for source, text in docs])
+    session_dir = tmp_path / "faiss_index" / session_id
+    session_dir.mkdir(parents=True, exist_ok=True)
+    write_shared_ref(session_dir, corpus, session_id)
+    return corpus
+
+
+def _ntotal(corpus):
+    return FAISS.load_local(
+        str(current_version_dir(corpus)), embeddings=_Embeddings(), allow_dangerous_deserialization=True
+    ).index.ntotal
+
+
+def _corpus(tmp_path):
+    _ingest(tmp_path, "a", [("common.txt", "shared text"), ("a.txt", "only a one"), ("a.txt", "only a two")])
+    return _ingest(tmp_path, "b", [("common.txt", "shared text"), ("b.txt", "only b")])
+
+
+def test_reap_compacts_shared_corpus(tmp_path):
+    corpus = _corpus(tmp_path)
+    assert _ntotal(corpus) == 4
+
+    reaper = SessionReaper(
+        data_base=tmp_path / "data", faiss_base=tmp_path / "faiss_index", settings={"compact_min_orphan_ratio": 0}
+    )
+    reaper.reap("a", reason="idle")
+
+    assert _ntotal(corpus) == 2
+    assert list(read_session_map(corpus)) == ["b"]
+    vs = load_vectorstore(tmp_path / "faiss_index" / "b", _Embeddings())
+    assert {d.page_content for d in vs.similarity_search("only b", k=5)} == {"shared text", "only b"}
+
+    # Purged chunks are forgotten by the manifest, so uploading them again re-indexes them
+    _ingest(tmp_path, "c", [("a.txt", "only a one")])
+    assert _ntotal(corpus) == 3
+
+
+def test_compaction_waits_for_orphan_ratio(tmp_path):
+    corpus = _corpus(tmp_path)
+
+    reaper = SessionReaper(
+        data_base=tmp_path / "data", faiss_base=tmp_path / "faiss_index", settings={"compact_min_orphan_ratio": 0.9}
+    )
+    reaper.reap("a", reason="idle")
+
+    # Two of four vectors are orphaned: below the ratio, they stay (hidden from "b")
+    assert _ntotal(corpus) == 4
+    vs = load_vectorstore(tmp_path / "faiss_index" / "b", _Embeddings())
+    assert {d.page_content for d in vs.similarity_search("only a one", k=5)} == {"shared text", "only b"}
@@ -0,0 +1,52 @@
+from langchain_core.documents import Document
+
+from multi_doc_chat.utils.text_normalize import TextNormalizer
+
+
+def _pages(source, bodies, **metadata):
+    return [
+        Document(page_content=f"ACME Corp Annual Report\n{body}\nPage {n} of {len(bodies)}",
+                 metadata={"source": source, "page": n, **metadata})
+        for n, body in enumerate(bodies, start=1)
+    ]
+
+
+def _normalize(docs, **settings):
+    docs, report = TextNormalizer(**settings).normalize(docs)
+    return [d.page_content for d in docs], report
+
+
+def test_dehyphenates_line_breaks_but_keeps_compounds():
+    texts, _ = _normalize([Document(page_content="infor-\nmation about Jean-\nPaul", metadata={"source": "a"})])
+    assert texts == ["information about Jean-\nPaul"]
+
+
+def test_strips_control_characters_and_collapses_whitespace():
+    texts, report = _normalize([Document(page_content="a\x00b\u200bc  d\u00ad  \n\n\n\n  e   ", metadata={"source": "a"})])
+    assert texts == ["abc d\n\n  e"]
+    assert report == [{"source": "a", "documents": 1, "chars_before": 21, "chars_after": 10}]
+
+
+def test_strips_repeated_pdf_headers_and_footers():
+    bodies = ["first page body", "second page body", "third page body", "fourth page body"]
+    texts, _ = _normalize(_pages("report.pdf", bodies, pdf_backend="pypdf"))
+    assert texts == bodies
+
+
+def test_keeps_edges_below_min_pages_and_of_other_paged_sources():
+    bodies = ["Quarterly results", "Roadmap", "Questions"]
+    # PPTX slides repeat their title placeholder: content, not a header
+    slides, _ = _normalize(_pages("deck.pptx", bodies, slide=1))
+    assert slides == [d.page_content for d in _pages("deck.pptx", bodies)]
+
+    short, _ = _normalize(_pages("short.pdf", bodies[:2], pdf_backend="pypdf"))
+    assert short == [d.page_content for d in _pages("short.pdf", bodies[:2])]
+
+
+def test_leaves_rows_and_presplit_chunks_untouched():
+    docs = [
+        Document(page_content="a  \x00 b", metadata={"source": "t.csv", "row_id": "1"}),
+        Document(page_content="c  \x00 d", metadata={"source": "big.txt", "byte_start": 0}),
+    ]
+    texts, report = _normalize(docs)
+    assert texts == ["a  \x00 b", "c  \x00 d"] and report == []
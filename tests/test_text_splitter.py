@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from multi_doc_chat.utils.text_splitter import FastTextSplitter, token_length
+
+WORDS = ["alpha", "beta", "gamma", "delta", "x", "lorem", "ipsum", "überlang", "a" * 40]
+SEPARATORS = [" ", " ", " ", "  ", "\n", "\n\n", "\n\n\n", " \n ", "\t"]
+
+
+def _text(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 400)):
+        parts.append(rng.choice(WORDS) if rng.random() > 0.02 else "y" * rng.randint(50, 300))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def _docs(seed: int):
+    rng = random.Random(seed)
+    return [Document(page_content=_text(rng), metadata={"source": f"doc{i}"}) for i in range(5)]
+
+
+def _assert_same_chunks(docs, **kwargs):
+    reference = RecursiveCharacterTextSplitter(**kwargs).split_documents(docs)
+    fast = FastTextSplitter(**kwargs).split_documents(docs)
+    assert [d.page_content for d in fast] == [d.page_content for d in reference]
+    assert [d.metadata["source"] for d in fast] == [d.metadata["source"] for d in reference]
+    if kwargs.get("add_start_index"):
+        texts = {d.metadata["source"]: d.page_content for d in docs}
+        for ours, theirs in zip(fast, reference):
+            text, start = texts[ours.metadata["source"]], ours.metadata["start_index"]
+            # Ours is the true offset; LangChain's str.find() may land on an earlier copy
+            assert text[start:start + len(ours.page_content)] == ours.page_content
+            if text.count(ours.page_content) == 1:
+                assert start == theirs.metadata["start_index"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_recursive_character_splitter(seed):
+    rng = random.Random(1000 + seed)
+    size = rng.choice([20, 50, 200, 1000])
+    _assert_same_chunks(_docs(seed), chunk_size=size, chunk_overlap=rng.randint(0, size // 2))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_with_start_index_and_large_overlap(seed):
+    size = random.Random(seed).choice([30, 100, 400])
+    _assert_same_chunks(_docs(seed), chunk_size=size, chunk_overlap=size - 1, add_start_index=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_with_custom_length_function(seed):
+    def words(s):
+        return len(s.split())
+
+    _assert_same_chunks(_docs(seed), chunk_size=40, chunk_overlap=10, length_function=words)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_with_tiktoken_length(seed):
+    try:
+        length = token_length("cl100k_base")
+    except Exception as e:  # tiktoken missing or its encoding not downloadable here
+        pytest.skip(f"tiktoken encoding unavailable: {e}")
+    _assert_same_chunks(_docs(seed), chunk_size=60, chunk_overlap=20, length_function=length, add_start_index=True)